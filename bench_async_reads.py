@@ -0,0 +1,167 @@
+"""
+Sync vs async throughput of the hot read endpoints at high concurrency.
+
+Holds ``--connections`` keep-alive HTTP/1.1 connections open (200 by default)
+with a plain asyncio client (no third-party dependencies), each issuing the
+read mix back to back, and reports throughput and p50/p95/p99 latency.
+``--variant sync`` hits the DRF endpoints, ``--variant async`` their
+``/api/async/`` twins. A share of long-polling feed requests (``--poll-share``)
+shows what each server does while requests are parked.
+
+    # sync workers
+    gunicorn pos_backend.wsgi:application -w 4 -b :8000
+    python bench_async_reads.py --variant sync
+
+    # async workers
+    gunicorn pos_backend.asgi:application -k uvicorn_worker.UvicornWorker -w 4 -b :8000
+    python bench_async_reads.py --variant async
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+READS = {
+    'sync': {
+        'orders': 'orders/?view=summary',
+        'feed': 'orders/feed/?since={cursor}',
+        'catalog': 'products/catalog/',
+        'dashboard': 'analytics/dashboard/',
+        'tables': 'tables/',
+        'poll': 'orders/feed/?since={cursor}&wait={wait}',
+    },
+    'async': {
+        'orders': 'async/orders/?view=summary',
+        'feed': 'async/orders/feed/?since={cursor}',
+        'catalog': 'async/products/catalog/',
+        'dashboard': 'async/analytics/dashboard/',
+        'tables': 'async/tables/',
+        'poll': 'async/orders/feed/?since={cursor}&wait={wait}',
+    },
+}
+MIX = {'orders': 3, 'feed': 3, 'catalog': 2, 'dashboard': 1, 'tables': 1}
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed')
+    status = int(status_line.split()[1])
+    length, chunked, close = 0, False, False
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding' and 'chunked' in value:
+            chunked = True
+        elif name == 'connection' and value == 'close':
+            close = True
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, close
+
+
+class Client:
+    def __init__(self, base_url, variant, cursor, wait):
+        parts = urlsplit(base_url.rstrip('/') + '/')
+        self.host, self.port, self.prefix = parts.hostname, parts.port or 80, parts.path
+        self.paths = {name: path.format(cursor=cursor, wait=wait) for name, path in READS[variant].items()}
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def connection(self, deadline, poll_share):
+        names, weights = list(MIX), list(MIX.values())
+        reader = writer = None
+        while time.monotonic() < deadline:
+            name = 'poll' if random.random() < poll_share else random.choices(names, weights)[0]
+            request = (
+                f'GET {self.prefix}{self.paths[name]} HTTP/1.1\r\nHost: {self.host}\r\n'
+                f'Accept: application/json\r\n\r\n'
+            ).encode()
+            started = time.perf_counter()
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                writer.write(request)
+                await writer.drain()
+                status, close = await asyncio.wait_for(read_response(reader), timeout=60)
+                if status >= 400:
+                    raise ConnectionError(f'HTTP {status}')
+            except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                self.errors[name] += 1
+                if writer is not None:
+                    writer.close()
+                reader = writer = None
+                await asyncio.sleep(0.05)
+                continue
+            self.latencies[name].append((time.perf_counter() - started) * 1000)
+            if close:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args, cursor):
+    client = Client(args.base_url, args.variant, cursor, args.wait)
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client.connection(deadline, args.poll_share) for _ in range(args.connections)))
+    return client, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000/api')
+    parser.add_argument('--variant', choices=READS, default='async')
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--poll-share', type=float, default=0.0,
+                        help='Fraction of requests that long-poll the feed')
+    parser.add_argument('--wait', type=float, default=5, help='Long-poll wait in seconds')
+    args = parser.parse_args()
+
+    # Start the feed at the newest change so feed reads stay small
+    with urllib.request.urlopen(f"{args.base_url.rstrip('/')}/orders/feed/", timeout=30) as response:
+        cursor = json.loads(response.read())['data']['cursor']
+
+    client, elapsed = asyncio.run(run(args, cursor))
+
+    print(f"{'endpoint':<12}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    total = 0
+    for name in [*MIX, 'poll']:
+        values = client.latencies[name]
+        total += len(values)
+        if not values:
+            if client.errors[name]:
+                print(f"{name:<12}{0:>8}{client.errors[name]:>8}")
+            continue
+        print(
+            f"{name:<12}{len(values):>8}{client.errors[name]:>8}{len(values) / elapsed:>9.1f}"
+            f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}{percentile(values, 99):>9.1f}"
+        )
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), "
+          f"{args.connections} connections, variant {args.variant}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Offline load test for a locally running backend, using the same plain urllib
+client as test_order_urllib.py (no third-party dependencies).
+
+Drives a weighted mix of order creation, kitchen status patches and dashboard
+reads from concurrent workers, then reports throughput and p50/p95/p99
+latency per operation.
+
+    python manage.py seed_data && python manage.py generate_load_data
+    python manage.py runserver   # or gunicorn
+    python load_test_urllib.py --concurrency 20 --duration 30
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+NEXT_STATUS = {'pending': 'preparing', 'preparing': 'ready', 'ready': 'served'}
+
+
+def request(base_url, path, method='GET', data=None):
+    body = json.dumps(data).encode() if data is not None else None
+    req = urllib.request.Request(
+        f"{base_url}/{path}", data=body, method=method,
+        headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(req, timeout=30) as response:
+        return response.getcode(), response.read()
+
+
+class LoadTest:
+    def __init__(self, base_url, products):
+        self.base_url = base_url.rstrip('/')
+        self.products = products
+        self.open_orders = []
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def create_order(self):
+        picks = random.choices(self.products, k=random.randint(1, 6))
+        payload = {
+            'items_data': [
+                {'productId': p['id'], 'name': p['name'], 'price': p['price'], 'quantity': random.randint(1, 3)}
+                for p in picks
+            ],
+            'payment_method': random.choice(['cash', 'card', 'qr']),
+            'order_type': random.choice(['dine-in', 'takeaway']),
+            'discount': 0,
+        }
+        _, body = request(self.base_url, 'orders/', 'POST', payload)
+        order = json.loads(body)
+        with self.lock:
+            self.open_orders.append((order['id'], order['status']))
+
+    def patch_status(self):
+        with self.lock:
+            picked = self.open_orders.pop(random.randrange(len(self.open_orders))) if self.open_orders else None
+        if picked is None:
+            return self.create_order()
+        order_id, current = picked
+        new_status = NEXT_STATUS[current]
+        request(self.base_url, f'orders/{order_id}/status/', 'PATCH', {'status': new_status})
+        if new_status in NEXT_STATUS:
+            with self.lock:
+                self.open_orders.append((order_id, new_status))
+
+    def read_dashboard(self):
+        request(self.base_url, 'analytics/dashboard/')
+
+    def run_one(self, operation):
+        started = time.perf_counter()
+        try:
+            getattr(self, operation)()
+        except (urllib.error.URLError, OSError, ValueError, KeyError):
+            with self.lock:
+                self.errors[operation] += 1
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.latencies[operation].append(elapsed)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000/api')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--mix', default='create_order:3,patch_status:5,read_dashboard:2',
+                        help='Weighted operation mix')
+    args = parser.parse_args()
+
+    _, body = request(args.base_url.rstrip('/'), 'products/')
+    products = json.loads(body)
+    products = products if isinstance(products, list) else products.get('results', [])
+    if not products:
+        print('No products found. Run seed_data first.')
+        return
+
+    mix = [entry.split(':') for entry in args.mix.split(',')]
+    operations, weights = [name for name, _ in mix], [int(weight) for _, weight in mix]
+    test = LoadTest(args.base_url, products)
+    deadline = time.monotonic() + args.duration
+
+    def worker():
+        while time.monotonic() < deadline:
+            test.run_one(random.choices(operations, weights)[0])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    print(f"{'operation':<16}{'count':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    total = 0
+    for operation in operations:
+        values = test.latencies[operation]
+        total += len(values)
+        if not values:
+            print(f"{operation:<16}{0:>8}{test.errors[operation]:>8}")
+            continue
+        print(
+            f"{operation:<16}{len(values):>8}{test.errors[operation]:>8}{len(values) / elapsed:>9.1f}"
+            f"{percentile(values, 50):>9.1f}{percentile(values, 95):>9.1f}{percentile(values, 99):>9.1f}"
+        )
+    print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s), concurrency {args.concurrency}")
+
+
+if __name__ == '__main__':
+    main()
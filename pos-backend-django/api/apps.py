@@ -3,3 +3,27 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.db.models.signals import post_save, post_delete
+        from django.contrib.auth.models import User
+        from . import auth, catalog, search
+        from .models import Category, Product
+
+        # Importing reports parses REPORT_SHIFTS, so a bad value stops the
+        # boot instead of failing the first Z-report request
+        from . import reports  # noqa: F401
+
+        # Write-through invalidation of the menu catalog cache
+        for model in (Category, Product):
+            post_save.connect(catalog.bump_version, sender=model, dispatch_uid=f'catalog-save-{model.__name__}')
+            post_delete.connect(catalog.bump_version, sender=model, dispatch_uid=f'catalog-delete-{model.__name__}')
+
+        # Keep the product search index in step with the catalog
+        post_save.connect(search.product_saved, sender=Product, dispatch_uid='search-save-Product')
+        post_delete.connect(search.product_deleted, sender=Product, dispatch_uid='search-delete-Product')
+        post_save.connect(search.category_saved, sender=Category, dispatch_uid='search-save-Category')
+
+        # Cached users (api/auth.py) are dropped as soon as they change
+        post_save.connect(auth.user_changed, sender=User, dispatch_uid='auth-save-User')
+        post_delete.connect(auth.user_changed, sender=User, dispatch_uid='auth-delete-User')
@@ -0,0 +1,149 @@
+"""
+Order archival.
+
+Served and cancelled orders older than ARCHIVE_AFTER_DAYS are moved out of
+api_order/api_orderitem by ``archive_orders`` (the nightly ``archive_orders``
+command) into ``ArchivedOrder``: one row per order with its items inline,
+keeping the original id, number and timestamps. The hot tables then hold the
+last few weeks plus whatever is still open, so the board, feed, status
+filters and list pages stay small however long the shop has been trading.
+
+Reads only reach into the archive when they need rows that old:
+
+* order list pages are completed from the archive once they run past the
+  hot rows or past the archive cutoff (``OrderHistoryPagination``)
+* ``orders/<id>/`` falls back to the archive; archived orders are read-only
+* exports whose range starts before the cutoff merge both tables
+* ``rollups.rebuild()`` counts archived orders too
+
+Nothing newer than the cutoff is ever archived (the command refuses a
+shorter age), which is what lets a read skip the archive without asking it.
+
+Archived orders keep their ids, so the hot table must never hand one out
+again. It does not: Django creates SQLite primary keys as AUTOINCREMENT, whose
+high-water mark in ``sqlite_sequence`` survives the rows being deleted, and
+PostgreSQL sequences only move forward.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ARCHIVABLE_ORDER_STATUSES, ARCHIVED_ITEM_FIELDS, ArchivedOrder, Order, OrderItem
+
+ARCHIVE_AFTER_DAYS = int(getattr(settings, 'ARCHIVE_AFTER_DAYS', 90))
+BATCH_SIZE = 1000
+CHUNK_SIZE = 2000
+
+# Copied column for column between Order and ArchivedOrder
+ORDER_FIELDS = (
+    'id', 'order_number', 'table_id', 'table_number', 'status', 'total_amount', 'subtotal', 'discount',
+    'payment_method', 'order_type', 'waiter_name', 'created_by_id', 'customer_id', 'client_key',
+    'created_at', 'updated_at',
+)
+
+
+def cutoff(days=ARCHIVE_AFTER_DAYS):
+    """Orders created at or after this moment are always in the hot tables."""
+    return timezone.now() - timedelta(days=days)
+
+
+def _archived(order):
+    return ArchivedOrder(
+        items=[
+            [item.id, item.product_id, item.product_name, str(item.price), item.quantity, item.notes]
+            for item in order.items.all()
+        ],
+        **{field: getattr(order, field) for field in ORDER_FIELDS}
+    )
+
+
+def archive_orders(before, batch_size=BATCH_SIZE):
+    """Move served/cancelled orders created before ``before`` to the archive; returns how many moved."""
+    candidates = Order.objects.filter(
+        status__in=ARCHIVABLE_ORDER_STATUSES, created_at__lt=before
+    ).order_by('created_at', 'id')
+    moved = 0
+    while True:
+        # One transaction per batch keeps locks short on a busy till
+        with transaction.atomic():
+            orders = list(candidates.prefetch_related('items')[:batch_size])
+            if not orders:
+                return moved
+            ArchivedOrder.objects.bulk_create([_archived(order) for order in orders])
+            Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+        moved += len(orders)
+
+
+def to_order(row):
+    """An unsaved ``Order`` (items attached) that serializes exactly like a hot one."""
+    order = Order(**{field: getattr(row, field) for field in ORDER_FIELDS})
+    items = [OrderItem(order=order, **dict(zip(ARCHIVED_ITEM_FIELDS, values))) for values in row.items]
+    # What prefetch_related('items') leaves behind, so order.items.all() needs no query
+    order._prefetched_objects_cache = {'items': items}
+    order.item_count = len(items)
+    return order
+
+
+def get(pk):
+    row = ArchivedOrder.objects.filter(pk=pk).first()
+    return to_order(row) if row is not None else None
+
+
+def queryset(status=None):
+    """Archived orders matching an order list's ``?status=``; None when it rules the archive out."""
+    if status is None:
+        return ArchivedOrder.objects.all()
+    if status in ARCHIVABLE_ORDER_STATUSES:
+        return ArchivedOrder.objects.filter(status=status)
+    return None
+
+
+def older(rows, before=None, after=None, limit=None):
+    """``rows`` below the ``(created_at, id)`` position ``before`` and above the order ``after``, newest first."""
+    if before is not None:
+        created_at, pk = before
+        rows = rows.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk), created_at__lte=created_at
+        )
+    if after is not None:
+        rows = rows.filter(
+            Q(created_at__gt=after.created_at) | Q(created_at=after.created_at, id__gt=after.pk),
+            created_at__gte=after.created_at
+        )
+    return rows.order_by('-created_at', '-id')[:limit]
+
+
+def reaches_archive(rows, page_size):
+    """Whether a page fetched as ``page_size + 1`` hot rows may have archived orders within or after it."""
+    return len(rows) <= page_size or rows[-1].created_at < cutoff()
+
+
+def merge(rows, archived, limit):
+    return sorted(rows + archived, key=lambda order: (order.created_at, order.pk), reverse=True)[:limit]
+
+
+def export_rows(kind, fields, created_from, created_to):
+    """Archived rows for ``exports`` as ``(order id, *fields)``, oldest first."""
+    rows = ArchivedOrder.objects.filter(
+        created_at__gte=created_from, created_at__lt=created_to
+    ).order_by('created_at', 'id')
+    if kind != 'items':
+        return rows.values_list('id', *fields).iterator(chunk_size=CHUNK_SIZE)
+    order_fields = [field.replace('order__', '') for field in fields if field.startswith('order__')]
+    item_fields = [field for field in fields if not field.startswith('order__')]
+    return (
+        tuple(order) + tuple(dict(zip(ARCHIVED_ITEM_FIELDS, values))[field] for field in item_fields)
+        for *order, items in rows.values_list('id', *order_fields, 'items').iterator(chunk_size=CHUNK_SIZE)
+        for values in items
+    )
+
+
+def item_rows(exclude_statuses=()):
+    """``(created_at, product_id, product_name, price, quantity)`` for every archived item."""
+    rows = ArchivedOrder.objects.exclude(status__in=exclude_statuses).values_list('created_at', 'items')
+    for created_at, items in rows.iterator(chunk_size=CHUNK_SIZE):
+        for _, product_id, product_name, price, quantity, _ in items:
+            yield created_at, product_id, product_name, price, quantity
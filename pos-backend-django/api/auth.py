@@ -0,0 +1,109 @@
+"""
+JWT authentication without a user query per request.
+
+Access tokens carry ``username``, ``role``, ``is_staff`` and ``is_superuser``
+claims (see ``add_claims``), so ``TokenUserAuthentication`` builds
+``request.user`` from the verified token alone. Tokens minted before those
+claims existed, and profile reads (``ManageUserView``), go through
+``user_cache``: a bounded per-process TTL/LRU cache. A save or delete drops
+the user from the cache of the process that made it, and only that one;
+other workers keep their copy until it expires (USER_CACHE_TTL). So cached
+users serve reads only, and updates load the row fresh.
+
+As with any stateless token, deactivating a user or changing their role
+takes effect when their access token expires (ACCESS_TOKEN_LIFETIME).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+ROLE_CLAIM = 'role'
+
+
+def role_for(user):
+    return 'admin' if user.is_superuser or user.is_staff else 'user'
+
+
+def add_claims(token, user):
+    token['username'] = user.username
+    token[ROLE_CLAIM] = role_for(user)
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    return token
+
+
+class UserCache:
+    """Least-recently-used ``User`` rows, each kept for at most ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        """A private copy of the user (callers may modify it); raises User.DoesNotExist."""
+        # Token claims carry the id as a string, signals as the pk
+        key = str(user_id)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.entries.move_to_end(key)
+                return copy.copy(entry[1])
+        user = User.objects.get(pk=user_id)
+        with self.lock:
+            self.entries[key] = (now + self.ttl, user)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'USER_CACHE_TTL', 300),
+)
+
+
+def user_changed(instance, **kwargs):
+    """Signal receiver: forget a saved or deleted user."""
+    user_cache.invalidate(instance.pk)
+
+
+class TokenUserAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that trusts the token's claims instead of loading the user."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+        if ROLE_CLAIM in validated_token:
+            return TokenUser(validated_token)
+
+        # Token from before role claims: resolve the user once per TTL
+        try:
+            user = user_cache.get(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,158 @@
+"""
+Versioned menu catalog cache.
+
+Categories and products change a few times a day but are read by every
+terminal constantly. Rendered JSON snapshots are kept per catalog version in
+the ``catalog`` cache (local memory by default, file or Redis when
+CATALOG_CACHE_URL is set so all gunicorn workers share one copy) and in a
+per-process dict in front of it. Any Category/Product save or delete (and
+``rebuild_search_index`` after a bulk load) bumps the version, which both
+invalidates every snapshot and changes the ETag.
+
+The version never expires. A shared cache holds it, so a 304 costs no query;
+local memory is private to one worker, so there the version lives in the
+database instead (``CatalogVersion``) and every worker sees a bump at once.
+Either way it is the time of the last bump, so a version rolled back with its
+transaction is never handed out again for other data. The bump lands with the
+write's commit: written in the same transaction in the database, and only
+after the commit in a shared cache.
+"""
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+
+from .models import CatalogVersion
+from .renderers import FastJSONRenderer
+
+VERSION_KEY = 'catalog:version'
+VERSION_ROW = 1
+SNAPSHOT_KEY = 'catalog:snapshot:{version}:{kind}'
+SNAPSHOT_TIMEOUT = 60 * 60 * 24  # superseded versions just age out
+
+_local = {}
+
+
+def _cache():
+    return caches['catalog']
+
+
+def _shared():
+    return not isinstance(_cache(), LocMemCache)
+
+
+def _stored_versions():
+    return CatalogVersion.objects.filter(pk=VERSION_ROW).values_list('version', flat=True)
+
+
+def current_version():
+    if not _shared():
+        version = _stored_versions().first()
+        if version is None:
+            # get_or_create() so concurrent workers agree on the first version
+            row, _ = CatalogVersion.objects.get_or_create(pk=VERSION_ROW, defaults={'version': time.time_ns()})
+            version = row.version
+        return str(version)
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = str(time.time_ns())
+        # add() so concurrent workers agree on the first version
+        if not _cache().add(VERSION_KEY, version, timeout=None):
+            version = _cache().get(VERSION_KEY)
+    return version
+
+
+def bump_version(**kwargs):
+    """Signal receiver: any catalog write starts a new version."""
+    if _shared():
+        # A reader between the bump and the commit would cache the old rows
+        # under the new version, for good
+        transaction.on_commit(_bump_shared)
+    else:
+        # Commits, or rolls back, with the write itself
+        CatalogVersion.objects.update_or_create(pk=VERSION_ROW, defaults={'version': time.time_ns()})
+        _local.clear()
+
+
+def _bump_shared():
+    _cache().set(VERSION_KEY, str(time.time_ns()), timeout=None)
+    _local.clear()
+
+
+def snapshot(kind, build, version=None):
+    """Return ``(etag, body)`` for ``kind``, rendering ``build()`` only on a miss."""
+    version = version or current_version()
+    cached = _local.get(kind)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    key = SNAPSHOT_KEY.format(version=version, kind=kind)
+    body = _cache().get(key)
+    if body is None:
+        body = FastJSONRenderer().render(build())
+        _cache().set(key, body, timeout=SNAPSHOT_TIMEOUT)
+    etag = _etag(kind, version)
+    _local[kind] = (version, etag, body)
+    return etag, body
+
+
+def _etag(kind, version):
+    return f'"{kind}-{version}"'
+
+
+def _response(etag, body):
+    response = HttpResponseNotModified() if body is None else HttpResponse(body, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def cached_response(request, kind, build):
+    # A matching If-None-Match costs one version lookup and no rendering
+    version = current_version()
+    etag = _etag(kind, version)
+    if etag in request.headers.get('If-None-Match', ''):
+        return _response(etag, None)
+    return _response(*snapshot(kind, build, version))
+
+
+async def acurrent_version():
+    if not _shared():
+        version = await _stored_versions().afirst()
+        if version is None:
+            row, _ = await CatalogVersion.objects.aget_or_create(pk=VERSION_ROW, defaults={'version': time.time_ns()})
+            version = row.version
+        return str(version)
+    version = await _cache().aget(VERSION_KEY)
+    if version is None:
+        version = str(time.time_ns())
+        if not await _cache().aadd(VERSION_KEY, version, timeout=None):
+            version = await _cache().aget(VERSION_KEY)
+    return version
+
+
+async def asnapshot(kind, build, version=None):
+    """``snapshot`` for async views; ``build`` is a coroutine function."""
+    version = version or await acurrent_version()
+    cached = _local.get(kind)
+    if cached and cached[0] == version:
+        return cached[1], cached[2]
+
+    key = SNAPSHOT_KEY.format(version=version, kind=kind)
+    body = await _cache().aget(key)
+    if body is None:
+        body = FastJSONRenderer().render(await build())
+        await _cache().aset(key, body, timeout=SNAPSHOT_TIMEOUT)
+    etag = _etag(kind, version)
+    _local[kind] = (version, etag, body)
+    return etag, body
+
+
+async def acached_response(request, kind, build):
+    version = await acurrent_version()
+    etag = _etag(kind, version)
+    if etag in request.headers.get('If-None-Match', ''):
+        return _response(etag, None)
+    return _response(*await asnapshot(kind, build, version))
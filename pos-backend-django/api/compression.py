@@ -0,0 +1,85 @@
+"""
+Response compression.
+
+``CompressionMiddleware`` gzips (or, with the brotli package installed and
+the client asking for it, brotli-encodes) API responses of at least
+COMPRESS_MIN_SIZE bytes. Small bodies are left alone: below about a
+kilobyte the headers cost more than the saving. Streaming responses
+(exports, long-polls) are never touched, so they still reach the client
+row by row instead of being held back by a compressor.
+"""
+import re
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_SIZE = int(getattr(settings, 'COMPRESS_MIN_SIZE', 1024))
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ('application/json', 'application/msgpack', 'text/')
+_ACCEPTS = re.compile(r'(?:^|,)\s*([\w*-]+)\s*(?:;\s*q=([\d.]+))?')
+
+
+def accepted_encodings(header):
+    """Content codings the client takes (``q=0`` excluded)."""
+    accepted = set()
+    for coding, quality in _ACCEPTS.findall(header.lower()):
+        try:
+            if float(quality or 1) > 0:
+                accepted.add(coding)
+        except ValueError:
+            continue
+    return accepted
+
+
+def encode(content, encodings):
+    """``(coding, compressed body)`` for the best coding in ``encodings``, or None."""
+    if brotli is not None and 'br' in encodings:
+        return 'br', brotli.compress(content, quality=BROTLI_QUALITY)
+    if 'gzip' in encodings:
+        return 'gzip', compress_string(content)
+    return None
+
+
+class CompressionMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < MIN_SIZE:
+            return response
+
+        encoded = encode(response.content, accepted_encodings(request.headers.get('Accept-Encoding', '')))
+        if encoded is None or len(encoded[1]) >= len(response.content):
+            return response
+        coding, response.content = encoded
+        response['Content-Length'] = str(len(response.content))
+        response['Content-Encoding'] = coding
+        # The bytes differ per coding, so a strong validator becomes weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,105 @@
+"""
+Per-route statement timeouts.
+
+In the web processes every PostgreSQL connection starts with
+``statement_timeout`` set to DB_STATEMENT_TIMEOUT (settings.py; management
+commands run without one). ``StatementTimeoutMiddleware`` swaps in
+the STATEMENT_TIMEOUTS value for the routes listed there (by URL name, as in
+the metrics) for the length of the request, so a runaway analytics query is
+cancelled after a few seconds instead of pinning a worker, and puts the
+default back before the connection serves anything else. SQLite has no
+statement timeout; there the same limit is enforced with a progress
+handler that interrupts the query once the deadline has passed.
+
+A query cut off this way answers 503 in the usual error envelope.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+from django.http import JsonResponse
+
+TIMEOUTS = getattr(settings, 'STATEMENT_TIMEOUTS', {})
+DEFAULT_TIMEOUT = int(getattr(settings, 'DB_STATEMENT_TIMEOUT', 0))
+# SQLite VM instructions between deadline checks
+PROGRESS_STEPS = 10000
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.url_name if match else None
+
+
+def set_timeout(milliseconds):
+    """Limit each query on this thread's connection to ``milliseconds`` (None/0: the default)."""
+    connection.ensure_connection()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('statement_timeout', %s, false)", [str(milliseconds or DEFAULT_TIMEOUT)])
+    elif connection.vendor == 'sqlite':
+        if milliseconds:
+            deadline = time.monotonic() + milliseconds / 1000
+            connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_STEPS)
+        else:
+            connection.connection.set_progress_handler(None, 0)
+
+
+def reset_timeout():
+    try:
+        set_timeout(None)
+    except DatabaseError:
+        # Never hand on a connection that may still carry the route's limit
+        connection.close()
+
+
+def timed_out(exc):
+    message = str(exc)
+    # PostgreSQL: "canceling statement due to statement timeout"; SQLite: "interrupted"
+    return isinstance(exc, OperationalError) and ('statement timeout' in message or message == 'interrupted')
+
+
+class StatementTimeoutMiddleware:
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if getattr(request, '_statement_timeout', None):
+            reset_timeout()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if getattr(request, '_statement_timeout', None):
+            # On the executor thread whose connection the view used
+            await sync_to_async(reset_timeout)()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        milliseconds = TIMEOUTS.get(_route(request))
+        if milliseconds:
+            set_timeout(milliseconds)
+            request._statement_timeout = milliseconds
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # Only routes with their own limit leave the event loop
+        milliseconds = TIMEOUTS.get(_route(request))
+        if milliseconds:
+            await sync_to_async(set_timeout)(milliseconds)
+            request._statement_timeout = milliseconds
+
+    def process_exception(self, request, exception):
+        if getattr(request, '_statement_timeout', None) and timed_out(exception):
+            return JsonResponse({
+                'status': 'error',
+                'message': f'Query took longer than {request._statement_timeout} ms and was cancelled',
+            }, status=503)
+        return None
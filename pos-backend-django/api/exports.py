@@ -0,0 +1,109 @@
+"""
+Streaming order exports for accounting.
+
+Rows come straight from ``values().iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and are encoded one line at a time, so memory stays
+flat whether the range covers a day or five years. Ranges reaching back past
+the archive cutoff stream the archived orders merged in by time.
+"""
+import csv
+import heapq
+import json
+from datetime import datetime, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from . import archive
+from .models import Order, OrderItem
+
+CHUNK_SIZE = 2000
+
+ORDER_FIELDS = (
+    'order_number', 'created_at', 'status', 'order_type', 'payment_method',
+    'table_number', 'waiter_name', 'subtotal', 'discount', 'total_amount',
+)
+ITEM_FIELDS = (
+    'order__order_number', 'order__created_at', 'order__status',
+    'product_id', 'product_name', 'price', 'quantity', 'notes',
+)
+KINDS = {
+    'orders': ORDER_FIELDS,
+    'items': ITEM_FIELDS,
+}
+OUTPUTS = ('csv', 'ndjson')
+# Typed at a terminal; a spreadsheet would run such a cell starting with a
+# formula character, so CSV cells get a leading quote
+TEXT_FIELDS = ('waiter_name', 'product_name', 'notes')
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def parse_range(start, end):
+    """Inclusive local dates (YYYY-MM-DD) to an aware [from, to) pair; defaults to today."""
+    today = timezone.localdate()
+    start_day = datetime.strptime(start, '%Y-%m-%d').date() if start else today
+    end_day = datetime.strptime(end, '%Y-%m-%d').date() if end else start_day
+    if end_day < start_day:
+        raise ValueError('end is before start')
+    midnight = datetime.min.time()
+    return (
+        timezone.make_aware(datetime.combine(start_day, midnight)),
+        timezone.make_aware(datetime.combine(end_day + timedelta(days=1), midnight)),
+    )
+
+
+def export_rows(kind, created_from, created_to):
+    # Range on created_at (not __date) so order_created_idx drives the scan
+    if kind == 'items':
+        queryset = OrderItem.objects.filter(
+            order__created_at__gte=created_from, order__created_at__lt=created_to
+        ).order_by('order__created_at', 'order_id', 'id')
+    else:
+        queryset = Order.objects.filter(
+            created_at__gte=created_from, created_at__lt=created_to
+        ).order_by('created_at', 'id')
+    if created_from >= archive.cutoff():
+        return queryset.values_list(*KINDS[kind]).iterator(chunk_size=CHUNK_SIZE)
+    # Merge both streams on (created_at, order id), then drop the id again
+    order_id = 'order_id' if kind == 'items' else 'id'
+    rows = queryset.values_list(order_id, *KINDS[kind]).iterator(chunk_size=CHUNK_SIZE)
+    archived = archive.export_rows(kind, KINDS[kind], created_from, created_to)
+    return (row[1:] for row in heapq.merge(rows, archived, key=lambda row: (row[2], row[0])))
+
+
+def _header(kind):
+    return [field.replace('order__', '') for field in KINDS[kind]]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def _as_text(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(kind, rows):
+    writer = csv.writer(_Echo())
+    header = _header(kind)
+    text = [index for index, field in enumerate(header) if field in TEXT_FIELDS]
+    yield writer.writerow(header)
+    for row in rows:
+        row = list(row)
+        for index in text:
+            row[index] = _as_text(row[index])
+        yield writer.writerow(row)
+
+
+def ndjson_lines(kind, rows):
+    header = _header(kind)
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def export_lines(kind, output, created_from, created_to):
+    encode = csv_lines if output == 'csv' else ndjson_lines
+    return encode(kind, export_rows(kind, created_from, created_to))
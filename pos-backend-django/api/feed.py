@@ -0,0 +1,204 @@
+"""
+Incremental order change feed.
+
+Clients hold an opaque cursor ``<updated_at microseconds>-<order id>`` and ask
+for everything that changed after it, ordered by (updated_at, id) so ties on
+the timestamp never drop or repeat a row across pages.
+
+Commit order is not timestamp order: a transaction can commit after one that
+stamped a later ``updated_at``, putting its row behind a cursor that already
+moved past. So every read also goes FEED_OVERLAP back, and the cursor carries
+``~<id>.<microseconds behind>`` for each row it already delivered in that
+window; a row behind the cursor is sent only if its ``(id, updated_at)`` is
+not among them.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+
+from .models import ACTIVE_ORDER_STATUSES, Order
+from .renderers import FastJSONRenderer
+from .serializers import OrderSerializer
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+FEED_LIMIT = 200
+# Longest an order write may sit between stamping updated_at and committing
+FEED_OVERLAP = timedelta(seconds=5)
+# Delivered rows a cursor remembers; past that the oldest may be sent again
+SEEN_LIMIT = 500
+
+
+def _micros(timestamp):
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def encode_cursor(order, field='updated_at'):
+    return f"{_micros(getattr(order, field))}-{order.pk}"
+
+
+def decode_cursor(value):
+    """Return ``(timestamp, id)`` or raise ValueError for a malformed cursor."""
+    micros, _, pk = value.partition('-')
+    pk = int(pk)
+    try:
+        timestamp = EPOCH + timedelta(microseconds=int(micros))
+    except (OverflowError, OSError) as exc:
+        # Well-formed numbers outside the datetime range
+        raise ValueError(f'Cursor out of range: {value}') from exc
+    if not 0 <= pk < 2 ** 63:
+        # Would overflow the id column's 64-bit integer in the query
+        raise ValueError(f'Cursor out of range: {value}')
+    return timestamp, pk
+
+
+def encode_feed_cursor(position, seen=()):
+    """Feed cursor at ``position`` ``(updated_at, id)``, remembering ``seen`` ``(id, updated_at)`` pairs."""
+    micros = _micros(position[0])
+    # Newest first, ties by id: an unchanged cursor encodes the same
+    seen = sorted(seen, key=lambda row: (row[1], row[0]), reverse=True)[:SEEN_LIMIT]
+    return f"{micros}-{position[1]}" + ''.join(f"~{pk}.{micros - _micros(updated_at)}" for pk, updated_at in seen)
+
+
+def decode_feed_cursor(value):
+    """Return ``(timestamp, id, seen)`` or raise ValueError for a malformed cursor."""
+    position, *entries = value.split('~')
+    timestamp, pk = decode_cursor(position)
+    if len(entries) > SEEN_LIMIT:
+        raise ValueError(f'Cursor out of range: {value}')
+    seen = set()
+    for entry in entries:
+        row, _, behind = entry.partition('.')
+        seen.add((int(row), timestamp - timedelta(microseconds=int(behind))))
+    return timestamp, pk, seen
+
+
+def _recent():
+    return Order.objects.order_by('-updated_at', '-id').values_list('id', 'updated_at')[:SEEN_LIMIT]
+
+
+def _latest_cursor(recent):
+    # Everything in the overlap window is already on the board
+    if not recent:
+        return '0-0'
+    pk, updated_at = recent[0]
+    return encode_feed_cursor((updated_at, pk), [row for row in recent if row[1] >= updated_at - FEED_OVERLAP])
+
+
+def latest_cursor():
+    return _latest_cursor(list(_recent()))
+
+
+async def alatest_cursor():
+    return _latest_cursor([row async for row in _recent()])
+
+
+def _board():
+    return Order.objects.prefetch_related('items').filter(status__in=ACTIVE_ORDER_STATUSES).order_by('-created_at')
+
+
+def _window(updated_at, seen, limit):
+    # Up to len(seen) rows of the window are skipped as already delivered
+    return (
+        Order.objects.prefetch_related('items')
+        .filter(updated_at__gte=updated_at - FEED_OVERLAP)
+        .order_by('updated_at', 'id')[:limit + 1 + len(seen)]
+    )
+
+
+def _page(rows, cursor, limit):
+    updated_at, pk, seen = cursor
+    position = (updated_at, pk)
+    fresh = [
+        order for order in rows
+        if (order.updated_at, order.pk) > position or (order.pk, order.updated_at) not in seen
+    ]
+    has_more = len(fresh) > limit
+    orders = fresh[:limit]
+    if not orders:
+        return orders, encode_feed_cursor(position, seen), has_more
+
+    position = max(position, (orders[-1].updated_at, orders[-1].pk))
+    sent = seen | {(order.pk, order.updated_at) for order in orders}
+    start = position[0] - FEED_OVERLAP
+    seen = [
+        (order.pk, order.updated_at) for order in rows
+        if (order.pk, order.updated_at) in sent and (order.updated_at, order.pk) <= position
+        and order.updated_at >= start
+    ]
+    return orders, encode_feed_cursor(position, seen), has_more
+
+
+def changes_since(cursor, limit=FEED_LIMIT):
+    """
+    Orders changed after ``cursor`` as ``(orders, next_cursor, has_more)``.
+
+    Without a cursor the caller gets the live board (every active order) and
+    a cursor positioned at the newest change, so the next call is incremental.
+    """
+    if cursor is None:
+        next_cursor = latest_cursor()
+        return list(_board()), next_cursor, False
+    cursor = decode_feed_cursor(cursor)
+    return _page(list(_window(cursor[0], cursor[2], limit)), cursor, limit)
+
+
+async def achanges_since(cursor, limit=FEED_LIMIT):
+    """``changes_since`` through the async ORM interface."""
+    if cursor is None:
+        next_cursor = await alatest_cursor()
+        return [order async for order in _board()], next_cursor, False
+    cursor = decode_feed_cursor(cursor)
+    return _page([order async for order in _window(cursor[0], cursor[2], limit)], cursor, limit)
+
+
+def render_event(orders, cursor):
+    """Format a batch of changed orders as one Server-Sent Event."""
+    data = FastJSONRenderer().render(OrderSerializer(orders, many=True).data).decode()
+    return f"id: {cursor}\nevent: orders\ndata: {data}\n\n"
+
+
+class OrderFeedHub:
+    """
+    Fans a single DB poll per process out to every connected stream client,
+    so twenty kitchen screens on one worker cost one query per interval.
+    """
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self._subscribers = set()
+        self._cursor = None
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def seed(self, cursor):
+        # The first subscriber's catch-up cursor starts the hub, so nothing
+        # committed between that catch-up and the first poll is skipped.
+        if self._cursor is None:
+            self._cursor = cursor
+
+    async def _run(self):
+        while self._subscribers:
+            if self._cursor is not None:
+                orders, self._cursor, has_more = await achanges_since(self._cursor)
+                if orders:
+                    # Serialize once per change, not once per connected screen
+                    event = await sync_to_async(render_event)(orders, self._cursor)
+                    for queue in list(self._subscribers):
+                        queue.put_nowait(event)
+                if has_more:
+                    continue
+            await asyncio.sleep(self.interval)
+        self._cursor = None
+
+
+hub = OrderFeedHub()
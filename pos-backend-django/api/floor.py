@@ -0,0 +1,115 @@
+"""
+Table occupancy.
+
+Each table tracks its current seating session on its own row: how many of
+its orders are still on the kitchen board, their running total, when the
+session started and the latest order. Order events adjust those counters with
+one conditional UPDATE inside the order's transaction, so occupancy never
+drifts from the orders and the floor plan is a single Table/Order join.
+
+A table becomes ``occupied`` when an active order is placed on it and
+``available`` again when its last active order is served or cancelled.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Value, When
+from django.utils import timezone
+
+from .models import ACTIVE_ORDER_STATUSES, Table
+
+# Statuses staff may set by hand; 'occupied' only ever comes from orders
+MANUAL_TRANSITIONS = {
+    'available': {'reserved', 'cleaning'},
+    'reserved': {'available', 'cleaning'},
+    'cleaning': {'available', 'reserved'},
+    'occupied': {'available', 'cleaning'},
+}
+
+_money = DecimalField(max_digits=10, decimal_places=2)
+_UNCHANGED = object()
+
+
+def check_manual_status(table, status):
+    """Raise ValueError unless staff may move ``table`` to ``status``."""
+    if status == table.status:
+        return
+    if status not in MANUAL_TRANSITIONS.get(table.status, ()):
+        raise ValueError(f'Cannot change a table from {table.status} to {status}')
+    if table.active_orders:
+        raise ValueError('Table still has orders on the board')
+
+
+def _open(table_id, count, total, latest_id):
+    # SET expressions all see the pre-update row: active_orders=0 means
+    # this order starts a new session
+    Table.objects.filter(pk=table_id).update(
+        status='occupied',
+        active_orders=F('active_orders') + count,
+        session_total=Case(
+            When(active_orders=0, then=Value(total, output_field=_money)),
+            default=F('session_total') + Value(total, output_field=_money),
+        ),
+        occupied_since=Case(When(active_orders=0, then=Value(timezone.now())), default=F('occupied_since')),
+        active_order_id=latest_id,
+    )
+
+
+def _close(table_id, refund):
+    # The last active order leaving the board ends the session
+    Table.objects.filter(pk=table_id, active_orders__gt=0).update(
+        active_orders=F('active_orders') - 1,
+        status=Case(When(active_orders=1, then=Value('available')), default=F('status')),
+        session_total=Case(
+            When(active_orders=1, then=Value(Decimal('0'), output_field=_money)),
+            default=F('session_total') - Value(refund, output_field=_money),
+        ),
+        occupied_since=Case(When(active_orders=1, then=Value(None)), default=F('occupied_since')),
+        active_order_id=Case(When(active_orders=1, then=Value(None)), default=F('active_order_id')),
+    )
+
+
+def _is_seated(order):
+    return bool(order.table_id) and order.status in ACTIVE_ORDER_STATUSES
+
+
+def order_created(order):
+    if _is_seated(order):
+        _open(order.table_id, 1, order.total_amount, order.pk)
+
+
+def orders_created(orders):
+    """Batch version of ``order_created``: one UPDATE per table."""
+    per_table = defaultdict(lambda: [0, Decimal('0'), None])
+    for order in orders:
+        if _is_seated(order):
+            entry = per_table[order.table_id]
+            entry[0] += 1
+            entry[1] += Decimal(order.total_amount)
+            entry[2] = order.pk
+    for table_id, (count, total, latest_id) in per_table.items():
+        _open(table_id, count, total, latest_id)
+
+
+def status_changed(order, old_status, old_table_id=_UNCHANGED):
+    """Apply a status change (and, from full updates, a move between tables)."""
+    old_table_id = order.table_id if old_table_id is _UNCHANGED else old_table_id
+    was_seated = bool(old_table_id) and old_status in ACTIVE_ORDER_STATUSES
+    is_seated = _is_seated(order)
+    if was_seated and is_seated and old_table_id == order.table_id:
+        return
+    if was_seated:
+        # A served order stays in the session total until the table clears
+        _close(old_table_id, order.total_amount if order.status == 'cancelled' or is_seated else 0)
+    if is_seated:
+        _open(order.table_id, 1, order.total_amount, order.pk)
+
+
+def order_deleted(order):
+    if _is_seated(order):
+        _close(order.table_id, order.total_amount)
+
+
+def floor_plan():
+    """Every table with its session and latest order, in one query."""
+    return Table.objects.select_related('active_order').order_by('id')
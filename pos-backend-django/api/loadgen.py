@@ -0,0 +1,172 @@
+"""
+Synthetic production-scale data for benchmarks and load tests.
+
+Rows are generated and bulk-inserted one chunk at a time, so memory stays
+bounded by ``chunk_size`` however many millions of orders are requested.
+Distributions are shaped after a busy venue: lunch and dinner peaks, busier
+weekends, a long tail of product popularity and mostly small tickets.
+
+Each chunk goes through the same batch hooks as synced offline orders
+(api/sync.py), so the data is what the app itself would have written: dine-in
+orders sit at real tables, orders still on the board have their station
+tickets and open their table's session, and customers' points come from
+``LoyaltyEntry`` rows for their served orders.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import floor, loyalty, stations
+from .models import ACTIVE_ORDER_STATUSES, Customer, Order, OrderItem, Table, Ticket
+
+# Relative order volume per hour of day (0-23) and weekday (Mon-Sun)
+HOUR_WEIGHTS = [1, 0, 0, 0, 0, 0, 1, 3, 5, 4, 4, 8, 14, 15, 9, 5, 4, 6, 11, 15, 14, 9, 5, 2]
+WEEKDAY_WEIGHTS = [8, 8, 9, 10, 13, 15, 12]
+ITEMS_PER_ORDER = (list(range(1, 13)), [20, 24, 18, 12, 8, 6, 4, 3, 2, 1, 1, 1])
+QUANTITIES = ((1, 2, 3, 4), (70, 20, 7, 3))
+PAYMENT_METHODS = (('card', 'cash', 'qr'), (55, 30, 15))
+ORDER_TYPES = (('dine-in', 'takeaway', 'delivery'), (60, 30, 10))
+WAITERS = ('John', 'Sarah', 'Mike', 'Priya', 'Arjun', 'Lena')
+ACTIVE_WINDOW = timedelta(hours=2)
+CANCEL_RATE = 0.04
+DISCOUNT_RATE = 0.1
+CUSTOMER_RATE = 0.3  # orders rung up against a loyalty customer
+
+
+@contextmanager
+def explicit_timestamps(model):
+    # auto_now/auto_now_add would stamp every synthetic row with "now"
+    fields = [
+        field for field in model._meta.fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class LoadDataGenerator:
+    def __init__(self, products, days=365, tables=None, seed=None):
+        """
+        ``products`` should carry ``station_route`` (``stations.routed_products``)
+        for active orders to get tickets; ``tables`` defaults to every active
+        table. Without tables, dine-in orders go unseated.
+        """
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.days = days
+        self.tables = list(Table.objects.filter(is_active=True) if tables is None else tables)
+        self.customer_ids = []
+        self.products = list(products)
+        # Zipf-like popularity: the top few dishes dominate
+        self.product_weights = [1 / rank for rank in range(1, len(self.products) + 1)]
+        self.run_id = f'{int(time.time()):x}'
+
+    def created_at(self):
+        rnd = self.random
+        while True:
+            day = self.now - timedelta(days=rnd.randrange(self.days))
+            if rnd.random() * max(WEEKDAY_WEIGHTS) < WEEKDAY_WEIGHTS[day.weekday()]:
+                break
+        hour = rnd.choices(range(24), HOUR_WEIGHTS)[0]
+        moment = day.replace(hour=hour, minute=rnd.randrange(60), second=rnd.randrange(60))
+        return min(moment, self.now)
+
+    def status(self, created_at):
+        if self.now - created_at < ACTIVE_WINDOW:
+            return self.random.choice(ACTIVE_ORDER_STATUSES)
+        return 'cancelled' if self.random.random() < CANCEL_RATE else 'served'
+
+    def order_with_items(self, number):
+        rnd = self.random
+        created_at = self.created_at()
+        items = []
+        if self.products:
+            count = rnd.choices(*ITEMS_PER_ORDER)[0]
+            for product in rnd.choices(self.products, self.product_weights, k=count):
+                items.append(OrderItem(
+                    product=product, product_name=product.name, price=product.price,
+                    quantity=rnd.choices(*QUANTITIES)[0],
+                ))
+        subtotal = sum((item.price * item.quantity for item in items), Decimal('0'))
+        discount = Decimal('0')
+        if rnd.random() < DISCOUNT_RATE:
+            discount = (subtotal * Decimal(rnd.choice((5, 10, 15))) / 100).quantize(Decimal('0.01'))
+        order_type = rnd.choices(*ORDER_TYPES)[0]
+        table = rnd.choice(self.tables) if order_type == 'dine-in' and self.tables else None
+        customer_id = None
+        if self.customer_ids and rnd.random() < CUSTOMER_RATE:
+            customer_id = rnd.choice(self.customer_ids)
+        order = Order(
+            order_number=f'LOAD-{self.run_id}-{number}',
+            table=table, table_number=table.table_number if table else None, customer_id=customer_id,
+            status=self.status(created_at), subtotal=subtotal, discount=discount,
+            total_amount=subtotal - discount, payment_method=rnd.choices(*PAYMENT_METHODS)[0],
+            order_type=order_type, waiter_name=rnd.choice(WAITERS),
+            created_at=created_at, updated_at=created_at,
+        )
+        return order, items
+
+    def insert_orders(self, count, chunk_size=5000, with_items=True):
+        """Bulk-insert ``count`` orders; yields the running total after each chunk."""
+        for offset in range(0, count, chunk_size):
+            orders, items = [], []
+            for number in range(offset, min(offset + chunk_size, count)):
+                order, order_items = self.order_with_items(number)
+                orders.append(order)
+                items.append(order_items)
+            with transaction.atomic():
+                with explicit_timestamps(Order):
+                    Order.objects.bulk_create(orders)
+                if with_items:
+                    for order, order_items in zip(orders, items):
+                        for item in order_items:
+                            item.order = order
+                    self.route_active(orders, items)
+                    OrderItem.objects.bulk_create(
+                        [item for order_items in items for item in order_items], batch_size=chunk_size
+                    )
+                floor.orders_created(orders)
+                loyalty.orders_created(orders)
+            yield offset + len(orders)
+
+    def route_active(self, orders, items):
+        # Only orders still on the board have live tickets; the kitchen's
+        # history is not part of the load. Tickets then follow their order.
+        active = [(order, order_items) for order, order_items in zip(orders, items)
+                  if order.status in ACTIVE_ORDER_STATUSES]
+        stations.route_orders(active)
+        preparing = [order.pk for order, _ in active if order.status == 'preparing']
+        Ticket.objects.filter(order__in=preparing).update(status='preparing', started_at=self.now)
+        for order, _ in active:
+            if order.status == 'ready':
+                stations.order_status_changed(order, 'pending')
+
+    def insert_customers(self, count, chunk_size=5000):
+        for offset in range(0, count, chunk_size):
+            customers = []
+            for number in range(offset, min(offset + chunk_size, count)):
+                joined = self.created_at()
+                # Points are earned by their served orders, never set here
+                customers.append(Customer(
+                    name=f'Customer {self.run_id}-{number}',
+                    phone=f'9{int(self.run_id, 16) % 1000:03d}{number:07d}',
+                    created_at=joined, updated_at=joined,
+                ))
+            with explicit_timestamps(Customer):
+                Customer.objects.bulk_create(customers)
+            if customers and customers[0].pk is None:
+                # Backends that cannot return ids from a bulk insert
+                customers = Customer.objects.filter(phone__in=[customer.phone for customer in customers])
+            self.customer_ids += [customer.pk for customer in customers]
+            yield offset + len(customers)
@@ -0,0 +1,124 @@
+"""
+Customer loyalty points.
+
+An order linked to a customer earns ``LOYALTY_POINTS_PER_UNIT`` points per
+unit of its total once it is served, and gives them back if it leaves
+``served`` again or is deleted. Every change is an append-only
+``LoyaltyEntry``; ``Customer.loyalty_points`` is the ledger's running sum,
+moved with ``F()`` UPDATEs in the order's transaction so concurrent
+terminals never overwrite each other's balance.
+
+An order's earn/reverse entries are numbered by ``sequence`` and unique per
+order: when two terminals serve the same order at once, both try to insert
+the same entry and the second one's insert fails, so it backs off instead of
+crediting the order twice.
+"""
+from collections import defaultdict
+from decimal import ROUND_FLOOR, Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Customer, LoyaltyEntry
+
+EARN_STATUS = 'served'
+POINTS_PER_UNIT = Decimal(str(getattr(settings, 'LOYALTY_POINTS_PER_UNIT', 1)))
+LOOKUP_MIN_LENGTH = 3
+LOOKUP_LIMIT = 10
+LOOKUP_FIELDS = ('id', 'name', 'phone', 'loyalty_points')
+STATEMENT_LIMIT = 20
+
+
+def points_for(order):
+    """Points ``order`` earns once served (0 without a customer)."""
+    if not order.customer_id or order.status != EARN_STATUS:
+        return 0
+    points = (Decimal(order.total_amount) * POINTS_PER_UNIT).to_integral_value(rounding=ROUND_FLOOR)
+    return max(int(points), 0)
+
+
+def _credit(customer_id, points):
+    Customer.objects.filter(pk=customer_id).update(loyalty_points=F('loyalty_points') + points)
+
+
+def _post(order, customer_id, sequence, points, reason):
+    """Append one order entry and move the balance; False if another terminal got there first."""
+    try:
+        with transaction.atomic():
+            LoyaltyEntry.objects.create(
+                customer_id=customer_id, order=order, sequence=sequence, points=points, reason=reason
+            )
+    except IntegrityError:
+        return False
+    _credit(customer_id, points)
+    return True
+
+
+def _settle(order, points):
+    # Bring the order's credit to ``points`` for its current customer
+    last = LoyaltyEntry.objects.filter(order=order).order_by('-sequence').values_list(
+        'sequence', 'customer_id', 'points', 'reason'
+    ).first()
+    sequence = last[0] + 1 if last else 0
+    if last and last[3] == 'earn':
+        if (last[1], last[2]) == (order.customer_id, points):
+            return
+        if not _post(order, last[1], sequence, -last[2], 'reverse'):
+            return
+        sequence += 1
+    if points:
+        _post(order, order.customer_id, sequence, points, 'earn')
+
+
+def order_created(order):
+    points = points_for(order)
+    if points:
+        _post(order, order.customer_id, 0, points, 'earn')
+
+
+def orders_created(orders):
+    """Batch version of ``order_created``: one INSERT, one UPDATE per customer."""
+    entries = []
+    per_customer = defaultdict(int)
+    for order in orders:
+        points = points_for(order)
+        if points:
+            entries.append(LoyaltyEntry(customer_id=order.customer_id, order=order, points=points, reason='earn'))
+            per_customer[order.customer_id] += points
+    LoyaltyEntry.objects.bulk_create(entries)
+    for customer_id, points in per_customer.items():
+        _credit(customer_id, points)
+
+
+def status_changed(order, old_status):
+    """Credit or reverse on a status change (or a served order's customer or total changing)."""
+    if EARN_STATUS in (old_status, order.status):
+        _settle(order, points_for(order))
+
+
+def order_deleted(order):
+    if order.status == EARN_STATUS:
+        _settle(order, 0)
+
+
+def adjust(customer, points, note=''):
+    """Manual correction by staff; returns the new entry."""
+    with transaction.atomic():
+        entry = LoyaltyEntry.objects.create(customer=customer, points=points, reason='adjust', note=note)
+        _credit(customer.pk, points)
+    return entry
+
+
+def statement(customer_id, limit=STATEMENT_LIMIT):
+    return LoyaltyEntry.objects.filter(customer_id=customer_id).order_by('-created_at', '-id')[:limit]
+
+
+def find_by_phone(prefix, limit=LOOKUP_LIMIT):
+    """Customers whose phone starts with ``prefix``, for the checkout screen."""
+    # SQLite never runs LIKE ... ESCAPE off an index; the equivalent range
+    # lets it (and PostgreSQL) seek straight to the prefix
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Customer.objects.filter(
+        phone__startswith=prefix, phone__gte=prefix, phone__lt=upper
+    ).order_by('phone')[:limit]
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import archive
+
+
+class Command(BaseCommand):
+    help = 'Move served/cancelled orders older than ARCHIVE_AFTER_DAYS into the archive tables (run nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=archive.ARCHIVE_AFTER_DAYS,
+            help='Archive orders older than this many days (at least ARCHIVE_AFTER_DAYS)'
+        )
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if options['days'] < archive.ARCHIVE_AFTER_DAYS:
+            # Reads assume nothing newer than ARCHIVE_AFTER_DAYS is archived
+            raise CommandError(f'--days must be at least ARCHIVE_AFTER_DAYS ({archive.ARCHIVE_AFTER_DAYS})')
+        before = archive.cutoff(options['days'])
+        started = time.perf_counter()
+        moved = archive.archive_orders(before, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully archived {moved} orders created before {before:%Y-%m-%d %H:%M} '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
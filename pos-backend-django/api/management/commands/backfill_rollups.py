@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api import rollups
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized sales rollups from existing orders'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding sales rollups...')
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} sales buckets'))
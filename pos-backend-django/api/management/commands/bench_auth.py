@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from api.auth import TokenUserAuthentication, user_cache
+from api.serializers import CustomTokenObtainPairSerializer
+
+class Command(BaseCommand):
+    help = 'Benchmark per-request JWT authentication: user row lookup (old) vs token claims'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        user = User.objects.create_user(username=f'bench-auth-{time.time_ns()}', password=None)
+        try:
+            claims_token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+            plain_token = str(AccessToken.for_user(user))
+            variants = (
+                ('JWTAuthentication (old)', JWTAuthentication(), plain_token),
+                ('token claims', TokenUserAuthentication(), claims_token),
+                ('user cache (old tokens)', TokenUserAuthentication(), plain_token),
+            )
+            factory = APIRequestFactory()
+            user_cache.clear()
+
+            self.stdout.write(f"{'variant':<26}{'queries/req':>12}{'us/req':>9}{'req/s':>10}")
+            for name, authenticator, token in variants:
+                requests = [
+                    Request(factory.get('/api/orders/', HTTP_AUTHORIZATION=f'Bearer {token}'))
+                    for _ in range(options['requests'])
+                ]
+                # Query capture slows the DB path down, so it gets its own pass
+                with CaptureQueriesContext(connection) as ctx:
+                    for request in requests[:100]:
+                        authenticator.authenticate(request)
+                started = time.perf_counter()
+                for request in requests:
+                    authenticator.authenticate(request)
+                per_request = (time.perf_counter() - started) / options['requests']
+                self.stdout.write(
+                    f'{name:<26}{len(ctx.captured_queries) / 100:>12.2f}'
+                    f'{per_request * 1e6:>9.0f}{1 / per_request:>10.0f}'
+                )
+        finally:
+            user.delete()
@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from api import rollups
+from api.models import Order, Product
+from api.serializers import OrderSerializer
+
+# SQLite as it ran before the WAL profile: rollback journal, deferred
+# transactions and sqlite3's 5 s busy timeout. journal_mode sticks to the
+# database file, so it has to be set back explicitly
+LEGACY_SQLITE = {'init_command': 'PRAGMA journal_mode=DELETE;', 'timeout': 5}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent order writers: lock errors and throughput per database profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=50, help='Parallel writer threads')
+        parser.add_argument('--orders', type=int, default=20, help='Orders each writer creates')
+        parser.add_argument('--readers', type=int, default=0, help='Threads polling the order list meanwhile')
+
+    def handle(self, *args, **options):
+        product = Product.objects.first()
+        if product is None:
+            self.stdout.write(self.style.ERROR('No products found. Run seed_data first.'))
+            return
+        payload = {
+            'payment_method': 'cash',
+            'order_type': 'takeaway',
+            'discount': 0,
+            'items_data': [
+                {'productId': product.id, 'name': product.name, 'price': str(product.price), 'quantity': 2},
+            ],
+        }
+
+        database = connections.settings['default']
+        tuned = database.get('OPTIONS', {})
+        profiles = [('settings', tuned)]
+        if connection.vendor == 'sqlite':
+            profiles.insert(0, ('legacy sqlite', LEGACY_SQLITE))
+
+        self.stdout.write(
+            f"{'profile':<15}{'writers':>8}{'orders':>8}{'errors':>8}{'error %':>9}{'orders/s':>10}{'p95 ms':>8}"
+            f"{'reads/s':>9}{'read errors':>12}"
+        )
+        created_ids = []
+        try:
+            for name, profile in profiles:
+                database['OPTIONS'] = profile
+                connections.close_all()
+                results, seconds, reads, read_errors = self.run(
+                    payload, options['writers'], options['orders'], options['readers']
+                )
+                ids = [pk for pk, _ in results if pk]
+                created_ids += ids
+                latencies = [elapsed for pk, elapsed in results if pk]
+                errors = len(results) - len(ids)
+                self.stdout.write(
+                    f'{name:<15}{options["writers"]:>8}{len(results):>8}{errors:>8}'
+                    f'{errors / len(results) * 100:>9.1f}{len(ids) / seconds:>10.1f}'
+                    f'{percentile(latencies, 0.95) * 1000:>8.0f}{reads / seconds:>9.1f}{read_errors:>12}'
+                )
+        finally:
+            database['OPTIONS'] = tuned
+            connections.close_all()
+            # Benchmark orders must never leak into real reporting
+            for order in Order.objects.filter(id__in=created_ids):
+                rollups.order_deleted(order)
+            Order.objects.filter(id__in=created_ids).delete()
+
+    @staticmethod
+    def run(payload, writers, orders, readers):
+        done = threading.Event()
+
+        def reader(_):
+            reads = errors = 0
+            try:
+                while not done.is_set():
+                    try:
+                        list(Order.objects.order_by('-id').values_list('id', 'status')[:50])
+                        reads += 1
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        errors += 1
+            finally:
+                connection.close()
+            return reads, errors
+
+        def writer(_):
+            results = []
+            try:
+                for _ in range(orders):
+                    started = time.perf_counter()
+                    try:
+                        serializer = OrderSerializer(data=payload)
+                        serializer.is_valid(raise_exception=True)
+                        results.append((serializer.save().id, time.perf_counter() - started))
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        results.append((None, time.perf_counter() - started))
+            finally:
+                connection.close()
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=writers + readers) as pool:
+            polling = [pool.submit(reader, i) for i in range(readers)]
+            try:
+                results = [result for chunk in pool.map(writer, range(writers)) for result in chunk]
+            finally:
+                done.set()
+            seconds = time.perf_counter() - started
+            reads = [future.result() for future in polling]
+        return results, seconds, sum(count for count, _ in reads), sum(errors for _, errors in reads)
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import Order, Product
+from api.serializers import OrderSerializer
+
+class Command(BaseCommand):
+    help = 'Benchmark order ingest: queries per order and orders/sec as item count grows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=50, help='Orders created per item count')
+        parser.add_argument('--items', type=int, nargs='+', default=[1, 4, 12, 32], help='Item counts to measure')
+
+    def handle(self, *args, **options):
+        products = list(Product.objects.all()[:32])
+        if not products:
+            self.stdout.write(self.style.ERROR('No products found. Run seed_data first.'))
+            return
+
+        self.stdout.write(f"{'items':>6} {'queries/order':>14} {'orders/sec':>11}")
+        created_ids = []
+        try:
+            for item_count in options['items']:
+                payload = {
+                    'payment_method': 'cash',
+                    'order_type': 'dine-in',
+                    'discount': 0,
+                    'items_data': [
+                        {
+                            'productId': products[i % len(products)].id,
+                            'name': products[i % len(products)].name,
+                            'price': str(products[i % len(products)].price),
+                            'quantity': 1,
+                        }
+                        for i in range(item_count)
+                    ],
+                }
+
+                with CaptureQueriesContext(connection) as ctx:
+                    started = time.perf_counter()
+                    for _ in range(options['orders']):
+                        serializer = OrderSerializer(data=payload)
+                        serializer.is_valid(raise_exception=True)
+                        created_ids.append(serializer.save().id)
+                    elapsed = time.perf_counter() - started
+
+                queries = len(ctx.captured_queries) / options['orders']
+                rate = options['orders'] / elapsed if elapsed else float('inf')
+                self.stdout.write(f'{item_count:>6} {queries:>14.1f} {rate:>11.1f}')
+        finally:
+            # Benchmark orders must never leak into real reporting
+            Order.objects.filter(id__in=created_ids).delete()
@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from api import pricing
+from api.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Benchmark batch cart pricing: per-line Decimal (old) vs the integer-cents engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carts', type=int, default=20000, help='Synthetic carts to price')
+        parser.add_argument('--stored', type=int, default=20000, help='Most recent stored orders to re-price')
+        parser.add_argument('--tax-rate', default='0.0825')
+        parser.add_argument('--repeat', type=int, default=3, help='Best of this many runs')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        tax_rate = options['tax_rate']
+        catalog = pricing.Catalog.load()
+        if not catalog.prices:
+            catalog = pricing.Catalog({pk: rng.randint(100, 5000) for pk in range(1, 301)})
+        product_ids = list(catalog.prices)
+        synthetic = [
+            (
+                [
+                    (rng.choice(product_ids), None, rng.randint(1, 4)) if rng.random() < 0.9
+                    else (None, f'{rng.randint(50, 2000) / 100:.2f}', 1)
+                    for _ in range(rng.randint(1, 8))
+                ],
+                rng.choice(('0', '0', '0', '1.50', '5.00')),
+            )
+            for _ in range(options['carts'])
+        ]
+        recent = Order.objects.order_by('-id').values('id')[:options['stored']]
+        started = time.perf_counter()
+        stored = pricing.carts(Order.objects.filter(id__in=recent))
+        load = time.perf_counter() - started
+        what_if = catalog.with_prices({pk: '9.99' for pk in product_ids[:10]})
+
+        def legacy(carts):
+            return [pricing.reference_price(lines, what_if, discount, tax_rate) for lines, discount in carts]
+
+        def engine(carts):
+            return pricing.price_carts(carts, what_if, tax_rate)
+
+        self.stdout.write(f'{len(stored)} stored orders loaded in {load * 1000:.0f} ms; tax rate {tax_rate}')
+        self.stdout.write(f"{'carts':<18}{'engine':<22}{'ms':>9}{'carts/s':>11}")
+        for label, carts in (('synthetic', synthetic), ('stored orders', stored)):
+            if not carts:
+                continue
+            results = []
+            for name, price in (('per-line Decimal (old)', legacy), ('integer cents', engine)):
+                best = float('inf')
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    totals = price(carts)
+                    best = min(best, time.perf_counter() - started)
+                results.append(totals)
+                self.stdout.write(f'{label:<18}{name:<22}{best * 1000:>9.1f}{len(carts) / best:>11.0f}')
+            if results[0] != results[1]:
+                self.stderr.write(f'{label}: engine and per-line Decimal totals differ')
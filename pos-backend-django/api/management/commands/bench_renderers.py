@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import compress_string
+from rest_framework.renderers import JSONRenderer
+from api import compression, renderers
+from api.models import Order
+from api.serializers import OrderSerializer
+
+
+def best_of(repeat, func):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = 'Benchmark order list bodies: render CPU and bytes on the wire per renderer and encoding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--repeat', type=int, default=5, help='Best of this many runs')
+
+    def handle(self, *args, **options):
+        variants = [('json (DRF)', JSONRenderer()), ('json (orjson)', renderers.FastJSONRenderer())]
+        if renderers.orjson is None:
+            self.stdout.write('orjson is not installed: FastJSONRenderer falls back to json')
+        if renderers.msgpack is not None:
+            variants.append(('msgpack', renderers.MessagePackRenderer()))
+        codings = [('gzip', compress_string)]
+        if compression.brotli is not None:
+            codings.append(('br', lambda body: compression.brotli.compress(body, quality=compression.BROTLI_QUALITY)))
+
+        for rows in options['rows']:
+            orders = list(Order.objects.prefetch_related('items').order_by('-created_at', '-id')[:rows])
+            if len(orders) < rows:
+                raise CommandError(f'Only {len(orders)} orders in the database; load more with generate_load_data')
+            serialize, data = best_of(options['repeat'], lambda: OrderSerializer(orders, many=True).data)
+            self.stdout.write(f'\n{rows} orders (serializer {serialize * 1000:.0f} ms)')
+            self.stdout.write(
+                f"{'renderer':<16}{'render ms':>10}{'bytes':>12}"
+                + ''.join(f'{name + " bytes":>12}{name + " ms":>10}' for name, _ in codings)
+            )
+            for name, renderer in variants:
+                render, body = best_of(options['repeat'], lambda: renderer.render(data))
+                line = f'{name:<16}{render * 1000:>10.1f}{len(body):>12}'
+                for _, encode in codings:
+                    seconds, encoded = best_of(options['repeat'], lambda: encode(body))
+                    line += f'{len(encoded):>12}{seconds * 1000:>10.1f}'
+                self.stdout.write(line)
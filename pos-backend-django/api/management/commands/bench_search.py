@@ -0,0 +1,94 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from api import catalog, search
+from api.models import Category, Product
+
+WORDS = (
+    'chicken', 'paneer', 'masala', 'butter', 'garlic', 'cheese', 'spicy', 'crispy', 'veggie', 'smoked',
+    'mango', 'lemon', 'truffle', 'classic', 'double', 'grilled', 'tandoori', 'peri', 'chilli', 'honey',
+)
+DISHES = ('burger', 'pizza', 'wrap', 'biryani', 'noodles', 'salad', 'lassi', 'shake', 'fries', 'tikka')
+SIZES = ('small', 'regular', 'large', 'family')
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark product search (type-ahead) on the full-text index vs icontains at catalog scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=50000, help='Catalog size to measure at')
+        parser.add_argument('--queries', type=int, default=200, help='Search terms typed, one keystroke at a time')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        bench_category = None
+        missing = options['products'] - Product.objects.count()
+        if missing > 0:
+            self.stdout.write(f'Adding {missing} synthetic products...')
+            bench_category = Category.objects.create(name='Bench Search', slug=f'bench-search-{time.time_ns()}')
+            Product.objects.bulk_create(
+                (
+                    Product(
+                        name=f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {rng.choice(DISHES).title()} '
+                             f'{rng.choice(SIZES).title()} {i}',
+                        price=Decimal('5.00'), category=bench_category,
+                    )
+                    for i in range(missing)
+                ),
+                batch_size=5000,
+            )
+            search.rebuild()
+            catalog.bump_version()
+
+        # Every prefix of each term, as the POS search box sends them
+        terms = [' '.join(rng.sample(WORDS + DISHES, rng.choice((1, 1, 2)))) for _ in range(options['queries'])]
+        keystrokes = [term[:n] for term in terms for n in range(2, len(term) + 1) if not term[:n].endswith(' ')]
+        rows = list(Product.objects.values_list('id', 'name', 'category__name'))
+        started = time.perf_counter()
+        trie = search.Trie(rows)
+        trie_build = time.perf_counter() - started
+
+        def legacy(text):
+            # What SearchFilter ran: every match, unranked
+            condition = Q()
+            for term in text.split():
+                condition &= Q(name__icontains=term) | Q(category__name__icontains=term)
+            return list(Product.objects.filter(condition).values_list('id', flat=True))
+
+        index_search = search._SEARCH.get(connection.vendor)
+        engines = [('icontains (old)', legacy), ('trie (in memory)', lambda text: trie.search(search.tokens(text)))]
+        if index_search is not None:
+            engines.insert(1, (
+                f'{connection.vendor} full-text', lambda text: index_search(search.tokens(text), search.SEARCH_LIMIT)
+            ))
+
+        try:
+            self.stdout.write(
+                f'{Product.objects.count()} products, {len(keystrokes)} keystrokes '
+                f'(trie built in {trie_build * 1000:.0f} ms)'
+            )
+            self.stdout.write(f"{'engine':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+            for name, engine in engines:
+                timings = []
+                for text in keystrokes:
+                    started = time.perf_counter()
+                    engine(text)
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f'{name:<22}{percentile(timings, 50):>9.2f}{percentile(timings, 95):>9.2f}'
+                    f'{percentile(timings, 99):>9.2f}{max(timings):>9.2f}'
+                )
+        finally:
+            if bench_category is not None:
+                # Synthetic products must never leak into the real menu
+                bench_category.delete()
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import reports
+
+
+class Command(BaseCommand):
+    help = 'Freeze the Z-reports of a closed business day and its shifts (run nightly; default yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Business day to close, YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        try:
+            day = datetime.strptime(options['date'], '%Y-%m-%d').date() if options['date'] \
+                else timezone.localdate() - timedelta(days=1)
+        except ValueError:
+            raise CommandError('--date must be YYYY-MM-DD')
+        frozen, live = reports.close_day(day)
+        self.stdout.write(self.style.SUCCESS(f'Successfully froze {frozen} Z-reports for {day:%Y-%m-%d}'))
+        if live:
+            self.stdout.write(self.style.WARNING(
+                f'{live} Z-reports left live: their window has not ended or orders in it are still open'
+            ))
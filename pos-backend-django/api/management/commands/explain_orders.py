@@ -0,0 +1,81 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+from api.loadgen import LoadDataGenerator
+from api.models import ACTIVE_ORDER_STATUSES, Customer, Order
+
+class Command(BaseCommand):
+    help = 'Show query plans and latency for the order hot paths with and without the index set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Bulk-insert this many synthetic orders first (e.g. 1000000)')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per query')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'explain_orders supports SQLite and PostgreSQL, not {connection.vendor}')
+        if options['seed']:
+            self.seed(options['seed'])
+
+        total = Order.objects.count()
+        self.stdout.write(f'{total} orders in {connection.vendor}')
+
+        # "Before", in a transaction that is rolled back afterwards
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    # DROP INDEX would hold an ACCESS EXCLUSIVE lock on the
+                    # tables, stalling every terminal until the rollback; the
+                    # planner settings only touch this transaction
+                    for setting in ('enable_indexscan', 'enable_indexonlyscan', 'enable_bitmapscan'):
+                        cursor.execute(f'SET LOCAL {setting} = off')
+                    label = 'without index scans'
+                else:
+                    # Holds SQLite's write lock until the rollback: readers carry
+                    # on (WAL) but other writers queue, so run it off-peak
+                    for model in (Order, Customer):
+                        for index in model._meta.indexes:
+                            cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+                    label = 'without indexes'
+            self.report(label, options['runs'])
+            transaction.set_rollback(True)
+
+        self.report('with indexes', options['runs'])
+
+    def hot_queries(self):
+        now = timezone.now()
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return [
+            ('order list page', Order.objects.order_by('-created_at', '-id')[:50]),
+            ('status filter', Order.objects.filter(status='pending').order_by('-created_at')[:50]),
+            ('kitchen board', Order.objects.filter(status__in=ACTIVE_ORDER_STATUSES).order_by('-created_at')),
+            ('table open ticket', Order.objects.filter(table_number='5', status__in=ACTIVE_ORDER_STATUSES)),
+            ('change feed', Order.objects.filter(updated_at__gt=now - timedelta(minutes=5)).order_by('updated_at', 'id')[:200]),
+            ('today revenue', Order.objects.filter(created_at__gte=start_of_day).values('payment_method').annotate(total=Sum('total_amount'))),
+            ('phone prefix', Customer.objects.filter(phone__startswith='555123')[:10]),
+        ]
+
+    def report(self, label, runs):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'\n== {label} =='))
+        for name, queryset in self.hot_queries():
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f'{name}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms')
+            for line in queryset.explain().splitlines():
+                self.stdout.write(f'    {line}')
+
+    def seed(self, count):
+        self.stdout.write(f'Seeding {count} synthetic orders...')
+        generator = LoadDataGenerator(products=[], days=730)
+        for _ in generator.insert_orders(count, chunk_size=10000, with_items=False):
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Successfully seeded {count} orders'))
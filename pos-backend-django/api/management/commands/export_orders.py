@@ -0,0 +1,42 @@
+import gzip
+import os
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import exports
+
+
+class Command(BaseCommand):
+    help = 'Write gzip-compressed order/item exports for a date range (defaults to yesterday)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day, YYYY-MM-DD')
+        parser.add_argument('--end', help='Last day (inclusive), YYYY-MM-DD')
+        parser.add_argument('--kind', choices=[*exports.KINDS, 'all'], default='all')
+        parser.add_argument('--output', choices=exports.OUTPUTS, default='csv')
+        parser.add_argument('--dest', default='.', help='Directory to write into')
+
+    def handle(self, *args, **options):
+        start = options['start']
+        if not start and not options['end']:
+            start = (timezone.localdate() - timedelta(days=1)).isoformat()
+        try:
+            created_from, created_to = exports.parse_range(start, options['end'])
+        except ValueError as exc:
+            raise CommandError(f'Invalid date range: {exc}')
+
+        kinds = list(exports.KINDS) if options['kind'] == 'all' else [options['kind']]
+        os.makedirs(options['dest'], exist_ok=True)
+        for kind in kinds:
+            name = f"{kind}-{created_from:%Y%m%d}-{created_to - timedelta(days=1):%Y%m%d}.{options['output']}.gz"
+            path = os.path.join(options['dest'], name)
+            lines = 0
+            # Write to a temp name so a nightly job never picks up a partial file
+            with gzip.open(f'{path}.part', 'wt', encoding='utf-8', newline='') as fh:
+                for line in exports.export_lines(kind, options['output'], created_from, created_to):
+                    fh.write(line)
+                    lines += 1
+            os.replace(f'{path}.part', path)
+            self.stdout.write(self.style.SUCCESS(f'Successfully wrote {lines} lines to {path}'))
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from api import rollups, stations
+from api.loadgen import LoadDataGenerator
+from api.models import Product, Table
+
+class Command(BaseCommand):
+    help = 'Bulk-generate production-scale orders, items and customers for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--customers', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=365, help='Spread orders over this many past days')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Rows held in memory per insert')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible datasets')
+        parser.add_argument('--skip-rollups', action='store_true', help='Do not rebuild the sales rollups afterwards')
+
+    def handle(self, *args, **options):
+        product_ids = Product.objects.filter(is_available=True).values_list('id', flat=True)
+        products = list(stations.routed_products(list(product_ids)).values())
+        if not products:
+            self.stdout.write(self.style.ERROR('No products found. Run seed_data first.'))
+            return
+        if not Table.objects.filter(is_active=True).exists():
+            self.stdout.write(self.style.WARNING('No tables found: dine-in orders will not be seated. Run seed_tables'))
+
+        generator = LoadDataGenerator(products, days=options['days'], seed=options['seed'])
+        started = time.perf_counter()
+
+        self.stdout.write(f"Generating {options['customers']} customers...")
+        for done in generator.insert_customers(options['customers'], options['chunk_size']):
+            self.stdout.write(f'  {done} customers', ending='\r')
+        self.stdout.write('')
+
+        self.stdout.write(f"Generating {options['orders']} orders...")
+        for done in generator.insert_orders(options['orders'], options['chunk_size']):
+            rate = done / (time.perf_counter() - started)
+            self.stdout.write(f'  {done} orders ({rate:.0f}/s)', ending='\r')
+        self.stdout.write('')
+
+        if not options['skip_rollups']:
+            self.stdout.write('Rebuilding sales rollups...')
+            rollups.rebuild()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully generated {options['orders']} orders and {options['customers']} customers in {elapsed:.1f}s"
+        ))
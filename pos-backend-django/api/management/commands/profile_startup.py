@@ -0,0 +1,111 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker does before its first response: set Django up,
+# import the URLconf (and with it every view), then, as a worker forked from
+# a preloaded master would, serve a request and see how much memory it had
+# to copy from its parent
+BOOT = '''
+import json, os, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+get_resolver().url_patterns
+connections.close_all()
+result = {
+    'boot_ms': (time.perf_counter() - started) * 1000, 'modules': len(sys.modules),
+    'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}
+
+def private_kb():
+    with open('/proc/self/smaps_rollup') as fh:
+        return sum(int(line.split()[1]) for line in fh if line.startswith(('Private_Clean', 'Private_Dirty')))
+
+if hasattr(os, 'fork') and os.path.exists('/proc/self/smaps_rollup'):
+    result['private_kb'] = private_kb()
+    read, write = os.pipe()
+    forked = time.perf_counter()
+    if os.fork() == 0:
+        from django.test import Client
+        Client().get('/api/', HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        os.write(write, json.dumps({
+            'fork_ms': (time.perf_counter() - forked) * 1000, 'fork_private_kb': private_kb(),
+        }).encode())
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read) as fh:
+        result.update(json.loads(fh.read()))
+    os.wait()
+print(json.dumps(result))
+'''
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = 'Measure worker boot per settings module: time, modules, memory, and import time by package'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-modules', nargs='+', default=['pos_backend.settings', 'pos_backend.settings_api']
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Boots per settings module (median reported)')
+        parser.add_argument('--top', type=int, default=12, help='Packages listed by import time')
+
+    def boot(self, settings_module, importtime=False):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', BOOT]
+        process = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if process.returncode:
+            raise CommandError(f'{settings_module} failed to boot:\n{process.stderr}')
+        return json.loads(process.stdout.splitlines()[-1]), process.stderr
+
+    def handle(self, *args, **options):
+        if os.environ.get('PYTHONDONTWRITEBYTECODE'):
+            self.stdout.write('PYTHONDONTWRITEBYTECODE is set: boot times include compiling every module')
+
+        self.stdout.write(
+            f"{'settings':<26}{'boot ms':>9}{'modules':>9}{'RSS MB':>8}{'private MB':>12}"
+            f"{'fork+1st req ms':>17}{'forked private MB':>19}"
+        )
+        imports = {}
+        for module in options['settings_modules']:
+            self.boot(module)  # warm the bytecode and OS file caches
+            runs = [self.boot(module)[0] for _ in range(options['repeat'])]
+            run = runs[-1]
+            line = (
+                f"{module:<26}{statistics.median(r['boot_ms'] for r in runs):>9.0f}{run['modules']:>9}"
+                f"{run['rss_kb'] / 1024:>8.1f}"
+            )
+            if 'private_kb' in run:
+                line += (
+                    f"{run['private_kb'] / 1024:>12.1f}{statistics.median(r['fork_ms'] for r in runs):>17.1f}"
+                    f"{run['fork_private_kb'] / 1024:>19.1f}"
+                )
+            self.stdout.write(line)
+            imports[module] = self.by_package(self.boot(module, importtime=True)[1])
+
+        for module, packages in imports.items():
+            self.stdout.write(f'\n{module}: import time by top-level package (self time, ms)')
+            for package, microseconds in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+                self.stdout.write(f'  {package:<32}{microseconds / 1000:>8.1f}')
+
+    @staticmethod
+    def by_package(stderr):
+        packages = defaultdict(int)
+        for line in stderr.splitlines():
+            match = IMPORT_TIME.match(line)
+            if match:
+                packages[match.group(4).split('.')[0]] += int(match.group(1))
+        return packages
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from api import search
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index (after bulk product imports)'
+
+    def handle(self, *args, **options):
+        count = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Successfully indexed {count} products'))
@@ -0,0 +1,315 @@
+"""
+Per-route request metrics exported in Prometheus text format.
+
+``MetricsMiddleware`` counts every request and, for a sampled fraction
+(METRICS_SAMPLE_RATE), records latency, DB query count/time, render time and
+response bytes keyed by the resolved URL name (``order-list``,
+``analytics-dashboard``...). Each worker keeps its series in memory and
+writes them to its own JSON file under METRICS_DIR every FLUSH_INTERVAL
+seconds, sampled or not; the ``/api/metrics`` view merges every worker's
+file, so gunicorn workers never contend on a shared lock. Files left by
+workers that have exited are folded into one ``retired.json`` as they are
+collected and then deleted, so restarts neither pile up files nor make the
+counters go backwards.
+"""
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+
+try:
+    import fcntl
+except ImportError:  # Windows dev servers run a single process
+    fcntl = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FLUSH_INTERVAL = 5.0
+RETIRED_FILE = 'retired.json'
+
+
+def _new_series():
+    return {
+        'requests': 0,
+        'sampled': 0,
+        'buckets': [0] * len(LATENCY_BUCKETS),
+        'duration_sum': 0.0,
+        'queries': 0,
+        'query_seconds': 0.0,
+        'render_seconds': 0.0,
+        'bytes': 0,
+        'status': defaultdict(int),
+    }
+
+
+def _merge(merged, data):
+    for key, series in data.items():
+        target = merged[key]
+        for field, value in series.items():
+            if field == 'buckets':
+                target[field] = [a + b for a, b in zip(target[field], value)]
+            elif field == 'status':
+                for status, count in value.items():
+                    target[field][status] += count
+            else:
+                target[field] += value
+    return merged
+
+
+def _read(path):
+    try:
+        with open(path) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, payload):
+    # Write-then-rename so readers never see a half-written file
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        fh.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, f'{os.getpid()}-{time.time_ns()}.json')
+        self.series = defaultdict(_new_series)
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+
+    def count(self, key, status):
+        with self.lock:
+            series = self.series[key]
+            series['requests'] += 1
+            series['status'][f'{status // 100}xx'] += 1
+
+    def observe(self, key, duration, queries, query_seconds, render_seconds, size):
+        with self.lock:
+            series = self.series[key]
+            series['sampled'] += 1
+            series['duration_sum'] += duration
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    series['buckets'][i] += 1
+            series['queries'] += queries
+            series['query_seconds'] += query_seconds
+            series['render_seconds'] += render_seconds
+            series['bytes'] += size
+
+    def flush(self, force=False):
+        if not force and time.monotonic() - self.last_flush < FLUSH_INTERVAL:
+            return
+        with self.lock:
+            payload = json.dumps({key: series for key, series in self.series.items()})
+            self.last_flush = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        _write(self.path, payload)
+
+    def retire_dead(self):
+        """Fold the files of exited workers into RETIRED_FILE and delete them."""
+        if fcntl is None:
+            return
+        with open(os.path.join(self.directory, '.lock'), 'w') as lock:
+            # Two workers collecting at once must not both fold the same file
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            dead = []
+            for name in os.listdir(self.directory):
+                pid = name.split('-', 1)[0]
+                if name.endswith('.json') and pid.isdigit() and not _pid_alive(int(pid)):
+                    dead.append(os.path.join(self.directory, name))
+            if not dead:
+                return
+            retired_path = os.path.join(self.directory, RETIRED_FILE)
+            retired = _merge(defaultdict(_new_series), _read(retired_path) or {})
+            for path in dead:
+                _merge(retired, _read(path) or {})
+            _write(retired_path, json.dumps(retired))
+            for path in dead:
+                os.remove(path)
+
+    def collect(self):
+        """Merge every worker's series (dead workers included, so counters never go backwards)."""
+        self.flush(force=True)
+        self.retire_dead()
+        merged = defaultdict(_new_series)
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                _merge(merged, _read(os.path.join(self.directory, name)) or {})
+        return merged
+
+_store = None
+_store_pid = None
+
+
+def get_store():
+    # One store per process; a forked worker must not share its parent's file
+    global _store, _store_pid
+    if _store is None or _store_pid != os.getpid():
+        directory = getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'pos-metrics')
+        _store, _store_pid = MetricsStore(directory), os.getpid()
+    return _store
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+    # Called on the thread that runs the queries: each thread has its own connection
+    def install(self):
+        connection.execute_wrappers.append(self)
+
+    def uninstall(self):
+        connection.execute_wrappers.remove(self)
+
+
+class MetricsMiddleware:
+    # Runs on the event loop under ASGI: async views stay off the thread pool
+    sync_capable = async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 0.1)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.sample_rate:
+            response = self.get_response(request)
+            self.record(request, response)
+            return response
+
+        timer = QueryTimer()
+        started = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        self.record(request, response, started, timer)
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.sample_rate:
+            response = await self.get_response(request)
+            self.record(request, response)
+            return response
+
+        # Async ORM calls run on the request's thread-sensitive executor, not
+        # on the event loop: the timer goes on that thread's connection
+        timer = QueryTimer()
+        await sync_to_async(timer.install)()
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(timer.uninstall)()
+        self.record(request, response, started, timer)
+        return response
+
+    def record(self, request, response, started=None, timer=None):
+        store = get_store()
+        key = self.route(request)
+        store.count(key, response.status_code)
+        if started is not None:
+            duration = time.perf_counter() - started
+            # DRF responses are rendered after process_template_response runs
+            view_done = getattr(request, '_metrics_view_done', None)
+            render_seconds = started + duration - view_done if view_done else 0.0
+            size = 0 if response.streaming else len(response.content)
+            store.observe(key, duration, timer.count, timer.seconds, render_seconds, size)
+        store.flush()
+
+    def process_template_response(self, request, response):
+        request._metrics_view_done = time.perf_counter()
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        return MetricsMiddleware.process_template_response(self, request, response)
+
+    @staticmethod
+    def route(request):
+        match = getattr(request, 'resolver_match', None)
+        name = match.url_name if match and match.url_name else 'unresolved'
+        return f'{name}|{request.method}'
+
+
+def _labels(key):
+    route, method = key.split('|', 1)
+    return f'route="{route}",method="{method}"'
+
+
+def render_prometheus(series):
+    lines = [
+        '# HELP pos_metrics_sample_rate Fraction of requests with detailed timings',
+        '# TYPE pos_metrics_sample_rate gauge',
+        f'pos_metrics_sample_rate {getattr(settings, "METRICS_SAMPLE_RATE", 0.1)}',
+        '# HELP pos_requests_total Requests handled, by route, method and status class',
+        '# TYPE pos_requests_total counter',
+    ]
+    for key, data in sorted(series.items()):
+        for status, count in sorted(data['status'].items()):
+            lines.append(f'pos_requests_total{{{_labels(key)},status="{status}"}} {count}')
+
+    lines += [
+        '# HELP pos_request_duration_seconds Latency of sampled requests',
+        '# TYPE pos_request_duration_seconds histogram',
+    ]
+    for key, data in sorted(series.items()):
+        for bound, count in zip(LATENCY_BUCKETS, data['buckets']):
+            lines.append(f'pos_request_duration_seconds_bucket{{{_labels(key)},le="{bound}"}} {count}')
+        lines.append(f'pos_request_duration_seconds_bucket{{{_labels(key)},le="+Inf"}} {data["sampled"]}')
+        lines.append(f'pos_request_duration_seconds_sum{{{_labels(key)}}} {data["duration_sum"]:.6f}')
+        lines.append(f'pos_request_duration_seconds_count{{{_labels(key)}}} {data["sampled"]}')
+
+    for name, field, kind, help_text in (
+        ('pos_db_queries_total', 'queries', 'counter', 'DB queries issued by sampled requests'),
+        ('pos_db_query_seconds_total', 'query_seconds', 'counter', 'DB time spent by sampled requests'),
+        ('pos_render_seconds_total', 'render_seconds', 'counter', 'Response rendering time of sampled requests'),
+        ('pos_response_bytes_total', 'bytes', 'counter', 'Response body bytes of sampled requests'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        for key, data in sorted(series.items()):
+            value = data[field]
+            lines.append(f'{name}{{{_labels(key)}}} {value:.6f}' if isinstance(value, float) else f'{name}{{{_labels(key)}}} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+    # Kitchen gauges come from the ticket tables, not the request store
+    from .stations import prometheus_lines
+    return HttpResponse(
+        render_prometheus(get_store().collect()) + '\n'.join(prometheus_lines()) + '\n',
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-17 20:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_order_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='client_key',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
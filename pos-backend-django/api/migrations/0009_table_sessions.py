@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-17 20:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, OuterRef, Subquery, Sum
+
+
+def link_orders(apps, schema_editor):
+    Order = apps.get_model('api', 'Order')
+    Table = apps.get_model('api', 'Table')
+    Order.objects.filter(table_number__isnull=False).update(
+        table=Subquery(Table.objects.filter(table_number=OuterRef('table_number')).values('id')[:1])
+    )
+    # Open a session on every table that still has orders on the board
+    active = Order.objects.filter(table__isnull=False, status__in=('pending', 'preparing', 'ready'))
+    for row in active.values('table').annotate(
+        count=Count('id'), total=Sum('total_amount'), since=Min('created_at'), latest=Max('id')
+    ):
+        Table.objects.filter(pk=row['table']).update(
+            status='occupied', active_orders=row['count'], session_total=row['total'],
+            occupied_since=row['since'], active_order=row['latest'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_order_client_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='table',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='api.table'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='active_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.order'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='active_orders',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='occupied_since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='session_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(link_orders, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 6.0 on 2026-10-17 22:30
+
+from django.db import migrations
+
+SQLITE_INDEX = (
+    'CREATE VIRTUAL TABLE api_product_fts USING fts5('
+    "name, category, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')"
+)
+POSTGRESQL_INDEX = (
+    'CREATE TABLE api_product_search ('
+    'product_id bigint PRIMARY KEY REFERENCES api_product (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+    'document tsvector NOT NULL); '
+    'CREATE INDEX api_product_search_document_idx ON api_product_search USING GIN (document)'
+)
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_INDEX)
+        schema_editor.execute(
+            'INSERT INTO api_product_fts (rowid, name, category) '
+            "SELECT p.id, p.name, COALESCE(c.name, '') FROM api_product p "
+            'LEFT JOIN api_category c ON c.id = p.category_id'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_INDEX)
+        schema_editor.execute(
+            'INSERT INTO api_product_search (product_id, document) '
+            "SELECT p.id, setweight(to_tsvector('simple', p.name), 'A') || "
+            "setweight(to_tsvector('simple', COALESCE(c.name, '')), 'B') "
+            'FROM api_product p LEFT JOIN api_category c ON c.id = p.category_id'
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE api_product_fts')
+    elif vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE api_product_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_kitchen_stations'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0 on 2026-10-17 23:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    # Existing balances become each customer's opening adjustment, so the
+    # ledger always sums to loyalty_points
+    Customer = apps.get_model('api', 'Customer')
+    LoyaltyEntry = apps.get_model('api', 'LoyaltyEntry')
+    LoyaltyEntry.objects.bulk_create(
+        (
+            LoyaltyEntry(customer_id=pk, points=points, reason='adjust', note='Opening balance')
+            for pk, points in Customer.objects.exclude(loyalty_points=0).values_list('id', 'loyalty_points')
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='customer',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='api.customer'),
+        ),
+        migrations.CreateModel(
+            name='LoyaltyEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField(default=0)),
+                ('points', models.IntegerField()),
+                ('reason', models.CharField(choices=[('earn', 'Earned'), ('reverse', 'Reversed'), ('adjust', 'Adjustment')], max_length=10)),
+                ('note', models.CharField(blank=True, default='', max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='loyalty_entries', to='api.customer')),
+                ('order', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='loyalty_entries', to='api.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer', 'created_at'], name='loyalty_customer_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('order__isnull', False)), fields=('order', 'sequence'), name='loyalty_order_sequence_uniq')],
+            },
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
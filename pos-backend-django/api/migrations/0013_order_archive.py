@@ -0,0 +1,38 @@
+# Generated by Django 6.0 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_loyalty_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('order_number', models.CharField(max_length=50)),
+                ('table_id', models.BigIntegerField(blank=True, null=True)),
+                ('table_number', models.CharField(blank=True, max_length=20, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('preparing', 'Preparing'), ('ready', 'Ready'), ('served', 'Served'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('discount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('payment_method', models.CharField(choices=[('cash', 'Cash'), ('card', 'Card'), ('qr', 'QR Code')], max_length=20)),
+                ('order_type', models.CharField(choices=[('dine-in', 'Dine In'), ('takeaway', 'Takeaway'), ('delivery', 'Delivery')], max_length=20)),
+                ('waiter_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_by_id', models.BigIntegerField(blank=True, null=True)),
+                ('customer_id', models.BigIntegerField(blank=True, null=True)),
+                ('client_key', models.CharField(blank=True, max_length=64, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('items', models.JSONField(default=list)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'id'], name='archivedorder_created_idx')],
+            },
+        ),
+    ]
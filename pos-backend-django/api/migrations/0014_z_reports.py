@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 23:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_order_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ZReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_date', models.DateField()),
+                ('shift', models.CharField(blank=True, max_length=50)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('business_date', 'shift'), name='zreport_date_shift_uniq')],
+            },
+        ),
+    ]
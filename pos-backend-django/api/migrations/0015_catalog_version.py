@@ -0,0 +1,27 @@
+# Generated by Django 6.0 on 2026-10-17 23:59
+
+from django.db import migrations, models
+
+
+def drop_sequence_row(apps, schema_editor):
+    # The version used to live in the 'catalog' counter; the next read starts a new one
+    OrderSequence = apps.get_model('api', 'OrderSequence')
+    OrderSequence.objects.filter(key='catalog').delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_z_reports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+        migrations.RunPython(drop_sequence_row, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-17 23:59
+
+from django.db import migrations
+
+
+def unaccent_documents(apps, schema_editor):
+    # FTS5 and the trie fold accents; the PostgreSQL index now does too
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS unaccent')
+    schema_editor.execute(
+        'UPDATE api_product_search s SET document = d.document FROM ('
+        "SELECT p.id, setweight(to_tsvector('simple', unaccent(p.name)), 'A') || "
+        "setweight(to_tsvector('simple', unaccent(COALESCE(c.name, ''))), 'B') AS document "
+        'FROM api_product p LEFT JOIN api_category c ON c.id = p.category_id'
+        ') d WHERE s.product_id = d.id'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(unaccent_documents, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,20 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class Station(models.Model):
+    # Kitchen prep station (grill, pizza, bar...); see api/stations.py
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(unique=True)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return self.name
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     image = models.URLField(blank=True, null=True)
     slug = models.SlugField(unique=True)
+    station = models.ForeignKey(Station, on_delete=models.SET_NULL, null=True, blank=True, related_name='categories')
 
     def __str__(self):
         return self.name
@@ -16,6 +26,8 @@ class Product(models.Model):
     image = models.URLField(blank=True, null=True)
     description = models.TextField(blank=True)
     is_available = models.BooleanField(default=True)
+    # Overrides the category's station
+    station = models.ForeignKey(Station, on_delete=models.SET_NULL, null=True, blank=True, related_name='products')
 
     def __str__(self):
         return self.name
@@ -32,10 +44,18 @@ class Table(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     section = models.CharField(max_length=100, default='Main Hall')
     is_active = models.BooleanField(default=True)
+    # Current seating session, maintained by api/floor.py as orders move
+    active_order = models.ForeignKey('Order', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    active_orders = models.PositiveIntegerField(default=0)
+    session_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    occupied_since = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"Table {self.table_number}"
 
+# Orders still on the kitchen board
+ACTIVE_ORDER_STATUSES = ('pending', 'preparing', 'ready')
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('pending', 'Pending'),
@@ -56,7 +76,8 @@ class Order(models.Model):
     )
 
     order_number = models.CharField(max_length=50, unique=True)
-    table_number = models.CharField(max_length=20, blank=True, null=True) # Keeping loose coupling for now
+    table = models.ForeignKey(Table, on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
+    table_number = models.CharField(max_length=20, blank=True, null=True) # Kept for display and older clients
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
@@ -65,20 +86,115 @@ class Order(models.Model):
     order_type = models.CharField(max_length=20, choices=ORDER_TYPE_CHOICES)
     waiter_name = models.CharField(max_length=100, blank=True, null=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    # Earns loyalty points once served (api/loyalty.py)
+    customer = models.ForeignKey('Customer', on_delete=models.SET_NULL, null=True, blank=True, related_name='orders')
+    # Idempotency key generated by the terminal, so replayed offline syncs are deduplicated
+    client_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Newest-first lists and keyset pagination
+            models.Index(fields=['created_at', 'id'], name='order_created_idx'),
+            # ?status= filters sorted by time
+            models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+            # Incremental change feed cursor
+            models.Index(fields=['updated_at', 'id'], name='order_updated_idx'),
+            # Kitchen/floor lookups of a table's open ticket
+            models.Index(fields=['table_number', 'status'], name='order_table_status_idx'),
+            # The live board is a tiny slice of the table; index only that slice
+            # (skipped on backends without partial index support)
+            models.Index(
+                fields=['created_at'], name='order_active_idx',
+                condition=models.Q(status__in=ACTIVE_ORDER_STATUSES)
+            ),
+        ]
+
+    def __str__(self):
+        return self.order_number
+
+# Orders that can be moved to the archive (api/archive.py)
+ARCHIVABLE_ORDER_STATUSES = ('served', 'cancelled')
+
+class ArchivedOrder(models.Model):
+    # A served or cancelled order moved out of the hot tables: same id,
+    # number and timestamps, items inline (see ARCHIVED_ITEM_FIELDS)
+    id = models.BigIntegerField(primary_key=True)
+    order_number = models.CharField(max_length=50)
+    table_id = models.BigIntegerField(null=True, blank=True)
+    table_number = models.CharField(max_length=20, blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    discount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    payment_method = models.CharField(max_length=20, choices=Order.PAYMENT_CHOICES)
+    order_type = models.CharField(max_length=20, choices=Order.ORDER_TYPE_CHOICES)
+    waiter_name = models.CharField(max_length=100, blank=True, null=True)
+    created_by_id = models.BigIntegerField(null=True, blank=True)
+    customer_id = models.BigIntegerField(null=True, blank=True)
+    client_key = models.CharField(max_length=64, null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    items = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='archivedorder_created_idx'),
+        ]
+
     def __str__(self):
         return self.order_number
 
+# Column order of each ArchivedOrder.items entry
+ARCHIVED_ITEM_FIELDS = ('id', 'product_id', 'product_name', 'price', 'quantity', 'notes')
+
+# Tickets still on a station screen
+OPEN_TICKET_STATUSES = ('pending', 'preparing')
+
+class Ticket(models.Model):
+    # The part of an order prepared at one station
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('preparing', 'Preparing'),
+        ('ready', 'Ready'),
+        ('cancelled', 'Cancelled'),
+    )
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='tickets')
+    station = models.ForeignKey(Station, on_delete=models.CASCADE, related_name='tickets')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    bumped_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # A station's queue: its open tickets, oldest first
+            models.Index(fields=['station', 'status', 'created_at'], name='ticket_queue_idx'),
+            # Throughput and prep-time windows
+            models.Index(fields=['station', 'bumped_at'], name='ticket_bumped_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.station} ticket for {self.order}"
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    # Indexed below: only routed items, so history from before stations costs nothing
+    ticket = models.ForeignKey(
+        Ticket, on_delete=models.SET_NULL, null=True, blank=True, related_name='items', db_index=False
+    )
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True)
     product_name = models.CharField(max_length=200) # Snapshot
     price = models.DecimalField(max_digits=10, decimal_places=2) # Snapshot
     quantity = models.IntegerField()
     notes = models.TextField(blank=True, default='')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket'], name='orderitem_ticket_idx', condition=models.Q(ticket__isnull=False)),
+        ]
+
     def __str__(self):
         return f"{self.quantity} x {self.product_name} in {self.order}"
 
@@ -91,5 +207,112 @@ class Customer(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Phone-prefix search at checkout; the unique index already covers
+            # exact matches, PostgreSQL needs a pattern opclass for LIKE 'x%'
+            models.Index(fields=['phone'], name='customer_phone_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
     def __str__(self):
         return self.name
+
+class LoyaltyEntry(models.Model):
+    # Append-only points ledger; Customer.loyalty_points is its running sum
+    REASON_CHOICES = (
+        ('earn', 'Earned'),
+        ('reverse', 'Reversed'),
+        ('adjust', 'Adjustment'),
+    )
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='loyalty_entries')
+    # Indexed by the (order, sequence) constraint below
+    order = models.ForeignKey(
+        Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='loyalty_entries', db_index=False
+    )
+    # Position in the order's earn/reverse history; its uniqueness is what
+    # stops two terminals crediting the same order twice
+    sequence = models.PositiveIntegerField(default=0)
+    points = models.IntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    note = models.CharField(max_length=200, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'sequence'], name='loyalty_order_sequence_uniq',
+                condition=models.Q(order__isnull=False)
+            ),
+        ]
+        indexes = [
+            # A customer's statement, newest first
+            models.Index(fields=['customer', 'created_at'], name='loyalty_customer_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.points:+d} for {self.customer}"
+
+class SalesRollup(models.Model):
+    # Incrementally maintained revenue buckets read by the analytics dashboard
+    PERIOD_CHOICES = (
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+        ('total', 'All Time'),
+    )
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('period', 'bucket')
+
+    def __str__(self):
+        return f"{self.period} {self.bucket:%Y-%m-%d %H:00}"
+
+class ProductSalesRollup(models.Model):
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True)
+    product_name = models.CharField(max_length=200) # Snapshot, matches OrderItem
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('date', 'product_name')
+
+    def __str__(self):
+        return f"{self.product_name} on {self.date}"
+
+class ZReport(models.Model):
+    # A closed business day (shift='') or shift, frozen by api/reports.py; never updated
+    business_date = models.DateField()
+    shift = models.CharField(max_length=50, blank=True)
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['business_date', 'shift'], name='zreport_date_shift_uniq'),
+        ]
+
+    def __str__(self):
+        return f"Z-report {self.business_date} {self.shift or 'day'}"
+
+class OrderSequence(models.Model):
+    # Per-day (optionally per-terminal) ticket counters; workers reserve
+    # numbers in blocks so they rarely touch this row (see api/sequences.py).
+    key = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.key} @ {self.next_value}"
+
+class CatalogVersion(models.Model):
+    # Menu cache version while the catalog cache is per process (api/catalog.py);
+    # a single row
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"catalog @ {self.version}"
@@ -0,0 +1,64 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from . import archive, feed
+
+class KeysetPagination(CursorPagination):
+    # Cursor (keyset) paging: each page is an indexed range scan from the
+    # last seen row, so page 1,000 costs the same as page 1 and rows inserted
+    # mid-scroll never shift or duplicate entries.
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+class CatalogPagination(KeysetPagination):
+    # Menus and floor plans stay small and terminals load them whole, so
+    # these only paginate when the client asks with ?page_size=
+    ordering = ('id',)
+    page_size = None
+
+class OrderHistoryPagination(BasePagination):
+    # Newest-first keyset pages over (created_at, id), the same cursor as
+    # /api/async/orders/. Pages that run past the hot rows, or past the
+    # archive cutoff, carry on into the view's get_archive_queryset().
+    page_size = KeysetPagination.page_size
+    page_size_query_param = KeysetPagination.page_size_query_param
+    max_page_size = KeysetPagination.max_page_size
+    cursor_query_param = 'cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        try:
+            cursor = request.query_params.get(self.cursor_query_param)
+            position = feed.decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise NotFound('Invalid cursor')
+        rows = list(archive.older(queryset, position, limit=self.page_size + 1))
+        archived = view.get_archive_queryset() if view is not None else None
+        if archived is not None and archive.reaches_archive(rows, self.page_size):
+            after = rows[-1] if len(rows) > self.page_size else None
+            older = archive.older(archived, position, after, self.page_size + 1)
+            rows = archive.merge(rows, [archive.to_order(row) for row in older], self.page_size + 1)
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, feed.encode_cursor(self.page[-1], 'created_at'))
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'previous': None, 'results': data})
@@ -0,0 +1,130 @@
+"""
+Order pricing.
+
+``price_cart`` totals one order from its lines: lines that name a menu
+product are repriced from a ``Catalog`` snapshot rather than trusting the
+price the terminal sent (off-menu lines keep theirs), the discount is an
+amount capped at the subtotal, and TAX_RATE applies to what is left, rounded
+half-up once per order.
+
+Everything is worked in integer cents, so ``price_carts`` can re-price
+thousands of carts (a report re-run, or a what-if menu from
+``Catalog.with_prices``) with int arithmetic per line instead of Decimal
+context work. ``reference_price`` is the plain per-line Decimal version the
+tests hold the engine to, to the cent.
+"""
+from collections import namedtuple
+from functools import lru_cache
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+
+from .models import OrderItem, Product
+
+CENT = Decimal('0.01')
+TAX_RATE = Decimal(str(getattr(settings, 'TAX_RATE', 0)))
+
+Totals = namedtuple('Totals', 'subtotal discount tax total')
+PricedCart = namedtuple('PricedCart', 'prices subtotal discount tax total')
+
+
+# Menu prices, discounts and order totals repeat endlessly across a batch
+@lru_cache(maxsize=65536)
+def to_cents(value):
+    return int((Decimal(str(value)) * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+@lru_cache(maxsize=65536)
+def from_cents(cents):
+    return Decimal(cents).scaleb(-2)
+
+
+class Catalog:
+    """Menu prices in cents at one moment, by product id."""
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    @classmethod
+    def load(cls, product_ids=None):
+        products = Product.objects.all() if product_ids is None else Product.objects.filter(pk__in=product_ids)
+        return cls({pk: to_cents(price) for pk, price in products.values_list('id', 'price')})
+
+    @classmethod
+    def from_products(cls, products):
+        return cls({product.pk: to_cents(product.price) for product in products})
+
+    def with_prices(self, changes):
+        """A what-if copy with ``{product id: price}`` changed."""
+        return Catalog({**self.prices, **{pk: to_cents(price) for pk, price in changes.items()}})
+
+    def price(self, product_id):
+        cents = self.prices.get(product_id)
+        return from_cents(cents) if cents is not None else None
+
+
+def _tax_ratio(tax_rate):
+    return Decimal(str(TAX_RATE if tax_rate is None else tax_rate)).as_integer_ratio()
+
+
+def _totals(subtotal, discount, tax_ratio):
+    discount = min(max(discount, 0), subtotal)
+    taxable = subtotal - discount
+    numerator, denominator = tax_ratio
+    # Half-up rounding of taxable * rate without leaving integers
+    tax = (2 * taxable * numerator + denominator) // (2 * denominator)
+    return subtotal, discount, tax, taxable + tax
+
+
+def price_cart(lines, catalog=None, discount=0, tax_rate=None):
+    """Price ``(product_id, price, quantity)`` lines; returns each line's unit price and the order totals."""
+    menu = catalog.prices if catalog is not None else {}
+    prices = []
+    subtotal = 0
+    for product_id, price, quantity in lines:
+        cents = menu.get(product_id)
+        if cents is None:
+            cents = to_cents(price)
+        prices.append(cents)
+        subtotal += cents * int(quantity)
+    totals = _totals(subtotal, to_cents(discount), _tax_ratio(tax_rate))
+    return PricedCart([from_cents(cents) for cents in prices], *(from_cents(cents) for cents in totals))
+
+
+def price_carts(carts, catalog=None, tax_rate=None):
+    """``Totals`` for each ``(lines, discount)`` cart, in order."""
+    menu = catalog.prices if catalog is not None else {}
+    tax_ratio = _tax_ratio(tax_rate)
+    results = []
+    for lines, discount in carts:
+        subtotal = 0
+        for product_id, price, quantity in lines:
+            cents = menu.get(product_id)
+            subtotal += (cents if cents is not None else to_cents(price)) * quantity
+        results.append(Totals(*map(from_cents, _totals(subtotal, to_cents(discount), tax_ratio))))
+    return results
+
+
+def carts(orders):
+    """Stored orders as ``(lines, discount)`` carts for ``price_carts``, in id order (two queries)."""
+    discounts = dict(orders.order_by().values_list('id', 'discount'))
+    lines = {pk: [] for pk in sorted(discounts)}
+    items = OrderItem.objects.filter(order_id__in=orders.order_by().values('id')).values_list(
+        'order_id', 'product_id', 'price', 'quantity'
+    )
+    for order_id, product_id, price, quantity in items.iterator(chunk_size=2000):
+        lines[order_id].append((product_id, price, quantity))
+    return [(order_lines, discounts[pk]) for pk, order_lines in lines.items()]
+
+
+def reference_price(lines, catalog=None, discount=0, tax_rate=None):
+    """Line by line in Decimal, the obvious way; ``Totals`` to compare the engine against."""
+    subtotal = Decimal('0')
+    for product_id, price, quantity in lines:
+        menu_price = catalog.price(product_id) if catalog is not None else None
+        unit = menu_price if menu_price is not None else Decimal(str(price)).quantize(CENT, rounding=ROUND_HALF_UP)
+        subtotal += unit * int(quantity)
+    discount = min(max(Decimal(str(discount)).quantize(CENT, rounding=ROUND_HALF_UP), Decimal('0')), subtotal)
+    tax_rate = Decimal(str(TAX_RATE if tax_rate is None else tax_rate))
+    tax = ((subtotal - discount) * tax_rate).quantize(CENT, rounding=ROUND_HALF_UP)
+    return Totals(subtotal, discount, tax, subtotal - discount + tax)
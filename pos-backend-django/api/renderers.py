@@ -0,0 +1,54 @@
+"""
+Faster API response renderers.
+
+``FastJSONRenderer`` writes the same bytes as DRF's ``JSONRenderer`` but
+encodes with orjson when it is installed: dicts, lists, strings and numbers
+go through orjson's native encoder and only the rest (datetimes, Decimals,
+lazy strings...) falls back to DRF's encoder, so clients cannot tell the two
+apart. Pretty-printed output (``; indent=``, the browsable API) still goes
+through ``json``.
+
+``MessagePackRenderer`` answers ``Accept: application/msgpack`` when
+msgpack is installed; it carries the same values as the JSON body.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# DRF's conversions for anything orjson or msgpack cannot encode natively
+_encode_other = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Datetimes pass through so they keep DRF's format ('Z', not '+00:00')
+        body = orjson.dumps(
+            data, default=_encode_other, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        # Keep the output a strict JavaScript subset, as JSONRenderer does
+        if b'\xe2\x80\xa8' in body or b'\xe2\x80\xa9' in body:
+            body = body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return body
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_other, use_bin_type=True, datetime=False)
@@ -0,0 +1,173 @@
+"""
+End-of-day and end-of-shift Z-reports.
+
+``z_report(day, shift)`` totals the orders created in a business day (or one
+of its REPORT_SHIFTS) by payment method, order type and waiter, with
+discounts and cancellations. Everything comes from one grouped query over
+the order table, plus one over the archive when the window is old enough to
+be there; the rollups only carry order counts and revenue, so they cannot
+answer these breakdowns.
+
+Once a window has ended and none of its orders is still open, its report is
+frozen into a ``ZReport`` row, and every later request for it is a
+single-row read. Like a till's Z-read, a frozen report is final: orders
+changed after the close do not alter it. A report with open orders stays
+live until they are served or cancelled, so it cannot freeze them as sales
+that later turn out to be cancellations.
+
+REPORT_SHIFTS is checked when the app loads (``ApiConfig.ready``): the
+shifts must have distinct names and start times, and the first must start at
+00:00 so that together they cover the whole day.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from . import archive
+from .models import ACTIVE_ORDER_STATUSES, ArchivedOrder, Order, ZReport
+
+GROUP_FIELDS = ('status', 'payment_method', 'order_type', 'waiter_name')
+ZERO = Decimal('0.00')
+
+
+def parse_shifts(value):
+    """``'morning=00:00,evening=16:00'`` -> ``(('morning', time(0)), ('evening', time(16)))``; '' for none."""
+    shifts = []
+    for entry in filter(None, (entry.strip() for entry in value.split(','))):
+        name, _, start = entry.partition('=')
+        try:
+            shifts.append((name.strip(), time.fromisoformat(start.strip())))
+        except ValueError:
+            raise ImproperlyConfigured(f'REPORT_SHIFTS: {entry!r} is not name=HH:MM')
+    shifts.sort(key=lambda shift: shift[1])
+    names, starts = [name for name, _ in shifts], [start for _, start in shifts]
+    if '' in names or len(set(names)) < len(names):
+        raise ImproperlyConfigured(f'REPORT_SHIFTS: shift names must be distinct and non-empty, got {value!r}')
+    if len(set(starts)) < len(starts):
+        raise ImproperlyConfigured(f'REPORT_SHIFTS: two shifts start at the same time in {value!r}')
+    if shifts and starts[0] != time.min:
+        # Orders before the first start would belong to no shift
+        raise ImproperlyConfigured(f'REPORT_SHIFTS: the first shift must start at 00:00, got {value!r}')
+    return tuple(shifts)
+
+
+# ((name, local start time), ...): each shift runs until the next one starts
+SHIFTS = parse_shifts(getattr(settings, 'REPORT_SHIFTS', 'morning=00:00,evening=16:00'))
+
+
+def window(day, shift=''):
+    """Aware ``[starts_at, ends_at)`` of a business day or one of its shifts; ValueError for an unknown shift."""
+    if not shift:
+        bounds = (time.min, None)
+    else:
+        names = [name for name, _ in SHIFTS]
+        if shift not in names:
+            raise ValueError(f'Unknown shift {shift!r}')
+        index = names.index(shift)
+        bounds = (SHIFTS[index][1], SHIFTS[index + 1][1] if index + 1 < len(SHIFTS) else None)
+    starts_at = timezone.make_aware(datetime.combine(day, bounds[0]))
+    ends_at = timezone.make_aware(
+        datetime.combine(day, bounds[1]) if bounds[1] else datetime.combine(day + timedelta(days=1), time.min)
+    )
+    return starts_at, ends_at
+
+
+def _groups(starts_at, ends_at):
+    # One GROUP BY over the created_at range per table the window reaches
+    tables = [Order] + ([ArchivedOrder] if starts_at < archive.cutoff() else [])
+    for model in tables:
+        yield from model.objects.filter(created_at__gte=starts_at, created_at__lt=ends_at).values_list(
+            *GROUP_FIELDS
+        ).annotate(
+            orders=Count('id'), subtotal=Sum('subtotal'), discount=Sum('discount'), total=Sum('total_amount')
+        ).order_by()
+
+
+def _bucket():
+    return {'orders': 0, 'net_sales': ZERO}
+
+
+def _amounts(row):
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in row.items()}
+
+
+def compute(starts_at, ends_at):
+    """The report's totals for ``[starts_at, ends_at)``, JSON-ready."""
+    sales = {'orders': 0, 'gross_sales': ZERO, 'discounts': ZERO, 'net_sales': ZERO}
+    cancelled = {'orders': 0, 'amount': ZERO}
+    open_orders = 0
+    payment_methods = {key: _bucket() for key, _ in Order.PAYMENT_CHOICES}
+    order_types = {key: _bucket() for key, _ in Order.ORDER_TYPE_CHOICES}
+    waiters = defaultdict(lambda: {**_bucket(), 'discounts': ZERO})
+
+    for status, payment, order_type, waiter_name, orders, subtotal, discount, total in _groups(starts_at, ends_at):
+        if status == 'cancelled':
+            cancelled['orders'] += orders
+            cancelled['amount'] += total
+            continue
+        if status in ACTIVE_ORDER_STATUSES:
+            open_orders += orders
+        sales['orders'] += orders
+        sales['gross_sales'] += subtotal
+        sales['discounts'] += discount
+        sales['net_sales'] += total
+        waiter = waiters[waiter_name or '']
+        waiter['discounts'] += discount
+        buckets = (
+            payment_methods.setdefault(payment, _bucket()), order_types.setdefault(order_type, _bucket()), waiter
+        )
+        for bucket in buckets:
+            bucket['orders'] += orders
+            bucket['net_sales'] += total
+
+    average = (sales['net_sales'] / sales['orders']).quantize(ZERO, rounding=ROUND_HALF_UP) if sales['orders'] else ZERO
+    return {
+        **_amounts(sales),
+        'average_order': str(average),
+        'cancelled': _amounts(cancelled),
+        'open_orders': open_orders,
+        'payment_methods': [{'payment_method': key, **_amounts(row)} for key, row in payment_methods.items()],
+        'order_types': [{'order_type': key, **_amounts(row)} for key, row in order_types.items()],
+        'waiters': [
+            {'waiter_name': name, **_amounts(row)}
+            for name, row in sorted(waiters.items(), key=lambda item: (-item[1]['net_sales'], item[0]))
+        ],
+    }
+
+
+def z_report(day, shift='', now=None):
+    """A day's (or shift's) report: the frozen row once it has closed and settled, computed live before that."""
+    frozen = ZReport.objects.filter(business_date=day, shift=shift).values_list('data', flat=True).first()
+    if frozen is not None:
+        return frozen
+    starts_at, ends_at = window(day, shift)
+    closed = ends_at <= (now or timezone.now())
+    data = {
+        'business_date': day.isoformat(), 'shift': shift or None,
+        'starts_at': starts_at.isoformat(), 'ends_at': ends_at.isoformat(), 'closed': closed,
+        **compute(starts_at, ends_at),
+    }
+    if closed and not data['open_orders']:
+        try:
+            with transaction.atomic():
+                ZReport.objects.create(business_date=day, shift=shift, starts_at=starts_at, ends_at=ends_at, data=data)
+        except IntegrityError:
+            # Another request froze it first; theirs is the report of record
+            return ZReport.objects.get(business_date=day, shift=shift).data
+    return data
+
+
+def close_day(day, now=None):
+    """Freeze the day's report and each shift's; returns ``(newly frozen, still live)``."""
+    existing = set(ZReport.objects.filter(business_date=day).values_list('shift', flat=True))
+    for shift in [''] + [name for name, _ in SHIFTS]:
+        if shift not in existing:
+            z_report(day, shift, now)
+    frozen = ZReport.objects.filter(business_date=day).count()
+    return frozen - len(existing), 1 + len(SHIFTS) - frozen
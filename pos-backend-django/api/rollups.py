@@ -0,0 +1,204 @@
+"""
+Materialized sales rollups.
+
+Every non-cancelled order contributes to one hourly, one daily and the
+all-time ``SalesRollup`` row, plus one ``ProductSalesRollup`` row per product
+sold that day. Writes apply signed deltas with ``F()`` expressions, so the
+dashboard reads a handful of rows no matter how long the order history is.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Max, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from . import archive
+from .models import ArchivedOrder, Order, OrderItem, SalesRollup, ProductSalesRollup
+
+TOTAL_BUCKET = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+EXCLUDED_STATUSES = ('cancelled',)
+
+
+def hour_bucket(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_bucket(day):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _bump(model, lookup, defaults=None, **deltas):
+    # UPDATE first: the common case is an existing bucket and costs one query
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **deltas)
+    except IntegrityError:
+        # Another worker created the bucket between our UPDATE and INSERT
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _new_deltas():
+    return defaultdict(lambda: [0, Decimal('0')]), defaultdict(lambda: [None, 0, Decimal('0')])
+
+
+def _collect(order, items, sign, sales, products):
+    created_at = order.created_at
+    for key in (
+        ('hour', hour_bucket(created_at)),
+        ('day', day_bucket(timezone.localdate(created_at))),
+        ('total', TOTAL_BUCKET),
+    ):
+        sales[key][0] += sign
+        sales[key][1] += Decimal(order.total_amount) * sign
+
+    day = timezone.localdate(created_at)
+    for item in items:
+        entry = products[day, item.product_name]
+        entry[0] = entry[0] or item.product_id
+        entry[1] += item.quantity * sign
+        entry[2] += Decimal(item.price) * item.quantity * sign
+
+
+def _flush(sales, products):
+    for (period, bucket), (order_count, revenue) in sales.items():
+        _bump(SalesRollup, {'period': period, 'bucket': bucket}, order_count=order_count, revenue=revenue)
+    for (day, product_name), (product_id, quantity, revenue) in products.items():
+        _bump(
+            ProductSalesRollup, {'date': day, 'product_name': product_name},
+            defaults={'product_id': product_id}, quantity=quantity, revenue=revenue
+        )
+
+
+def apply_order(order, items=None, sign=1):
+    """Add (sign=1) or remove (sign=-1) an order's contribution to every bucket."""
+    if items is None:
+        items = order.items.all()
+    sales, products = _new_deltas()
+    _collect(order, items, sign, sales, products)
+    _flush(sales, products)
+
+
+def order_created(order, items=None):
+    if order.status not in EXCLUDED_STATUSES:
+        apply_order(order, items)
+
+
+def orders_created(pairs):
+    """Batch version of ``order_created``: one bump per touched bucket, not per order."""
+    sales, products = _new_deltas()
+    for order, items in pairs:
+        if order.status not in EXCLUDED_STATUSES:
+            _collect(order, items, 1, sales, products)
+    _flush(sales, products)
+
+
+def status_changed(order, old_status):
+    was_counted = old_status not in EXCLUDED_STATUSES
+    is_counted = order.status not in EXCLUDED_STATUSES
+    if was_counted and not is_counted:
+        apply_order(order, sign=-1)
+    elif is_counted and not was_counted:
+        apply_order(order)
+
+
+def order_deleted(order):
+    if order.status not in EXCLUDED_STATUSES:
+        apply_order(order, sign=-1)
+
+
+def rebuild():
+    """Recompute every rollup from the order tables (hot and archived) with grouped queries."""
+    sales, products = _new_deltas()
+    for model in (Order, ArchivedOrder):
+        orders = model.objects.exclude(status__in=EXCLUDED_STATUSES)
+        hourly = (
+            orders.annotate(bucket=TruncHour('created_at', tzinfo=dt_timezone.utc))
+            .values('bucket').annotate(order_count=Count('id'), revenue=Sum('total_amount'))
+        )
+        daily = (
+            orders.annotate(day=TruncDate('created_at'))
+            .values('day').annotate(order_count=Count('id'), revenue=Sum('total_amount'))
+        )
+        total = orders.aggregate(order_count=Count('id'), revenue=Sum('total_amount'))
+        rows = [(('hour', row['bucket']), row) for row in hourly]
+        rows += [(('day', day_bucket(row['day'])), row) for row in daily]
+        if total['order_count']:
+            rows.append((('total', TOTAL_BUCKET), total))
+        for key, row in rows:
+            sales[key][0] += row['order_count']
+            sales[key][1] += row['revenue']
+
+    items = OrderItem.objects.exclude(order__status__in=EXCLUDED_STATUSES)
+    for row in (
+        items.annotate(day=TruncDate('order__created_at'))
+        .values('day', 'product_name')
+        .annotate(
+            product_ref=Max('product'), units=Sum('quantity'),
+            sales=Sum(F('price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+        )
+    ):
+        entry = products[row['day'], row['product_name']]
+        entry[0] = entry[0] or row['product_ref']
+        entry[1] += row['units']
+        entry[2] += row['sales']
+    # Archived items are JSON, so they are summed here rather than in SQL
+    for created_at, product_id, product_name, price, quantity in archive.item_rows(EXCLUDED_STATUSES):
+        entry = products[timezone.localdate(created_at), product_name]
+        entry[0] = entry[0] or product_id
+        entry[1] += quantity
+        entry[2] += Decimal(price) * quantity
+
+    with transaction.atomic():
+        SalesRollup.objects.all().delete()
+        ProductSalesRollup.objects.all().delete()
+        SalesRollup.objects.bulk_create([
+            SalesRollup(period=period, bucket=bucket, order_count=order_count, revenue=revenue)
+            for (period, bucket), (order_count, revenue) in sales.items()
+        ], batch_size=1000)
+        ProductSalesRollup.objects.bulk_create([
+            ProductSalesRollup(date=day, product_name=product_name, product_id=product_id,
+                               quantity=quantity, revenue=revenue)
+            for (day, product_name), (product_id, quantity, revenue) in products.items()
+        ], batch_size=1000)
+    return len(sales)
+
+
+def _series_queries(today, days, top):
+    start = today - timedelta(days=days - 1)
+    daily = SalesRollup.objects.filter(
+        period='day', bucket__gte=day_bucket(start), bucket__lte=day_bucket(today)
+    ).values_list('bucket', 'revenue')
+    products = (
+        ProductSalesRollup.objects.filter(date__gte=start, date__lte=today)
+        .values('product_name').annotate(quantity=Sum('quantity'))
+        .filter(quantity__gt=0).order_by('-quantity')[:top]
+    )
+    return start, daily, products
+
+
+def _series(start, days, daily, products):
+    by_day = {timezone.localdate(bucket): revenue for bucket, revenue in daily}
+    revenue_data = [
+        {'name': (start + timedelta(days=offset)).strftime('%a'),
+         'value': by_day.get(start + timedelta(days=offset), Decimal('0'))}
+        for offset in range(days)
+    ]
+    top_products = [{'name': row['product_name'], 'value': row['quantity']} for row in products]
+    return revenue_data, top_products
+
+
+def dashboard_series(today=None, days=7, top=5):
+    """Weekly revenue and top-product series from the daily rollups."""
+    start, daily, products = _series_queries(today or timezone.localdate(), days, top)
+    return _series(start, days, list(daily), list(products))
+
+
+async def adashboard_series(today=None, days=7, top=5):
+    start, daily, products = _series_queries(today or timezone.localdate(), days, top)
+    return _series(start, days, [row async for row in daily], [row async for row in products])
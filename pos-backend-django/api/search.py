@@ -0,0 +1,233 @@
+"""
+Product search.
+
+``?search=`` on the product endpoints goes through a full-text index instead
+of SearchFilter's ``LIKE '%term%'`` over a join:
+
+* SQLite: the FTS5 table ``api_product_fts`` (rowid = product id)
+* PostgreSQL: ``api_product_search``, a weighted ``tsvector`` per product
+  under a GIN index; documents and queries both go through ``unaccent()``
+  so accents fold as in FTS5 and the trie
+
+Both are kept in step by Product/Category save and delete signals; run
+``rebuild_search_index`` after bulk loads, which send no signals. Every query
+term matches as a prefix, so results follow the POS search box keystroke by
+keystroke, ranked with name hits above category hits (exactly once a prefix
+narrows below RANK_WINDOW matches).
+
+Menus of up to SEARCH_TRIE_MAX products are searched in an in-process trie
+instead, rebuilt whenever the catalog version changes. Other database
+backends fall back to ``icontains``.
+"""
+import heapq
+import re
+import unicodedata
+
+from django.db import connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from rest_framework.filters import BaseFilterBackend
+
+from . import catalog
+from .models import Product
+
+SEARCH_LIMIT = 50
+# Ranking costs per match: only this many matches are ranked, so a one or
+# two letter prefix matching half the menu stays as fast as a full word
+RANK_WINDOW = 500
+SEARCH_TRIE_MAX = 2000
+MAX_TERMS = 8
+NAME_WEIGHT, CATEGORY_WEIGHT = 4, 1
+
+_SOURCE = (
+    "SELECT p.id, p.name, COALESCE(c.name, '') FROM api_product p "
+    'LEFT JOIN api_category c ON c.id = p.category_id'
+)
+_DOCUMENTS = (
+    "SELECT p.id, setweight(to_tsvector('simple', unaccent(p.name)), 'A') || "
+    "setweight(to_tsvector('simple', unaccent(COALESCE(c.name, ''))), 'B') "
+    'FROM api_product p LEFT JOIN api_category c ON c.id = p.category_id'
+)
+
+
+def tokens(text):
+    # Same folding as FTS5's unicode61 tokenizer: lower case, no accents
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.findall(r'\w+', text)
+
+
+# Index maintenance
+
+def _sqlite_reindex(cursor, where, params):
+    cursor.execute(f'DELETE FROM api_product_fts WHERE rowid IN (SELECT p.id FROM api_product p WHERE {where})', params)
+    cursor.execute(f'INSERT INTO api_product_fts (rowid, name, category) {_SOURCE} WHERE {where}', params)
+
+
+def _postgresql_reindex(cursor, where, params):
+    cursor.execute(
+        'INSERT INTO api_product_search (product_id, document) '
+        f'{_DOCUMENTS} WHERE {where} '
+        'ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document',
+        params
+    )
+
+
+_REINDEX = {'sqlite': _sqlite_reindex, 'postgresql': _postgresql_reindex}
+
+
+def _reindex(where, params=()):
+    reindex = _REINDEX.get(connection.vendor)
+    if reindex is not None:
+        with connection.cursor() as cursor:
+            reindex(cursor, where, params)
+
+
+def product_saved(instance, **kwargs):
+    _reindex('p.id = %s', [instance.pk])
+
+
+def product_deleted(instance, **kwargs):
+    # PostgreSQL rows go with the product through ON DELETE CASCADE
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM api_product_fts WHERE rowid = %s', [instance.pk])
+
+
+def category_saved(instance, created=False, **kwargs):
+    if not created:
+        _reindex('p.category_id = %s', [instance.pk])
+
+
+def rebuild():
+    """Re-index every product; returns the number of products indexed."""
+    # Searches never see the index empty, nor left empty by a failed insert
+    with transaction.atomic():
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM api_product_fts')
+        elif connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM api_product_search')
+        _reindex('1 = 1')
+    # Bulk loads sent no signals either, so cached menus and the trie are stale too
+    catalog.bump_version()
+    return Product.objects.count()
+
+
+# Queries
+
+def _sqlite_search(terms, limit):
+    # Quoted terms keep FTS5 operators in user input literal
+    query = ' '.join(f'"{term}"*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM (SELECT rowid, bm25(api_product_fts, {NAME_WEIGHT}.0, {CATEGORY_WEIGHT}.0) AS score '
+            'FROM api_product_fts WHERE api_product_fts MATCH %s LIMIT %s) ORDER BY score, rowid LIMIT %s',
+            [query, RANK_WINDOW, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _postgresql_search(terms, limit):
+    query = ' & '.join(f'{term}:*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT product_id FROM (SELECT product_id, ts_rank(document, query) AS score '
+            "FROM api_product_search, to_tsquery('simple', unaccent(%s)) query "
+            'WHERE document @@ query LIMIT %s) matches '
+            'ORDER BY score DESC, product_id LIMIT %s',
+            [query, RANK_WINDOW, limit]
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_search(terms, limit):
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(category__name__icontains=term)
+    return list(Product.objects.filter(condition).order_by('name').values_list('id', flat=True)[:limit])
+
+
+_SEARCH = {'sqlite': _sqlite_search, 'postgresql': _postgresql_search}
+
+
+class Trie:
+    """Prefix trie over product name and category tokens; each node keeps the best weight per product below it."""
+
+    def __init__(self, rows):
+        self.root = {}
+        self.names = {}
+        for pk, name, category in rows:
+            self.names[pk] = name.lower()
+            for weight, text in ((CATEGORY_WEIGHT, category), (NAME_WEIGHT, name)):
+                for token in tokens(text):
+                    self._add(token, pk, weight)
+
+    def _add(self, token, pk, weight):
+        node = self.root
+        for char in token:
+            node = node.setdefault(char, {})
+            hits = node.setdefault(None, {})
+            if hits.get(pk, 0) < weight:
+                hits[pk] = weight
+
+    def _hits(self, prefix):
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return {}
+        return node.get(None, {})
+
+    def search(self, terms, limit=SEARCH_LIMIT):
+        scores = None
+        for term in terms:
+            hits = self._hits(term)
+            if scores is None:
+                scores = dict(hits)
+            else:
+                scores = {pk: score + hits[pk] for pk, score in scores.items() if pk in hits}
+            if not scores:
+                return []
+        return heapq.nsmallest(limit, scores, key=lambda pk: (-scores[pk], self.names[pk], pk))
+
+
+_trie = {'version': None, 'trie': None}
+
+
+def _small_menu_trie():
+    # One trie per catalog version; None when the menu is too big for memory
+    version = catalog.current_version()
+    if _trie['version'] != version:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{_SOURCE} LIMIT %s', [SEARCH_TRIE_MAX + 1])
+            rows = cursor.fetchall()
+        _trie.update(version=version, trie=Trie(rows) if len(rows) <= SEARCH_TRIE_MAX else None)
+    return _trie['trie']
+
+
+def search(text, limit=SEARCH_LIMIT):
+    """Ids of the products best matching ``text``, best first."""
+    terms = tokens(text)[:MAX_TERMS]
+    if not terms:
+        return []
+    trie = _small_menu_trie()
+    if trie is not None:
+        return trie.search(terms, limit)
+    return _SEARCH.get(connection.vendor, _fallback_search)(terms, limit)
+
+
+class ProductSearchFilter(BaseFilterBackend):
+    """``?search=`` through the search index, keeping its ranking."""
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '')
+        if not text.strip():
+            return queryset
+        ids = search(text)
+        if not ids:
+            return queryset.none()
+        return queryset.filter(pk__in=ids).order_by(
+            Case(*[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(ids)], output_field=IntegerField())
+        )
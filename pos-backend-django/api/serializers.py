@@ -1,7 +1,11 @@
 from rest_framework import serializers
-from .models import Category, Product, Table, Order, OrderItem, Customer
+from .models import Category, Product, Table, Order, OrderItem, Customer, LoyaltyEntry, Station, Ticket
+from . import auth, floor, loyalty, pricing, rollups, sequences, stations
 from django.contrib.auth.models import User
-from decimal import Decimal
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
 
 class UserSerializer(serializers.ModelSerializer):
     role = serializers.SerializerMethodField()
@@ -16,47 +20,56 @@ class UserSerializer(serializers.ModelSerializer):
         return user
 
     def get_role(self, obj):
-        if obj.is_superuser or obj.is_staff:
-            return 'admin'
-        return 'user'
+        return auth.role_for(obj)
 
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('first_name', 'last_name', 'email')
 
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Only the profile columns: the password, is_active and is_staff stay as stored
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # Identity and role ride in the token, so authenticated requests
+        # need no user query (api/auth.py)
+        return auth.add_claims(super().get_token(user), user)
+
     def validate(self, attrs):
         data = super().validate(attrs)
-        
-        # Add extra user data to the response
-        user_data = UserSerializer(self.user).data
-        
-        # Inject role based on django permissions
-        if self.user.is_superuser or self.user.is_staff:
-            user_data['role'] = 'admin'
-        else:
-            user_data['role'] = 'user'
-            
+        # UserSerializer already includes the role
         data['data'] = {
-            'user': user_data
+            'user': UserSerializer(self.user).data
         }
-        # Rename access to token to match frontend expectation if needed, 
-        # or just keep 'access' and 'refresh'. 
         # Frontend authSlice says: localStorage.setItem('token', data.token);
         # So it expects 'token' key.
         data['token'] = data['access']
         
         return data
 
-class CategorySerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """Keep only the fields named in the ``fields`` kwarg (driven by ?fields=)."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = '__all__'
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_detail = CategorySerializer(source='category', read_only=True)
     category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all())
 
@@ -64,17 +77,97 @@ class ProductSerializer(serializers.ModelSerializer):
         model = Product
         fields = '__all__'
 
-class TableSerializer(serializers.ModelSerializer):
+class ProductSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # List view without the nested category payload
+    class Meta:
+        model = Product
+        fields = ('id', 'name', 'price', 'category', 'image', 'is_available')
+
+class TableSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Table
+        fields = '__all__'
+        # Session fields are driven by orders (api/floor.py)
+        read_only_fields = ('active_order', 'active_orders', 'session_total', 'occupied_since')
+
+    def validate_status(self, value):
+        if self.instance is None:
+            if value == 'occupied':
+                raise serializers.ValidationError('Tables become occupied when an order is placed')
+            return value
+        try:
+            floor.check_manual_status(self.instance, value)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
+class FloorOrderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Order
+        fields = ('id', 'order_number', 'status', 'total_amount', 'waiter_name', 'created_at')
+
+class FloorTableSerializer(serializers.ModelSerializer):
+    # Floor plan row: the table, its running session and its latest order
+    active_order = FloorOrderSerializer(read_only=True)
+    elapsed_seconds = serializers.SerializerMethodField()
+
     class Meta:
         model = Table
+        fields = (
+            'id', 'table_number', 'capacity', 'section', 'status', 'is_active',
+            'active_orders', 'session_total', 'occupied_since', 'elapsed_seconds', 'active_order'
+        )
+
+    def get_elapsed_seconds(self, obj):
+        if obj.occupied_since is None:
+            return None
+        return int((self.context['now'] - obj.occupied_since).total_seconds())
+
+class StationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Station
         fields = '__all__'
 
+class TicketItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = ('id', 'product_name', 'quantity', 'notes')
+
+class TicketSerializer(serializers.ModelSerializer):
+    # Station screen card: order details come from select_related('order')
+    order_number = serializers.CharField(source='order.order_number', read_only=True)
+    table_number = serializers.CharField(source='order.table_number', read_only=True)
+    order_type = serializers.CharField(source='order.order_type', read_only=True)
+    waiter_name = serializers.CharField(source='order.waiter_name', read_only=True)
+    items = TicketItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Ticket
+        fields = (
+            'id', 'order', 'order_number', 'table_number', 'order_type', 'waiter_name',
+            'station', 'status', 'created_at', 'started_at', 'bumped_at', 'items'
+        )
+
 class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = '__all__'
 
-class OrderSerializer(serializers.ModelSerializer):
+def _as_pk(value):
+    # Terminals send productId as either an int or a numeric string
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+# Limits for submitted and queued orders; totals must fit Order's max_digits=10
+MAX_ITEM_PRICE = Decimal('99999.99')
+MAX_ITEM_QUANTITY = 999
+MAX_ORDER_TOTAL = Decimal('99999999.99')
+# How far back a synced order may be dated
+MAX_PLACED_AGE = timedelta(days=7)
+
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True, read_only=True)
     items_data = serializers.ListField(child=serializers.DictField(), write_only=True)
 
@@ -87,47 +180,128 @@ class OrderSerializer(serializers.ModelSerializer):
             'total_amount': {'read_only': True}
         }
 
+    def validate_items_data(self, value):
+        # Rejected here as a 400: pricing would fail on them with a 500, and in
+        # a synced batch that fails every order, replayed by the terminal forever
+        if not value:
+            raise serializers.ValidationError('An order needs at least one item')
+        total = Decimal('0')
+        for item in value:
+            try:
+                price = Decimal(str(item.get('price')))
+                quantity = int(item.get('quantity'))
+                valid = price.is_finite() and 0 <= price <= MAX_ITEM_PRICE and 1 <= quantity <= MAX_ITEM_QUANTITY
+            except (InvalidOperation, OverflowError, TypeError, ValueError):
+                raise serializers.ValidationError('Each item needs a numeric price and quantity')
+            if not valid:
+                raise serializers.ValidationError(
+                    f'Item price must be between 0 and {MAX_ITEM_PRICE} and quantity between 1 and {MAX_ITEM_QUANTITY}'
+                )
+            total += price * quantity
+        if total > MAX_ORDER_TOTAL:
+            raise serializers.ValidationError(f'Order total cannot exceed {MAX_ORDER_TOTAL}')
+        return value
+
     def create(self, validated_data):
         items_data = validated_data.pop('items_data')
-        
-        # Calculate totals
-        subtotal = sum(Decimal(str(item.get('price'))) * item.get('quantity') for item in items_data)
-        discount = validated_data.get('discount', Decimal('0'))
-        total_amount = subtotal - discount
-
-        # Generate order number (basic implementation)
-        import uuid
-        order_number = f"ORD-{uuid.uuid4().hex[:6].upper()}"
-
-        order = Order.objects.create(
-            order_number=order_number,
-            subtotal=subtotal,
-            total_amount=total_amount,
-            **validated_data
+
+        # Resolve every referenced product (and its prep station) in a single id__in query
+        product_ids = {_as_pk(item.get('productId')) for item in items_data} - {None}
+        products = stations.routed_products(product_ids)
+
+        # Menu items are charged at the menu price, not whatever the terminal sent
+        priced = pricing.price_cart(
+            [(_as_pk(item.get('productId')), item.get('price'), item.get('quantity')) for item in items_data],
+            pricing.Catalog.from_products(products.values()),
+            validated_data.get('discount', Decimal('0')),
         )
+        validated_data['discount'] = priced.discount
+
+        # Per-day ticket number from this worker's reserved block; terminals
+        # that identify themselves get their own sequence
+        request = self.context.get('request')
+        terminal = request.headers.get('X-Terminal-Id') if request else None
+        order_number = sequences.next_order_number(terminal)
 
-        for item_data in items_data:
-            # Handle product lookup if productId provided
-            product_id = item_data.get('productId')
-            product = None
-            if product_id:
-                try:
-                    product = Product.objects.get(id=product_id)
-                except Product.DoesNotExist:
-                    pass
-            
-            OrderItem.objects.create(
-                order=order,
-                product=product,
-                product_name=item_data.get('name'),
-                price=item_data.get('price'),
-                quantity=item_data.get('quantity'),
-                notes=item_data.get('notes', '')
+        # Seat the order: older clients only send the table number
+        table = validated_data.get('table')
+        if table is not None:
+            validated_data['table_number'] = table.table_number
+        elif validated_data.get('table_number'):
+            validated_data['table'] = Table.objects.filter(table_number=validated_data['table_number']).first()
+
+        with transaction.atomic():
+            order = Order.objects.create(
+                order_number=order_number,
+                subtotal=priced.subtotal,
+                total_amount=priced.total,
+                **validated_data
             )
+
+            items = [
+                OrderItem(
+                    order=order,
+                    product=products.get(_as_pk(item_data.get('productId'))),
+                    product_name=item_data.get('name'),
+                    price=price,
+                    quantity=item_data.get('quantity'),
+                    notes=item_data.get('notes', '')
+                )
+                for item_data, price in zip(items_data, priced.prices)
+            ]
+            stations.route_order(order, items)
+            OrderItem.objects.bulk_create(items)
+            rollups.order_created(order, items)
+            floor.order_created(order)
+            loyalty.order_created(order)
         
         return order
 
-class CustomerSerializer(serializers.ModelSerializer):
+    def update(self, instance, validated_data):
+        validated_data.pop('items_data', None)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        # Only the submitted columns: a whole-row save could write back a
+        # status another terminal has just changed
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+class OrderSyncSerializer(OrderSerializer):
+    """Validates one queued offline order; api/sync.py does the inserting."""
+    # Declared explicitly: the model's UniqueValidator would cost a query per
+    # order, and replays are deduplicated by the batch rather than rejected
+    client_key = serializers.CharField(max_length=64)
+    # Resolved for the whole batch at once rather than one lookup per order
+    table = serializers.IntegerField(required=False, allow_null=True)
+    customer = serializers.IntegerField(required=False, allow_null=True)
+    # When the order was taken; created_at is otherwise the time it synced
+    placed_at = serializers.DateTimeField(required=False, write_only=True)
+
+    def validate_placed_at(self, value):
+        # Clamped rather than rejected: the terminal's clock may be off, but the sale happened
+        now = timezone.now()
+        return min(max(value, now - MAX_PLACED_AGE), now)
+
+class OrderSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # List view without nested items; item_count is annotated by the queryset
+    item_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = (
+            'id', 'order_number', 'table_number', 'status', 'total_amount',
+            'payment_method', 'order_type', 'waiter_name', 'item_count',
+            'created_at', 'updated_at'
+        )
+
+class CustomerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
+        # Moved only through the loyalty ledger (api/loyalty.py)
+        read_only_fields = ('loyalty_points',)
+
+class LoyaltyEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LoyaltyEntry
+        fields = ('id', 'order', 'points', 'reason', 'note', 'created_at')
@@ -0,0 +1,172 @@
+"""
+Kitchen ticket routing.
+
+Every product is prepared at a ``Station``: its own, or else its category's.
+When an order is placed its items are split into one ``Ticket`` per station,
+each with its own status, start and bump times, so a station screen reads
+only its open tickets through the partial (station, created_at) index instead
+of downloading the whole board and filtering it client-side.
+
+Tickets and their order move together: the order is ``preparing`` once any
+ticket starts and ``ready`` once every ticket is bumped; cancelling, readying
+or serving the order as a whole closes its open tickets.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Min, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ACTIVE_ORDER_STATUSES, OPEN_TICKET_STATUSES, Product, Station, Ticket
+
+TRANSITIONS = {
+    'pending': {'preparing', 'ready'},
+    'preparing': {'pending', 'ready'},
+    # Recall a bumped ticket back onto the screen
+    'ready': {'preparing'},
+}
+STATS_WINDOW = 3600  # seconds of bumps behind throughput and prep time
+
+
+def routed_products(product_ids):
+    """``in_bulk`` of products annotated with the station that prepares them."""
+    if not product_ids:
+        return {}
+    return Product.objects.annotate(station_route=Coalesce('station', 'category__station')).in_bulk(product_ids)
+
+
+def route_orders(pairs):
+    """
+    Open one ticket per (order, station) for saved orders and point each of
+    their unsaved items at its ticket; items without a station get none.
+    """
+    tickets = {}
+    for order, items in pairs:
+        for item in items:
+            station_id = getattr(item.product, 'station_route', None)
+            if station_id is None:
+                continue
+            key = (order.pk, station_id)
+            if key not in tickets:
+                tickets[key] = Ticket(order=order, station_id=station_id)
+            item.ticket = tickets[key]
+    if not tickets:
+        return []
+    Ticket.objects.bulk_create(tickets.values())
+    if next(iter(tickets.values())).pk is None:
+        # Backends that cannot return ids from a bulk insert
+        for order_id, station_id, pk in Ticket.objects.filter(
+            order__in={order_id for order_id, _ in tickets}
+        ).values_list('order', 'station', 'id'):
+            tickets[order_id, station_id].pk = pk
+    return list(tickets.values())
+
+
+def route_order(order, items):
+    return route_orders([(order, items)])
+
+
+def order_status_changed(order, old_status):
+    """Close the open tickets of an order that left the kitchen as a whole."""
+    if order.status == old_status or order.status not in ('ready', 'served', 'cancelled'):
+        return
+    tickets = Ticket.objects.filter(order=order, status__in=OPEN_TICKET_STATUSES)
+    if order.status == 'cancelled':
+        tickets.update(status='cancelled')
+    else:
+        now = timezone.now()
+        tickets.update(status='ready', started_at=Coalesce('started_at', Value(now)), bumped_at=now)
+
+
+def set_ticket_status(ticket, status):
+    """
+    Move a ticket along; raises ValueError for a transition the screen may
+    not make. The UPDATE is conditional on the status the screen saw, so two
+    screens bumping the same ticket cannot both succeed.
+    """
+    if status not in TRANSITIONS.get(ticket.status, ()):
+        raise ValueError(f'Cannot move a ticket from {ticket.status} to {status}')
+    now = timezone.now()
+    changes = {'status': status}
+    if status == 'preparing':
+        changes['started_at'] = ticket.started_at or now
+        changes['bumped_at'] = None
+    elif status == 'ready':
+        changes['started_at'] = ticket.started_at or now
+        changes['bumped_at'] = now
+    else:
+        changes['started_at'] = None
+    if not Ticket.objects.filter(pk=ticket.pk, status=ticket.status).update(**changes):
+        raise ValueError('Ticket was changed by another screen')
+    for field, value in changes.items():
+        setattr(ticket, field, value)
+
+
+def order_status_for(order):
+    """The status an order should move to after one of its tickets changed, or None."""
+    if order.status not in ACTIVE_ORDER_STATUSES:
+        return None
+    statuses = set(
+        Ticket.objects.filter(order=order).exclude(status='cancelled').values_list('status', flat=True).distinct()
+    )
+    if not statuses:
+        return None
+    if statuses == {'ready'}:
+        status = 'ready'
+    elif statuses == {'pending'}:
+        status = order.status if order.status == 'preparing' else 'pending'
+    else:
+        status = 'preparing'
+    return status if status != order.status else None
+
+
+def queue(station_id):
+    """A station's open tickets, oldest first, with their order and items."""
+    return (
+        Ticket.objects.filter(station_id=station_id, status__in=OPEN_TICKET_STATUSES)
+        .select_related('order').prefetch_related('items').order_by('created_at', 'id')
+    )
+
+
+def stats(window=STATS_WINDOW, now=None):
+    """
+    Per-station open ticket count, oldest open ticket age, tickets bumped in
+    the last ``window`` seconds and their mean prep time (placed to bumped).
+    """
+    now = now or timezone.now()
+    rows = defaultdict(lambda: {
+        'open_tickets': 0, 'oldest_ticket_seconds': None, 'bumped': 0, 'avg_prep_seconds': None,
+    })
+    for station_id, count, oldest in (
+        Ticket.objects.filter(status__in=OPEN_TICKET_STATUSES)
+        .values_list('station').annotate(count=Count('id'), oldest=Min('created_at')).order_by()
+    ):
+        rows[station_id].update(open_tickets=count, oldest_ticket_seconds=int((now - oldest).total_seconds()))
+    prep_time = ExpressionWrapper(F('bumped_at') - F('created_at'), output_field=DurationField())
+    for station_id, count, prep in (
+        Ticket.objects.filter(status='ready', bumped_at__gte=now - timedelta(seconds=window))
+        .values_list('station').annotate(count=Count('id'), prep=Avg(prep_time)).order_by()
+    ):
+        rows[station_id].update(bumped=count, avg_prep_seconds=round(prep.total_seconds(), 1) if prep else None)
+    return [
+        {'id': station.pk, 'name': station.name, 'slug': station.slug, **rows[station.pk]}
+        for station in Station.objects.filter(is_active=True).order_by('id')
+    ]
+
+
+def prometheus_lines():
+    """Station gauges appended to /api/metrics."""
+    data = stats()
+    lines = []
+    for name, field, help_text in (
+        ('pos_station_open_tickets', 'open_tickets', 'Tickets waiting or being prepared'),
+        ('pos_station_oldest_ticket_seconds', 'oldest_ticket_seconds', 'Age of the oldest open ticket'),
+        ('pos_station_bumped_tickets', 'bumped', f'Tickets bumped in the last {STATS_WINDOW} seconds'),
+        ('pos_station_prep_seconds', 'avg_prep_seconds', 'Mean prep time of those tickets'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+        for row in data:
+            if row[field] is not None:
+                lines.append(f'{name}{{station="{row["slug"]}"}} {row[field]}')
+    return lines
@@ -0,0 +1,157 @@
+"""
+Batch sync of orders queued by terminals while offline.
+
+A terminal replays its whole queue in one request; each order carries a
+client-generated ``client_key``. Orders are validated individually, keys
+already on the server are reported as duplicates instead of being inserted
+twice, and the rest go in with one ``bulk_create`` per table inside a single
+transaction. Ticket numbers for the batch come from one sequence reservation.
+An order may carry ``placed_at``, the time it was taken (clamped to the last
+MAX_PLACED_AGE); it becomes ``created_at`` and dates the order's rollups.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import floor, loyalty, pricing, rollups, sequences, stations
+from .models import Customer, Order, OrderItem, Table
+from .serializers import OrderSyncSerializer, _as_pk
+
+MAX_BATCH = 500
+MAX_ATTEMPTS = 3
+
+
+def _result(key, outcome, order=None, errors=None):
+    result = {'client_key': key, 'status': outcome}
+    if order is not None:
+        result.update(id=order[0], order_number=order[1])
+    if errors is not None:
+        result['errors'] = errors
+    return result
+
+
+def _existing(keys):
+    return {
+        key: (pk, number) for key, pk, number in
+        Order.objects.filter(client_key__in=keys).values_list('client_key', 'id', 'order_number')
+    }
+
+
+def _insert(batch, terminal):
+    numbers = sequences.next_order_numbers(len(batch), terminal)
+    product_ids = {
+        _as_pk(item.get('productId')) for _, data in batch for item in data['items_data']
+    } - {None}
+    products = stations.routed_products(product_ids)
+    table_ids = {data['table'] for _, data in batch if data.get('table')}
+    table_numbers = {data['table_number'] for _, data in batch if data.get('table_number')}
+    tables = list(Table.objects.filter(Q(pk__in=table_ids) | Q(table_number__in=table_numbers))) \
+        if table_ids or table_numbers else []
+    tables_by_id = {table.pk: table for table in tables}
+    tables_by_number = {table.table_number: table for table in tables}
+    customer_ids = {data['customer'] for _, data in batch if data.get('customer')}
+    customers = set(Customer.objects.filter(pk__in=customer_ids).values_list('id', flat=True)) \
+        if customer_ids else set()
+
+    orders, items, placed = [], [], []
+    for (_, data), number in zip(batch, numbers):
+        data = dict(data)
+        items_data = data.pop('items_data')
+        placed_at = data.pop('placed_at', None)
+        table = tables_by_id.get(data.pop('table', None)) or tables_by_number.get(data.get('table_number'))
+        data['table'] = table
+        if table is not None:
+            data['table_number'] = table.table_number
+        # Unknown customers (deleted while the terminal was offline) are dropped
+        customer_id = data.pop('customer', None)
+        data['customer_id'] = customer_id if customer_id in customers else None
+        # Sold at the terminal's prices while offline: totalled as charged, not repriced
+        priced = pricing.price_cart(
+            [(None, item['price'], item['quantity']) for item in items_data], discount=data.get('discount', 0)
+        )
+        data['discount'] = priced.discount
+        orders.append(Order(order_number=number, subtotal=priced.subtotal, total_amount=priced.total, **data))
+        if placed_at is not None:
+            placed.append((orders[-1], placed_at))
+        items.append([
+            OrderItem(
+                product=products.get(_as_pk(item.get('productId'))),
+                product_name=item.get('name'),
+                price=price,
+                quantity=int(item['quantity']),
+                notes=item.get('notes', ''),
+            )
+            for item, price in zip(items_data, priced.prices)
+        ])
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        if orders and orders[0].pk is None:
+            # Backends that cannot return ids from a bulk insert
+            ids = dict(Order.objects.filter(
+                client_key__in=[order.client_key for order in orders]
+            ).values_list('client_key', 'id'))
+            for order in orders:
+                order.pk = ids[order.client_key]
+        if placed:
+            # auto_now_add stamped the insert with the sync time
+            for order, placed_at in placed:
+                order.created_at = placed_at
+            Order.objects.bulk_update([order for order, _ in placed], ['created_at'])
+        for order, order_items in zip(orders, items):
+            for item in order_items:
+                item.order = order
+        stations.route_orders(list(zip(orders, items)))
+        OrderItem.objects.bulk_create([item for order_items in items for item in order_items])
+        rollups.orders_created(zip(orders, items))
+        floor.orders_created(orders)
+        loyalty.orders_created(orders)
+    return {order.client_key: (order.pk, order.order_number) for order in orders}
+
+
+def sync_orders(payloads, terminal=None):
+    """Insert a batch of offline orders; returns one result per payload, in order."""
+    keys = [
+        payload.get('client_key') if isinstance(payload, dict) and isinstance(payload.get('client_key'), str) else None
+        for payload in payloads
+    ]
+    # Replays are mostly orders the server already has: look their keys up
+    # first so they skip validation entirely
+    existing = _existing([key for key in keys if key])
+
+    errors = {}
+    valid = {}
+    for index, payload in enumerate(payloads):
+        if keys[index] in existing or keys[index] in valid:
+            continue
+        serializer = OrderSyncSerializer(data=payload)
+        if not serializer.is_valid():
+            errors[index] = serializer.errors
+            continue
+        keys[index] = serializer.validated_data['client_key']
+        valid.setdefault(keys[index], serializer.validated_data)
+
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            # The same queue is being replayed concurrently; its keys are now
+            # on the server, so re-check them and insert the rest again
+            existing.update(_existing(list(valid)))
+        batch = [(key, data) for key, data in valid.items() if key not in existing]
+        try:
+            created = _insert(batch, terminal) if batch else {}
+            break
+        except IntegrityError:
+            continue
+    else:
+        raise IntegrityError('Could not sync batch after concurrent replays')
+
+    results = []
+    for index, key in enumerate(keys):
+        if index in errors:
+            results.append(_result(key, 'invalid', errors=errors[index]))
+        elif key in created:
+            results.append(_result(key, 'created', created.pop(key)))
+            existing[key] = (results[-1]['id'], results[-1]['order_number'])
+        else:
+            # Already on the server, or repeated within this batch
+            results.append(_result(key, 'duplicate', existing[key]))
+    return results
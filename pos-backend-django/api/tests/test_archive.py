@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import archive, rollups
+from ..models import ArchivedOrder, Order, SalesRollup
+
+
+class OrderArchiveTests(TestCase):
+    """Old finished orders leave the hot tables but every read still finds them."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.ids = []
+        ages = ((400, 'served'), (300, 'cancelled'), (300, 'pending'), (200, 'served'), (200, 'served'), (1, 'served'),
+                (0, 'served'))
+        for days, status in ages:
+            response = self.client.post('/api/orders/', {
+                'payment_method': 'cash', 'order_type': 'takeaway', 'status': status,
+                'items_data': [
+                    {'name': 'Dosa', 'price': '6.50', 'quantity': 2}, {'name': 'Chai', 'price': '1', 'quantity': 1}
+                ],
+            }, format='json')
+            self.ids.append(response.json()['id'])
+            # Two orders share a timestamp, as bulk offline syncs do
+            Order.objects.filter(pk=self.ids[-1]).update(
+                created_at=timezone.now().replace(microsecond=0) - timedelta(days=days)
+            )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            body = self.client.get(url).json()
+            ids += [order['id'] for order in body['results']]
+            url = body['next']
+        return ids
+
+    def rollups(self):
+        rollups.rebuild()
+        rows = SalesRollup.objects.values_list('period', 'bucket', 'order_count', 'revenue')
+        return list(rows.order_by('period', 'bucket'))
+
+    def export(self):
+        url = '/api/orders/export/?kind=items&output=ndjson&start=2000-01-01&end=2100-01-01'
+        return list(self.client.get(url).streaming_content)
+
+    def test_archived_orders_stay_readable(self):
+        totals, export = self.rollups(), self.export()
+
+        self.assertEqual(archive.archive_orders(archive.cutoff()), 4)
+        archived = sorted(ArchivedOrder.objects.values_list('id', flat=True))
+        self.assertEqual(archived, sorted(self.ids[:2] + self.ids[3:5]))
+        self.assertEqual(Order.objects.count(), 3)
+
+        newest_first = self.ids[::-1]
+        for url in ('/api/orders/?page_size=2', '/api/async/orders/?page_size=2&view=summary'):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.walk(url), newest_first[:2] + sorted(newest_first[2:4], reverse=True) + newest_first[4:]
+                )
+        self.assertEqual(self.walk('/api/orders/?status=cancelled'), [self.ids[1]])
+        self.assertEqual(self.walk('/api/orders/?status=pending'), [self.ids[2]])
+
+        order = self.client.get(f'/api/orders/{self.ids[0]}/').json()
+        items = [(item['product_name'], item['quantity']) for item in order['items']]
+        self.assertEqual(items, [('Dosa', 2), ('Chai', 1)])
+        self.assertEqual(order['total_amount'], '14.00')
+        response = self.client.patch(f'/api/orders/{self.ids[0]}/status/', {'status': 'pending'}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+        self.assertEqual(self.export(), export)
+        self.assertEqual(self.rollups(), totals)
+
+    def test_archived_ids_are_never_reused(self):
+        Order.objects.update(status='served', created_at=timezone.now() - timedelta(days=400))
+        self.assertEqual(archive.archive_orders(archive.cutoff()), len(self.ids))
+        # Nothing hot is left to hold the id counter up
+        self.assertFalse(Order.objects.exists())
+
+        response = self.client.post('/api/orders/', {
+            'payment_method': 'card', 'order_type': 'takeaway',
+            'items_data': [{'name': 'Vada', 'price': '3', 'quantity': 1}],
+        }, format='json')
+        new_id = response.json()['id']
+        self.assertGreater(new_id, max(self.ids))
+        self.assertEqual(self.client.get(f'/api/orders/{new_id}/').json()['items'][0]['product_name'], 'Vada')
+        self.assertEqual(self.client.get(f'/api/orders/{self.ids[-1]}/').json()['total_amount'], '14.00')
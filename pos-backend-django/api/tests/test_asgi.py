@@ -0,0 +1,46 @@
+import gzip
+import json
+import tempfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, TestCase
+
+from .. import dbtuning, metrics, rollups
+from ..models import Table
+from .test_dbtuning import slow_query
+
+
+class AsgiStackTests(TestCase):
+    """Under ASGI every middleware runs on the event loop, so an async view never waits for a thread."""
+
+    def setUp(self):
+        self.client = AsyncClient()
+        Table.objects.bulk_create(Table(table_number=str(i), capacity=4) for i in range(20))
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(METRICS_DIR=self.directory))
+        self.enterContext(mock.patch.object(metrics, '_store', None))
+        self.enterContext(mock.patch.object(metrics, 'FLUSH_INTERVAL', 0))
+        self.enterContext(mock.patch.object(metrics.random, 'random', return_value=0.0))
+
+    def test_no_middleware_is_adapted(self):
+        # Django logs each sync-only middleware it wraps in a thread hop
+        with self.settings(DEBUG=True), self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    async def test_async_view(self):
+        response = await self.client.get('/api/async/tables/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 20)
+
+        series = metrics.get_store().series['async-table-list|GET']
+        self.assertEqual((series['requests'], series['sampled']), (1, 1))
+        self.assertEqual(series['queries'], 1)
+
+    @mock.patch.dict(dbtuning.TIMEOUTS, {'async-analytics-dashboard': 50})
+    async def test_route_timeout(self):
+        with mock.patch.object(rollups, 'adashboard_series', side_effect=sync_to_async(slow_query)):
+            response = await self.client.get('/api/async/analytics/dashboard/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual((await self.client.get('/api/async/analytics/dashboard/')).status_code, 200)
@@ -0,0 +1,63 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .. import auth
+
+
+class TokenAuthenticationTests(TestCase):
+    """Authenticated requests resolve the user from token claims, not the database."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='cashier', password='s3cret-pass', is_staff=True)
+        auth.user_cache.clear()
+
+    def test_claims_and_user_cache(self):
+        response = self.client.post('/api/auth/login/', {'username': 'cashier', 'password': 's3cret-pass'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['data']['user']['role'], 'admin')
+        self.assertEqual(AccessToken(body['token'])['role'], 'admin')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {body['token']}")
+        self.client.get('/api/categories/')  # warm the catalog cache
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get('/api/categories/').status_code, 200)
+        # Only the catalog version is read; no user lookup
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        # Profile reads come from the cache, which an update invalidates
+        response = self.client.patch('/api/auth/updateMe/', {'first_name': 'Ana'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.client.get('/api/auth/updateMe/').json()['first_name'], 'Ana')
+            self.client.get('/api/auth/updateMe/')
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        # Tokens issued before role claims still work, through the cache
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get('/api/auth/updateMe/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/auth/updateMe/').status_code, 401)
+
+    def test_update_does_not_write_back_a_stale_copy(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get('/api/auth/updateMe/').status_code, 200)  # cached here
+        # Another worker revokes staff and resets the password; this cache never hears of it
+        User.objects.filter(pk=self.user.pk).update(is_staff=False, password='changed-elsewhere')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch('/api/auth/updateMe/', {'last_name': 'Rao'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        update = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(update), 1)
+        self.assertNotIn('"password"', update[0])
+        self.user.refresh_from_db()
+        self.assertEqual(
+            (self.user.last_name, self.user.is_staff, self.user.password), ('Rao', False, 'changed-elsewhere')
+        )
@@ -0,0 +1,76 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .. import catalog
+from ..models import Category, Product
+
+
+class CatalogCacheTests(TestCase):
+    """Menu reads are answered from a versioned snapshot; every kind of catalog write moves the version on."""
+
+    def setUp(self):
+        self.client = APIClient()
+        catalog.bump_version()
+        self.category = Category.objects.create(name='Drinks', slug='drinks')
+        self.chai = Product.objects.create(name='Chai', price=Decimal('1.25'), category=self.category)
+
+    def get(self, url='/api/products/catalog/', etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def prices(self, response):
+        return {product['name']: product['price'] for product in response.json()['products']}
+
+    def test_etag_answers_304(self):
+        for url in ('/api/products/catalog/', '/api/async/products/catalog/'):
+            with self.subTest(url=url):
+                first = self.get(url)
+                self.assertEqual((first.status_code, first['Cache-Control']), (200, 'no-cache'))
+                # One version lookup: nothing is queried or rendered
+                with self.assertNumQueries(1):
+                    again = self.get(url, first['ETag'])
+                self.assertEqual((again.status_code, again['ETag'], again.content), (304, first['ETag'], b''))
+                self.assertEqual(self.get(url, '"catalog-0"').status_code, 200)
+
+    def test_product_edit_invalidates(self):
+        etag = self.get()['ETag']
+        response = self.client.patch(f'/api/products/{self.chai.pk}/', {'price': '1.50'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        changed = self.get(etag=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(self.prices(changed), {'Chai': '1.50'})
+        self.assertEqual(self.prices(self.get('/api/async/products/catalog/')), {'Chai': '1.50'})
+
+    def test_shared_version_moves_on_commit(self):
+        with mock.patch.object(catalog, '_shared', return_value=True):
+            version = catalog.current_version()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(f'/api/products/{self.chai.pk}/', {'price': '1.50'}, format='json')
+                # Until the commit other readers see the old rows, so they keep the old version
+                self.assertEqual(catalog.current_version(), version)
+            self.assertNotEqual(catalog.current_version(), version)
+
+    def test_version_outlives_the_cache(self):
+        etag = self.get()['ETag']
+        # Another worker, or this one after its cache entries were evicted
+        caches['catalog'].clear()
+        catalog._local.clear()
+        self.assertEqual(self.get(etag=etag).status_code, 304)
+
+    def test_search_rebuild_invalidates_bulk_loads(self):
+        etag = self.get()['ETag']
+        Product.objects.bulk_create([Product(name='Lassi', price=Decimal('2.00'), category=self.category)])
+        self.assertEqual(self.get(etag=etag).status_code, 304)
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.get(etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.prices(response), {'Chai': '1.25', 'Lassi': '2.00'})
@@ -0,0 +1,62 @@
+import gzip
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .. import compression, renderers
+from ..models import Order
+from ..serializers import OrderSerializer
+
+
+class ResponseEncodingTests(TestCase):
+    """Fast renderers change the cost of a body, never its content."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(30):
+            self.client.post('/api/orders/', {
+                'payment_method': 'cash', 'order_type': 'takeaway', 'waiter_name': 'Zoë\u2028',
+                'items_data': [{'name': f'Item {i}', 'price': '2.75', 'quantity': 2}],
+            }, format='json')
+
+    def test_fast_json_matches_drf(self):
+        data = {
+            'orders': OrderSerializer(Order.objects.prefetch_related('items'), many=True).data,
+            'when': timezone.now(), 'day': timezone.localdate(), 'total': Decimal('12.50'), 7: None,
+        }
+        self.assertEqual(renderers.FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(data, 'application/json; indent=2'),
+            JSONRenderer().render(data, 'application/json; indent=2')
+        )
+
+    def test_compression(self):
+        plain = self.client.get('/api/orders/')
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertIn('Accept-Encoding', plain['Vary'])
+
+        compressed = self.client.get('/api/orders/', HTTP_ACCEPT_ENCODING='br;q=0.9, gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'br' if compression.brotli else 'gzip')
+        if not compression.brotli:
+            self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertLess(len(compressed.content), len(plain.content))
+
+        small = self.client.get('/api/orders/?view=summary&page_size=1', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertNotIn('Content-Encoding', small)
+        export = self.client.get('/api/orders/export/?output=ndjson', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(export.streaming)
+        self.assertNotIn('Content-Encoding', export)
+        refused = self.client.get('/api/orders/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertNotIn('Content-Encoding', refused)
+
+    @skipUnless(renderers.msgpack, 'msgpack is not installed')
+    def test_msgpack(self):
+        response = self.client.get('/api/orders/', HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(
+            renderers.msgpack.unpackb(response.content), self.client.get('/api/orders/').json()
+        )
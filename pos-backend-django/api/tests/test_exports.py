@@ -0,0 +1,23 @@
+import csv
+from io import StringIO
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+
+class OrderExportTests(TestCase):
+    """CSV exports keep free text typed at a terminal from running as a spreadsheet formula."""
+
+    def test_formula_cells_are_quoted(self):
+        response = APIClient().post('/api/orders/', {
+            'payment_method': 'cash', 'order_type': 'takeaway', 'waiter_name': '=HYPERLINK("http://x")',
+            'items_data': [{'name': '-2+3', 'price': '1', 'quantity': 1, 'notes': '@SUM(A1)'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        for kind, fields in (('orders', {'waiter_name': '\'=HYPERLINK("http://x")', 'total_amount': '1.00'}),
+                             ('items', {'product_name': "'-2+3", 'notes': "'@SUM(A1)", 'quantity': '1'})):
+            with self.subTest(kind=kind):
+                response = APIClient().get(f'/api/orders/export/?kind={kind}&output=csv')
+                row = next(csv.DictReader(StringIO(b''.join(response.streaming_content).decode())))
+                self.assertEqual({field: row[field] for field in fields}, fields)
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import feed, transitions, views
+from ..models import Order
+
+
+class OrderFeedTests(TestCase):
+    """The change feed hands out cursors that round-trip, rejects bad ones, and stops waiting on time."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def order(self, number, status='pending'):
+        return Order.objects.create(
+            order_number=number, status=status, total_amount=Decimal('1'), subtotal=Decimal('1'),
+            payment_method='cash', order_type='takeaway',
+        )
+
+    def poll(self, url='/api/orders/feed/', **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_cursor_round_trip(self):
+        order = self.order('F1')
+        self.assertEqual(feed.decode_cursor(feed.encode_cursor(order)), (order.updated_at, order.pk))
+
+        board = self.poll()
+        self.assertEqual([row['id'] for row in board['orders']], [order.pk])
+        self.assertEqual(self.poll(since=board['cursor'])['orders'], [])
+
+        transitions.transition(order, 'ready')
+        changed = self.poll(since=board['cursor'])
+        self.assertEqual([(row['id'], row['status']) for row in changed['orders']], [(order.pk, 'ready')])
+        self.assertEqual(self.poll(url='/api/async/orders/feed/', since=board['cursor'])['orders'], changed['orders'])
+
+    def test_late_commit_behind_the_cursor(self):
+        first = self.order('F1')
+        cursor = self.poll()['cursor']
+        # Stamped before F1 but committed after the cursor had moved past it
+        late = self.order('F2')
+        Order.objects.filter(pk=late.pk).update(updated_at=first.updated_at - timedelta(seconds=1))
+
+        changed = self.poll(since=cursor)
+        self.assertEqual([row['id'] for row in changed['orders']], [late.pk])
+        # Delivered once: the overlap window is re-read, not re-sent
+        self.assertEqual(self.poll(since=changed['cursor'])['orders'], [])
+        self.assertEqual(self.poll(url='/api/async/orders/feed/', since=changed['cursor'])['orders'], [])
+
+    def test_bad_cursors(self):
+        for cursor in ('garbage', '1-x', '99999999999999999999-1', '0-99999999999999999999', '1-1~x', '1-1~1.y'):
+            with self.subTest(cursor=cursor):
+                self.assertRaises(ValueError, feed.decode_cursor, cursor)
+                self.assertRaises(ValueError, feed.decode_feed_cursor, cursor)
+                self.assertEqual(self.client.get('/api/orders/feed/', {'since': cursor}).status_code, 400)
+                self.assertEqual(self.client.get('/api/async/orders/feed/', {'since': cursor}).status_code, 400)
+                self.assertEqual(self.client.get('/api/async/orders/', {'cursor': cursor}).status_code, 400)
+                self.assertEqual(self.client.get('/api/orders/', {'cursor': cursor}).status_code, 404)
+
+    @mock.patch.object(views, 'FEED_POLL_INTERVAL', 0.05)
+    @mock.patch.object(views, 'SYNC_FEED_MAX_WAIT', 0.2)
+    def test_empty_poll_times_out(self):
+        cursor = self.poll()['cursor']
+        started = timezone.now()
+        # A sync worker is held for SYNC_FEED_MAX_WAIT at most, whatever ?wait= asks for
+        data = self.poll(since=cursor, wait=60)
+        self.assertLess((timezone.now() - started).total_seconds(), 5)
+        self.assertEqual((data['orders'], data['cursor'], data['hasMore']), ([], cursor, False))
+        self.assertEqual(self.poll(url='/api/async/orders/feed/', since=cursor, wait=0.2)['orders'], [])
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import Table, Order
+
+
+class TableSessionTests(TestCase):
+    """Orders drive table occupancy; staff cannot clear a table with orders on the board."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.table = Table.objects.create(table_number='7', capacity=4)
+
+    def order(self, price):
+        response = self.client.post('/api/orders/', {
+            'table_number': '7', 'payment_method': 'card', 'order_type': 'dine-in',
+            'items_data': [{'name': 'Soup', 'price': price, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def set_status(self, order_id, new_status):
+        response = self.client.patch(f'/api/orders/{order_id}/status/', {'status': new_status}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_session_lifecycle(self):
+        first, second = self.order(10), self.order(6)
+        self.table.refresh_from_db()
+        self.assertEqual((self.table.status, self.table.active_orders), ('occupied', 2))
+        self.assertEqual(self.table.session_total, Decimal('16'))
+        self.assertEqual(self.table.active_order_id, second)
+        self.assertEqual(Order.objects.get(pk=first).table_id, self.table.pk)
+
+        response = self.client.patch(f'/api/tables/{self.table.pk}/status/', {'status': 'available'}, format='json')
+        self.assertEqual(response.status_code, 409)
+
+        self.set_status(second, 'cancelled')
+        self.table.refresh_from_db()
+        self.assertEqual((self.table.active_orders, self.table.session_total), (1, Decimal('10')))
+
+        with CaptureQueriesContext(connection) as ctx:
+            tables = self.client.get('/api/tables/floor/').json()['data']['tables']
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(tables[0]['active_order']['id'], second)
+        self.assertGreaterEqual(tables[0]['elapsed_seconds'], 0)
+
+        self.set_status(first, 'served')
+        self.table.refresh_from_db()
+        self.assertEqual((self.table.status, self.table.active_orders), ('available', 0))
+        self.assertIsNone(self.table.occupied_since)
+        self.assertEqual(self.table.session_total, Decimal('0'))
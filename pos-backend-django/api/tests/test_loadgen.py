@@ -0,0 +1,47 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db.models import F
+from django.test import TestCase
+
+from .. import loadgen, stations
+from ..models import ACTIVE_ORDER_STATUSES, Category, Product, Table, Order, Customer, LoyaltyEntry, Station, Ticket
+
+
+class LoadDataTests(TestCase):
+    """Generated load data looks like the app wrote it: seated tables, live tickets, a loyalty ledger."""
+
+    def setUp(self):
+        grill = Station.objects.create(name='Grill', slug='grill')
+        category = Category.objects.create(name='Mains', slug='mains')
+        Product.objects.create(name='Dosa', price=Decimal('4.50'), category=category, station=grill)
+        Product.objects.create(name='Chai', price=Decimal('1.25'), category=category)
+        for number in range(1, 4):
+            Table.objects.create(table_number=str(number), capacity=4)
+
+    @mock.patch.object(loadgen, 'ACTIVE_WINDOW', timedelta(hours=12))
+    def test_generated_rows_are_consistent(self):
+        products = stations.routed_products(list(Product.objects.values_list('id', flat=True))).values()
+        generator = loadgen.LoadDataGenerator(products, days=2, seed=7)
+        list(generator.insert_customers(20, chunk_size=8))
+        list(generator.insert_orders(300, chunk_size=100))
+        active = Order.objects.filter(status__in=ACTIVE_ORDER_STATUSES)
+        self.assertTrue(active.exists())
+
+        for customer in Customer.objects.all():
+            ledger = LoyaltyEntry.objects.filter(customer=customer).values_list('points', flat=True)
+            self.assertEqual(sum(ledger), customer.loyalty_points)
+        self.assertTrue(LoyaltyEntry.objects.filter(order__status='served').exists())
+
+        dine_in = Order.objects.filter(order_type='dine-in')
+        self.assertFalse(dine_in.filter(table=None).exists())
+        self.assertFalse(dine_in.exclude(table_number=F('table__table_number')).exists())
+        for table in Table.objects.all():
+            seated = active.filter(table=table).count()
+            self.assertEqual((table.active_orders, table.status), (seated, 'occupied' if seated else 'available'))
+
+        self.assertFalse(Ticket.objects.exclude(order__status__in=ACTIVE_ORDER_STATUSES).exists())
+        for order in active.filter(items__product_name='Dosa').distinct():
+            self.assertEqual(list(order.tickets.values_list('status', flat=True)), [order.status])
+            self.assertFalse(order.items.filter(product_name='Dosa', ticket=None).exists())
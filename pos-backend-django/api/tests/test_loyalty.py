@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import loyalty
+from ..models import Order, Customer, LoyaltyEntry
+
+
+class LoyaltyLedgerTests(TestCase):
+    """Served orders credit their customer through the ledger; un-serving takes the points back."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Ravi', phone='5550101')
+        Customer.objects.create(name='Mina', phone='5550199')
+        Customer.objects.create(name='Omar', phone='5560000')
+
+    def order(self, price, **extra):
+        response = self.client.post('/api/orders/', {
+            'payment_method': 'cash', 'order_type': 'takeaway', 'customer': self.customer.pk,
+            'items_data': [{'name': 'Thali', 'price': price, 'quantity': 1}], **extra,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def set_status(self, order_id, new_status):
+        response = self.client.patch(f'/api/orders/{order_id}/status/', {'status': new_status}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def balance(self):
+        self.customer.refresh_from_db()
+        ledger = sum(LoyaltyEntry.objects.filter(customer=self.customer).values_list('points', flat=True))
+        self.assertEqual(ledger, self.customer.loyalty_points)
+        return self.customer.loyalty_points
+
+    def test_accrual_and_reversal(self):
+        first, second = self.order('12.50'), self.order('30')
+        self.assertEqual(self.balance(), 0)
+        self.set_status(first, 'served')
+        self.set_status(first, 'served')
+        self.assertEqual(self.balance(), 12)
+        # A terminal that read the ledger before the credit above backs off
+        self.assertFalse(loyalty._post(Order.objects.get(pk=first), self.customer.pk, 0, 12, 'earn'))
+        self.assertEqual(self.balance(), 12)
+        self.set_status(second, 'served')
+        self.set_status(first, 'ready')
+        self.assertEqual(self.balance(), 30)
+        self.set_status(first, 'served')
+        self.assertEqual(self.balance(), 42)
+        self.assertEqual(self.client.delete(f'/api/orders/{second}/').status_code, 204)
+        self.assertEqual(self.balance(), 12)
+        self.assertEqual(
+            list(LoyaltyEntry.objects.filter(order=first).values_list('reason', flat=True).order_by('sequence')),
+            ['earn', 'reverse', 'earn']
+        )
+
+        response = self.client.post(f'/api/customers/{self.customer.pk}/loyalty/', {'points': -2, 'note': 'Refund'}, format='json')
+        self.assertEqual(response.json()['data']['loyalty_points'], 10)
+        self.assertEqual(response.json()['data']['entries'][0]['reason'], 'adjust')
+        # The balance is not writable directly
+        self.client.patch(f'/api/customers/{self.customer.pk}/', {'loyalty_points': 500}, format='json')
+        self.assertEqual(self.balance(), 10)
+
+    def test_customer_change_moves_the_points(self):
+        order = self.order('20')
+        self.set_status(order, 'served')
+        mina = Customer.objects.get(phone='5550199')
+        response = self.client.patch(f'/api/orders/{order}/', {'customer': mina.pk}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.balance(), 0)
+        mina.refresh_from_db()
+        self.assertEqual(mina.loyalty_points, 20)
+        self.assertEqual(
+            list(LoyaltyEntry.objects.filter(order=order).values_list('customer', 'points').order_by('sequence')),
+            [(self.customer.pk, 20), (self.customer.pk, -20), (mina.pk, 20)]
+        )
+
+    def test_synced_served_orders(self):
+        response = self.client.post('/api/orders/sync/', {'orders': [
+            {
+                'client_key': f'k{i}', 'payment_method': 'cash', 'order_type': 'takeaway', 'status': 'served',
+                'customer': customer, 'items_data': [{'name': 'Tea', 'price': '4', 'quantity': 1}],
+            }
+            for i, customer in enumerate((self.customer.pk, self.customer.pk, 999999, None))
+        ]}, format='json')
+        self.assertEqual([r['status'] for r in response.json()['data']['results']], ['created'] * 4)
+        self.assertEqual(self.balance(), 8)
+        self.assertEqual(Order.objects.filter(customer__isnull=True).count(), 2)
+
+    def test_phone_lookup(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/customers/lookup/', {'phone': '5550'})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        customers = response.json()['data']['customers']
+        self.assertEqual([c['phone'] for c in customers], ['5550101', '5550199'])
+        self.assertEqual(set(customers[0]), set(loyalty.LOOKUP_FIELDS))
+        self.assertEqual(self.client.get('/api/customers/lookup/', {'phone': '55'}).status_code, 400)
+
+
+class LoyaltyConcurrencyTests(TransactionTestCase):
+    """The same customer paying on several terminals at once loses no points and double-counts none."""
+    terminals = 6
+
+    def test_no_lost_or_double_credits(self):
+        customer = Customer.objects.create(name='Ravi', phone='5550101')
+        orders = [
+            Order.objects.create(
+                order_number=f'L{i}', customer=customer, status='ready', total_amount=Decimal(10 + i),
+                subtotal=Decimal(10 + i), payment_method='card', order_type='takeaway',
+            )
+            for i in range(self.terminals)
+        ]
+
+        def serve(order_id):
+            try:
+                return APIClient().patch(f'/api/orders/{order_id}/status/', {'status': 'served'}, format='json').status_code
+            finally:
+                connection.close()
+
+        # Every order served from two terminals at the same time
+        with ThreadPoolExecutor(max_workers=self.terminals * 2) as pool:
+            codes = list(pool.map(serve, [order.pk for order in orders] * 2))
+        self.assertEqual(codes, [200] * len(codes))
+
+        customer.refresh_from_db()
+        self.assertEqual(customer.loyalty_points, sum(10 + i for i in range(self.terminals)))
+        self.assertEqual(LoyaltyEntry.objects.filter(customer=customer).count(), self.terminals)
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .. import metrics
+
+
+class RequestMetricsTests(TestCase):
+    """Every request is counted and flushed; sampled ones add timings; exited workers' files are folded away."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(METRICS_DIR=self.directory))
+        self.enterContext(mock.patch.object(metrics, '_store', None))
+        self.enterContext(mock.patch.object(metrics, 'FLUSH_INTERVAL', 0))
+
+    def request(self, sampled):
+        with mock.patch.object(metrics.random, 'random', return_value=0.0 if sampled else 1.0):
+            self.assertEqual(self.client.get('/api/tables/').status_code, 200)
+
+    def series(self, data):
+        return data['table-list|GET']
+
+    def test_sampled_request_records_timings(self):
+        self.request(sampled=True)
+        on_disk = self.series(metrics._read(metrics.get_store().path))
+        self.assertEqual((on_disk['requests'], on_disk['sampled'], on_disk['status']), (1, 1, {'2xx': 1}))
+        self.assertGreater(on_disk['queries'], 0)
+        self.assertGreater(on_disk['bytes'], 0)
+
+        body = self.client.get('/api/metrics').content.decode()
+        self.assertIn('pos_requests_total{route="table-list",method="GET",status="2xx"} 1', body)
+        self.assertIn('pos_request_duration_seconds_count{route="table-list",method="GET"} 1', body)
+
+    def test_unsampled_request_is_counted_and_flushed(self):
+        self.request(sampled=False)
+        on_disk = self.series(metrics._read(metrics.get_store().path))
+        self.assertEqual((on_disk['requests'], on_disk['sampled'], on_disk['queries']), (1, 0, 0))
+
+    def test_collect_folds_exited_workers(self):
+        self.request(sampled=False)
+        store = metrics.get_store()
+        gone = {'table-list|GET': {**self.series(store.series), 'requests': 4, 'status': {'2xx': 3, '5xx': 1}}}
+        for name in ('999999-1.json', '999999-2.json'):
+            with open(os.path.join(self.directory, name), 'w') as fh:
+                json.dump(gone, fh)
+
+        with mock.patch.object(metrics, '_pid_alive', side_effect=lambda pid: pid == os.getpid()):
+            first = self.series(store.collect())
+            second = self.series(store.collect())
+        self.assertEqual((first['requests'], dict(first['status'])), (9, {'2xx': 7, '5xx': 2}))
+        self.assertEqual(second['requests'], first['requests'])
+        left = sorted(os.listdir(self.directory))
+        self.assertEqual(left, sorted(['.lock', metrics.RETIRED_FILE, os.path.basename(store.path)]))
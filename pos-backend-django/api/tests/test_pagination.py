@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from ..models import Order, Customer
+
+
+class PaginationTests(TestCase):
+    """Keyset pages never skip or repeat rows, even when created_at ties; ?fields= trims payloads."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def walk(self, url):
+        rows, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            rows += response.json()['results']
+            url = response.json()['next']
+            pages += 1
+        return rows, pages
+
+    def test_customer_pages_with_tied_created_at(self):
+        customers = [Customer.objects.create(name=f'C{i}', phone=f'555{i:04d}') for i in range(7)]
+        tied = timezone.now()
+        Customer.objects.update(created_at=tied)
+        rows, pages = self.walk('/api/customers/?page_size=2')
+        self.assertEqual(pages, 4)
+        self.assertEqual([row['id'] for row in rows], sorted((c.id for c in customers), reverse=True))
+
+    def test_order_history_pages_with_tied_created_at(self):
+        orders = [
+            Order.objects.create(
+                order_number=f'P{i}', total_amount=Decimal('1'), subtotal=Decimal('1'),
+                payment_method='cash', order_type='takeaway',
+            ) for i in range(5)
+        ]
+        Order.objects.update(created_at=timezone.now())
+        rows, pages = self.walk('/api/orders/?view=summary&page_size=2')
+        self.assertEqual(pages, 3)
+        self.assertEqual([row['id'] for row in rows], sorted((o.id for o in orders), reverse=True))
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get('/api/orders/?cursor=garbage').status_code, 404)
+        self.assertEqual(self.client.get('/api/customers/?cursor=garbage').status_code, 404)
+
+    def test_sparse_fields(self):
+        Customer.objects.create(name='Asha', phone='5550000', email='asha@example.com')
+        row = self.client.get('/api/customers/?fields=id,name').json()['results'][0]
+        self.assertEqual(set(row), {'id', 'name'})
+        # Writes always answer with the whole object
+        response = self.client.post('/api/customers/?fields=id', {'name': 'Ben', 'phone': '5550001'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('phone', response.json())
@@ -0,0 +1,73 @@
+import random
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .. import catalog, pricing
+from ..models import Category, Product, Order
+
+
+class PricingTests(TestCase):
+    """The integer-cents engine agrees with line-by-line Decimal to the cent."""
+
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name='Mains', slug='mains')
+        self.burger = Product.objects.create(name='Burger', price=Decimal('9.99'), category=category)
+
+    def random_carts(self, rng, product_ids, count):
+        carts = []
+        for _ in range(count):
+            lines = [
+                (
+                    rng.choice(product_ids + [None]),
+                    # Off-menu prices as terminals send them, sub-cent digits included
+                    rng.choice((str(rng.randint(0, 50000) / 100), f'{rng.randint(0, 500000) / 1000:.3f}')),
+                    rng.randint(1, 25),
+                )
+                for _ in range(rng.randint(0, 12))
+            ]
+            carts.append((lines, rng.choice((0, '0.01', str(rng.randint(0, 20000) / 100), '1000000'))))
+        return carts
+
+    def test_engine_matches_reference(self):
+        rng = random.Random(7)
+        menu = pricing.Catalog({pk: rng.randint(0, 99999) for pk in range(1, 200)})
+        catalogs = (None, menu, menu.with_prices({1: '0.05', 2: '1234.56'}))
+        for tax_rate in ('0', '0.05', '0.075', '0.0825', '0.1', '0.125', '0.2'):
+            for catalog in catalogs:
+                carts = self.random_carts(rng, list(range(1, 200)), 300)
+                expected = [pricing.reference_price(lines, catalog, discount, tax_rate) for lines, discount in carts]
+                self.assertEqual(pricing.price_carts(carts, catalog, tax_rate), expected)
+                for (lines, discount), totals in zip(carts, expected):
+                    self.assertEqual(tuple(pricing.price_cart(lines, catalog, discount, tax_rate))[1:], totals)
+
+    def test_orders_are_charged_menu_prices(self):
+        with mock.patch.object(pricing, 'TAX_RATE', Decimal('0.10')):
+            response = self.client.post('/api/orders/', {
+                'payment_method': 'cash', 'order_type': 'takeaway', 'discount': '5.00',
+                'items_data': [
+                    {'productId': self.burger.id, 'name': 'Burger', 'price': '0.01', 'quantity': 2},
+                    {'name': 'Off-menu', 'price': '2.50', 'quantity': 1},
+                ],
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.json()['id'])
+        self.assertEqual(sorted(order.items.values_list('price', flat=True)), [Decimal('2.50'), Decimal('9.99')])
+        # (19.98 + 2.50 - 5.00) * 1.10
+        self.assertEqual((order.subtotal, order.total_amount), (Decimal('22.48'), Decimal('19.23')))
+
+        response = self.client.post('/api/orders/', {
+            'payment_method': 'cash', 'order_type': 'takeaway', 'discount': '50',
+            'items_data': [{'productId': self.burger.id, 'name': 'Burger', 'price': '9.99', 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.json()['discount'], '9.99')
+        self.assertEqual(response.json()['total_amount'], '0.00')
+
+        stored = Order.objects.order_by('id')
+        self.assertEqual(
+            [totals.subtotal for totals in pricing.price_carts(pricing.carts(stored))],
+            list(stored.values_list('subtotal', flat=True))
+        )
@@ -0,0 +1,109 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import catalog
+from ..models import Category, Product, Table, Order, OrderItem, Customer
+
+QUERY_BUDGET_SIZES = (10, 1000, 10000)
+
+
+class QueryBudgetTestCase(TestCase):
+    """
+    Seeds every table at each size in QUERY_BUDGET_SIZES and asserts each
+    endpoint stays within a fixed query count, so an N+1 regression fails CI
+    instead of showing up at peak. Subclasses list ``budgets`` as
+    ``{url: max_queries}``.
+    """
+    budgets = {}
+
+    def setUp(self):
+        self.client = APIClient()
+        # Seeding uses bulk_create, which sends no signals to invalidate it
+        catalog.bump_version()
+
+    def seed(self, rows):
+        categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', slug=f'category-{i}') for i in range(10)
+        )
+        products = Product.objects.bulk_create(
+            Product(name=f'Product {i}', price=Decimal('4.50'), category=categories[i % 10])
+            for i in range(rows)
+        )
+        Table.objects.bulk_create(Table(table_number=str(i), capacity=4) for i in range(rows))
+        Customer.objects.bulk_create(Customer(name=f'Customer {i}', phone=f'555{i:07d}') for i in range(rows))
+        orders = Order.objects.bulk_create(
+            Order(order_number=f'ORD-B{i:07d}', subtotal=Decimal('9.00'), total_amount=Decimal('9.00'),
+                  payment_method='cash', order_type='dine-in', status='pending')
+            for i in range(rows)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=order, product=products[i % len(products)], product_name='Product',
+                      price=Decimal('4.50'), quantity=2)
+            for i, order in enumerate(orders) for _ in range(2)
+        )
+
+    def assertWithinBudget(self, rows):
+        self.seed(rows)
+        for url, budget in self.budgets.items():
+            with self.subTest(url=url, rows=rows):
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    len(ctx.captured_queries), budget,
+                    '\n'.join(query['sql'] for query in ctx.captured_queries)
+                )
+
+
+class EndpointQueryBudgetTests(QueryBudgetTestCase):
+    budgets = {
+        # Cached menu reads: +1 for the catalog version (api/catalog.py)
+        '/api/categories/': 2,
+        '/api/products/': 2,
+        '/api/products/?view=summary': 1,
+        '/api/products/catalog/': 3,
+        '/api/tables/': 1,
+        '/api/tables/floor/': 1,
+        '/api/stations/': 1,
+        '/api/customers/': 1,
+        # Order lists: +1 when the page runs out of hot rows and continues
+        # into the archive (api/archive.py)
+        '/api/orders/': 3,
+        '/api/orders/?view=summary': 2,
+        '/api/orders/?status=pending': 2,
+        '/api/orders/feed/': 3,
+        '/api/analytics/dashboard/': 5,
+        # Async (ASGI) twins must cost the same
+        '/api/async/orders/': 3,
+        '/api/async/orders/?view=summary': 2,
+        '/api/async/orders/feed/': 3,
+        '/api/async/products/catalog/': 3,
+        '/api/async/analytics/dashboard/': 5,
+        '/api/async/tables/': 1,
+    }
+
+    def test_budget_at_small_size(self):
+        self.assertWithinBudget(QUERY_BUDGET_SIZES[0])
+
+    def test_budget_at_medium_size(self):
+        self.assertWithinBudget(QUERY_BUDGET_SIZES[1])
+
+    def test_budget_at_large_size(self):
+        self.assertWithinBudget(QUERY_BUDGET_SIZES[2])
+
+    def test_export_streams_in_constant_queries(self):
+        # Streaming bodies run their queries while being consumed, outside
+        # the budget check above; iterator() should keep it to one per chunk.
+        self.seed(QUERY_BUDGET_SIZES[1])
+        for kind, rows in (('orders', 1000), ('items', 2000)):
+            with self.subTest(kind=kind):
+                response = self.client.get(f'/api/orders/export/?kind={kind}&output=ndjson')
+                self.assertEqual(response.status_code, 200)
+                with CaptureQueriesContext(connection) as ctx:
+                    lines = list(response.streaming_content)
+                self.assertEqual(len(lines), rows)
+                self.assertLessEqual(len(ctx.captured_queries), 2)
@@ -0,0 +1,106 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import archive, reports
+from ..models import ArchivedOrder, Order, ZReport
+
+
+class ZReportTests(TestCase):
+    """Day and shift reports add up, freeze once closed, and reach into the archive."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.today = timezone.localdate()
+
+    def order(self, day, hour, total, status='served', discount='0', **fields):
+        order = Order.objects.create(
+            order_number=f'Z{Order.objects.count()}', status=status, total_amount=Decimal(total),
+            subtotal=Decimal(total) + Decimal(discount), discount=Decimal(discount), **fields
+        )
+        created_at = timezone.make_aware(datetime.combine(day, time(hour)))
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def report(self, day, shift=''):
+        response = self.client.get('/api/analytics/z-report/', {'date': day.isoformat(), 'shift': shift})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_closed_day(self):
+        yesterday = self.today - timedelta(days=1)
+        order = self.order(yesterday, 9, '20.00', payment_method='cash', order_type='dine-in', waiter_name='Asha')
+        self.order(yesterday, 10, '15.50', discount='4.50', payment_method='card', order_type='takeaway',
+                   waiter_name='Asha')
+        self.order(yesterday, 18, '30.00', payment_method='card', order_type='delivery', waiter_name='Ben')
+        self.order(yesterday, 19, '12.00', status='cancelled', payment_method='cash', order_type='dine-in')
+        pending = self.order(yesterday, 20, '5.00', status='pending', payment_method='qr', order_type='takeaway')
+
+        day = self.report(yesterday)
+        self.assertTrue(day['closed'])
+        self.assertEqual(
+            (day['orders'], day['gross_sales'], day['discounts'], day['net_sales'], day['average_order']),
+            (4, '75.00', '4.50', '70.50', '17.63')
+        )
+        self.assertEqual(day['cancelled'], {'orders': 1, 'amount': '12.00'})
+        self.assertEqual(day['open_orders'], 1)
+        self.assertEqual(
+            {row['payment_method']: (row['orders'], row['net_sales']) for row in day['payment_methods']},
+            {'cash': (1, '20.00'), 'card': (2, '45.50'), 'qr': (1, '5.00')}
+        )
+        self.assertEqual(
+            [(row['waiter_name'], row['orders'], row['net_sales'], row['discounts']) for row in day['waiters']],
+            [('Asha', 2, '35.50', '4.50'), ('Ben', 1, '30.00', '0.00'), ('', 1, '5.00', '0.00')]
+        )
+        morning, evening = self.report(yesterday, 'morning'), self.report(yesterday, 'evening')
+        self.assertEqual((morning['orders'], evening['orders']), (2, 2))
+        # The open order keeps the day and the evening live
+        frozen = ZReport.objects.filter(business_date=yesterday).values_list('shift', flat=True)
+        self.assertEqual(list(frozen), ['morning'])
+        self.assertEqual(reports.close_day(yesterday), (0, 2))
+
+        Order.objects.filter(pk=pending.pk).update(status='cancelled')
+        self.assertEqual(reports.close_day(yesterday), (2, 0))
+        day = self.report(yesterday)
+        self.assertEqual((day['orders'], day['net_sales'], day['open_orders']), (3, '65.50', 0))
+        self.assertEqual(day['cancelled'], {'orders': 2, 'amount': '17.00'})
+
+        # Frozen: one row read, and later edits do not rewrite history
+        Order.objects.filter(pk=order.pk).update(total_amount=Decimal('99'))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.report(yesterday), day)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.assertFalse(self.report(self.today)['closed'])
+        self.assertFalse(ZReport.objects.filter(business_date=self.today).exists())
+        response = self.client.get('/api/analytics/z-report/', {'shift': 'night'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_archived_day(self):
+        old_day = self.today - timedelta(days=200)
+        for total, payment_method in (('8.00', 'cash'), ('12.00', 'card')):
+            self.order(old_day, 12, total, payment_method=payment_method, order_type='takeaway')
+        self.order(self.today, 12, '1.00', payment_method='cash', order_type='takeaway')
+        archive.archive_orders(archive.cutoff())
+        self.assertEqual(ArchivedOrder.objects.count(), 2)
+        self.assertEqual(reports.close_day(old_day), (3, 0))
+        self.assertEqual(self.report(old_day)['net_sales'], '20.00')
+
+    def test_shift_settings(self):
+        self.assertEqual(reports.parse_shifts(' breakfast=00:00, lunch=11:00,dinner=17:30 '), (
+            ('breakfast', time(0)), ('lunch', time(11)), ('dinner', time(17, 30))
+        ))
+        self.assertEqual(reports.parse_shifts(''), ())
+        for value in (
+            'morning=06:00,evening=16:00',  # nothing covers 00:00-06:00
+            'morning=00:00,morning=16:00', 'morning=00:00,=16:00', 'morning=00:00,evening=00:00',
+            'morning=00:00,evening', 'morning=00:00,evening=4pm',
+        ):
+            with self.subTest(value=value):
+                self.assertRaises(ImproperlyConfigured, reports.parse_shifts, value)
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import rollups
+from ..models import Category, Product, ProductSalesRollup, SalesRollup
+
+
+class RollupConsistencyTests(TestCase):
+    """The rollups kept up to date on every write match a rebuild from the order tables."""
+
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name='Mains', slug='mains')
+        self.dosa = Product.objects.create(name='Dosa', price=Decimal('4.50'), category=category)
+        self.chai = Product.objects.create(name='Chai', price=Decimal('1.25'), category=category)
+
+    def items(self, dosas, chais):
+        lines = [
+            {'productId': self.dosa.id, 'name': 'Dosa', 'price': '4.50', 'quantity': dosas},
+            {'productId': self.chai.id, 'name': 'Chai', 'price': '1.25', 'quantity': chais},
+            {'name': 'Special', 'price': '7', 'quantity': 1},
+        ]
+        # A line needs at least one unit
+        return [line for line in lines if line['quantity']]
+
+    def order(self, created_at, dosas=1, chais=1):
+        with mock.patch('django.utils.timezone.now', return_value=created_at):
+            response = self.client.post('/api/orders/', {
+                'payment_method': 'cash', 'order_type': 'takeaway', 'items_data': self.items(dosas, chais),
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def snapshot(self):
+        # A bucket emptied by cancels or deletes stays behind as a zero row
+        sales = SalesRollup.objects.exclude(order_count=0, revenue=0).values_list(
+            'period', 'bucket', 'order_count', 'revenue'
+        )
+        products = ProductSalesRollup.objects.exclude(quantity=0, revenue=0).values_list(
+            'date', 'product_name', 'product_id', 'quantity', 'revenue'
+        )
+        return sorted(sales), sorted(products)
+
+    def test_incremental_matches_rebuild(self):
+        now = timezone.now()
+        ids = [self.order(now - timedelta(days=day, hours=hour), day + 1, hour) for day in range(3) for hour in (0, 5)]
+        response = self.client.post('/api/orders/sync/', {'orders': [
+            {'client_key': f'rollup-{i}', 'payment_method': 'cash', 'order_type': 'takeaway',
+             'items_data': self.items(i + 1, 2)}
+            for i in range(3)
+        ]}, format='json')
+        synced = [row['id'] for row in response.json()['data']['results']]
+
+        for order_id, new_status in ((ids[0], 'preparing'), (ids[0], 'served'), (ids[1], 'cancelled')):
+            self.assertEqual(
+                self.client.patch(f'/api/orders/{order_id}/status/', {'status': new_status}, format='json').status_code,
+                200,
+            )
+        response = self.client.patch('/api/orders/bulk-status/', {'orders': [
+            {'id': ids[2], 'status': 'served'}, {'id': synced[0], 'status': 'cancelled'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.patch(f'/api/orders/{ids[3]}/', {'status': 'cancelled', 'notes': 'Left'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        # Served, recalled, served again
+        for new_status in ('ready', 'served'):
+            self.client.patch(f'/api/orders/{ids[0]}/status/', {'status': new_status}, format='json')
+        for order_id in (ids[1], ids[4], synced[1]):
+            self.assertEqual(self.client.delete(f'/api/orders/{order_id}/').status_code, 204)
+
+        incremental = self.snapshot()
+        self.assertEqual(incremental[0][-1][:3], ('total', rollups.TOTAL_BUCKET, 4))
+        rollups.rebuild()
+        self.assertEqual(self.snapshot(), incremental)
@@ -0,0 +1,60 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import search
+from ..models import Category, Product
+
+
+class ProductSearchTests(TestCase):
+    """Ranked type-ahead search, from the full-text index and from the small-menu trie."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.burgers = Category.objects.create(name='Burgers', slug='burgers')
+        sides = Category.objects.create(name='Sides', slug='sides')
+        self.cheeseburger = Product.objects.create(name='Cheeseburger', price=Decimal('8.00'), category=self.burgers)
+        self.fries = Product.objects.create(name='Cheesy Fries', price=Decimal('4.00'), category=sides)
+        self.jalapeno = Product.objects.create(name='Jalapeño Poppers', price=Decimal('5.00'), category=sides)
+        Product.objects.create(name='Burger Sauce', price=Decimal('1.00'), category=sides)
+
+    def names(self, text):
+        response = self.client.get('/api/products/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [product['name'] for product in response.json()]
+
+    def check_search(self):
+        self.assertEqual(set(self.names('chee')), {'Cheeseburger', 'Cheesy Fries'})
+        self.assertEqual(self.names('jalapeno pop'), ['Jalapeño Poppers'])
+        # A name hit outranks a category hit
+        self.assertEqual(self.names('burger'), ['Burger Sauce', 'Cheeseburger'])
+        self.assertEqual(self.names('"sides" OR *'), [])
+
+        # Index follows renames and deletes
+        self.burgers.name = 'Mains'
+        self.burgers.save()
+        self.jalapeno.delete()
+        self.assertEqual(self.names('mains'), ['Cheeseburger'])
+        self.assertEqual(self.names('jala'), [])
+
+    def test_full_text_index(self):
+        with mock.patch.object(search, 'SEARCH_TRIE_MAX', 0):
+            with CaptureQueriesContext(connection) as ctx:
+                self.names('chee')
+            self.assertLessEqual(len(ctx.captured_queries), 4)
+            self.check_search()
+
+    def test_small_menu_trie(self):
+        with mock.patch.object(search, '_SEARCH', {}), \
+                mock.patch.object(search, '_fallback_search', side_effect=AssertionError('trie not used')):
+            self.check_search()
+
+    def test_failed_rebuild_keeps_the_index(self):
+        with mock.patch.object(search, '_reindex', side_effect=DatabaseError), self.assertRaises(DatabaseError):
+            search.rebuild()
+        with mock.patch.object(search, 'SEARCH_TRIE_MAX', 0):
+            self.assertEqual(self.names('jalapeno'), ['Jalapeño Poppers'])
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+
+from .. import sequences
+
+
+class OrderNumberConcurrencyTests(TransactionTestCase):
+    """
+    Many threads (each with its own DB connection) draw ticket numbers at
+    once: none may repeat, and the shared counter row must only be touched
+    about once per block rather than once per order.
+    """
+    threads = 8
+    per_thread = 60
+
+    def test_no_duplicates_under_contention(self):
+        allocator = sequences.BlockAllocator(block_size=20)
+        reservations = []
+        original_reserve = sequences.reserve
+
+        def counting_reserve(key, count):
+            reservations.append(count)
+            return original_reserve(key, count)
+
+        def worker():
+            try:
+                return [allocator.next('stress') for _ in range(self.per_thread)]
+            finally:
+                connection.close()
+
+        with mock.patch.object(sequences, 'reserve', counting_reserve):
+            with ThreadPoolExecutor(max_workers=self.threads) as pool:
+                results = [f.result() for f in [pool.submit(worker) for _ in range(self.threads)]]
+
+        numbers = [n for chunk in results for n in chunk]
+        self.assertEqual(len(numbers), self.threads * self.per_thread)
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertLessEqual(len(reservations), len(numbers) // 20 + 1)
+
+    def test_independent_allocators_never_collide(self):
+        # Separate allocators stand in for separate gunicorn workers
+        allocators = [sequences.BlockAllocator(block_size=7) for _ in range(self.threads)]
+
+        def worker(allocator):
+            try:
+                return [allocator.next('workers') for _ in range(self.per_thread)]
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            numbers = [n for chunk in pool.map(worker, allocators) for n in chunk]
+        self.assertEqual(len(set(numbers)), self.threads * self.per_thread)
@@ -0,0 +1,20 @@
+from django.test import TestCase
+
+
+class SlimSettingsTests(TestCase):
+    """The API-only settings drop the admin stack but keep everything /api/ needs."""
+
+    def test_settings_api(self):
+        from pos_backend import settings_api
+
+        for app in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages'):
+            self.assertNotIn(app, settings_api.INSTALLED_APPS)
+        self.assertIn('api', settings_api.INSTALLED_APPS)
+        self.assertNotIn('django.contrib.auth.middleware.AuthenticationMiddleware', settings_api.MIDDLEWARE)
+        self.assertIn('api.dbtuning.StatementTimeoutMiddleware', settings_api.MIDDLEWARE)
+        self.assertEqual(
+            settings_api.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'][0], 'api.renderers.FastJSONRenderer'
+        )
+        self.assertNotIn(
+            'rest_framework.renderers.BrowsableAPIRenderer', settings_api.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        )
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from ..models import Category, Product, Order, Station, Ticket
+
+
+class KitchenTicketTests(TestCase):
+    """Orders fan out into per-station tickets; the order follows its tickets."""
+
+    def setUp(self):
+        self.client = APIClient()
+        grill, self.bar, pizza = (
+            Station.objects.create(name=name, slug=name.lower()) for name in ('Grill', 'Bar', 'Pizza')
+        )
+        mains = Category.objects.create(name='Mains', slug='mains', station=grill)
+        drinks = Category.objects.create(name='Drinks', slug='drinks', station=self.bar)
+        self.products = [
+            Product.objects.create(name='Burger', price=Decimal('9.00'), category=mains),
+            Product.objects.create(name='Margherita', price=Decimal('11.00'), category=mains, station=pizza),
+            Product.objects.create(name='Lemonade', price=Decimal('3.00'), category=drinks),
+        ]
+
+    def set_ticket_status(self, ticket, new_status, expected=200):
+        response = self.client.patch(f'/api/tickets/{ticket.pk}/status/', {'status': new_status}, format='json')
+        self.assertEqual(response.status_code, expected)
+        return response.json()['data']['order_status'] if expected == 200 else None
+
+    def test_routing_and_bumping(self):
+        response = self.client.post('/api/orders/', {
+            'payment_method': 'cash', 'order_type': 'takeaway',
+            'items_data': [
+                {'productId': product.id, 'name': product.name, 'price': str(product.price), 'quantity': 1}
+                for product in self.products
+            ] + [{'name': 'Off-menu', 'price': 1, 'quantity': 1}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get(pk=response.json()['id'])
+        tickets = {ticket.station.slug: ticket for ticket in order.tickets.select_related('station')}
+        self.assertEqual(set(tickets), {'grill', 'bar', 'pizza'})
+        self.assertEqual(order.items.filter(ticket__isnull=True).count(), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            queue = self.client.get(f'/api/stations/{self.bar.pk}/queue/').json()['data']['tickets']
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertEqual([item['product_name'] for item in queue[0]['items']], ['Lemonade'])
+
+        self.assertEqual(self.set_ticket_status(tickets['bar'], 'ready'), 'preparing')
+        self.set_ticket_status(tickets['bar'], 'ready', expected=409)
+        self.assertEqual(self.client.get(f'/api/stations/{self.bar.pk}/queue/').json()['data']['tickets'], [])
+        self.assertEqual(self.set_ticket_status(tickets['grill'], 'ready'), 'preparing')
+        self.assertEqual(self.set_ticket_status(tickets['pizza'], 'ready'), 'ready')
+
+        stats = {row['slug']: row for row in self.client.get('/api/stations/stats/').json()['data']['stations']}
+        self.assertEqual((stats['bar']['open_tickets'], stats['bar']['bumped']), (0, 1))
+        self.assertIsNotNone(stats['bar']['avg_prep_seconds'])
+        self.assertIn('pos_station_bumped_tickets{station="pizza"} 1', self.client.get('/api/metrics').content.decode())
+
+        # Serving the order as a whole clears whatever is still open
+        self.set_ticket_status(tickets['grill'], 'preparing')
+        response = self.client.patch(f'/api/orders/{order.pk}/status/', {'status': 'served'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Ticket.objects.filter(order=order, status__in=('pending', 'preparing')).exists())
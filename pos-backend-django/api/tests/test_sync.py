@@ -0,0 +1,91 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .. import rollups
+from ..models import Category, Product, Order, OrderItem, ProductSalesRollup, SalesRollup
+from ..serializers import MAX_PLACED_AGE
+
+
+class OrderSyncTests(TestCase):
+    """
+    A terminal replays its offline queue; replays (whole or partial) must
+    not create duplicates, and the batch must not cost queries per order.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name='Drinks', slug='drinks')
+        self.product = Product.objects.create(name='Coffee', price=Decimal('3.00'), category=category)
+
+    def queued(self, count, prefix='t1'):
+        return [
+            {'client_key': f'{prefix}-{i}', 'payment_method': 'cash', 'order_type': 'takeaway',
+             'items_data': [{'productId': self.product.id, 'name': 'Coffee', 'price': 3, 'quantity': 2}]}
+            for i in range(count)
+        ]
+
+    def sync(self, orders):
+        response = self.client.post('/api/orders/sync/', {'orders': orders}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']['results']
+
+    def test_replay_is_deduplicated(self):
+        first = self.sync(self.queued(50))
+        self.assertEqual({r['status'] for r in first}, {'created'})
+
+        # Reconnect replays everything plus new orders, one of them broken
+        replay = self.queued(60) + [{'client_key': 'bad', 'items_data': []}]
+        with CaptureQueriesContext(connection) as ctx:
+            results = self.sync(replay)
+        self.assertLessEqual(len(ctx.captured_queries), 20)
+
+        statuses = [r['status'] for r in results]
+        self.assertEqual(statuses, ['duplicate'] * 50 + ['created'] * 10 + ['invalid'])
+        self.assertEqual([r['id'] for r in results[:50]], [r['id'] for r in first])
+        self.assertEqual(Order.objects.count(), 60)
+        self.assertEqual(OrderItem.objects.count(), 60)
+        self.assertEqual(len(set(Order.objects.values_list('order_number', flat=True))), 60)
+
+    def test_bad_prices_are_invalid_orders(self):
+        queued = self.queued(6, prefix='t2')
+        for order, price, quantity in zip(
+            queued[1:], ('NaN', 'Infinity', '-Infinity', '100000', '3'), (1, 1, 1, 1, 10 ** 6)
+        ):
+            order['items_data'][0].update(price=price, quantity=quantity)
+        results = self.sync(queued)
+        self.assertEqual([r['status'] for r in results], ['created'] + ['invalid'] * 5)
+        self.assertIn('items_data', results[1]['errors'])
+        self.assertEqual(Order.objects.count(), 1)
+
+        # The main endpoint turns the same input away with a 400, not a 500
+        queued[1]['items_data'][0]['quantity'] = 'two'
+        for order in queued[1:] + [{**queued[0], 'items_data': []}]:
+            response = self.client.post('/api/orders/', order, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('items_data', response.content.decode())
+        self.assertEqual(Order.objects.count(), 1)
+
+
+    def test_placed_at_dates_the_order(self):
+        now = timezone.now()
+        queued = self.queued(4, prefix='t3')
+        # Taken two days ago; a clock running ahead; a clock years behind; no time sent
+        for order, placed_at in zip(queued, (now - timedelta(days=2), now + timedelta(days=1), now.replace(year=2001))):
+            order['placed_at'] = placed_at.isoformat()
+        results = self.sync(queued)
+        self.assertEqual({r['status'] for r in results}, {'created'})
+        created = [Order.objects.get(pk=r['id']).created_at for r in results]
+        self.assertEqual(created[0], now - timedelta(days=2))
+        for moment in created[1], created[3]:
+            self.assertTrue(now <= moment <= timezone.now())
+        self.assertAlmostEqual(created[2], now - MAX_PLACED_AGE, delta=timedelta(minutes=1))
+
+        day = rollups.day_bucket(timezone.localdate(created[0]))
+        self.assertEqual(SalesRollup.objects.get(period='day', bucket=day).order_count, 1)
+        self.assertEqual(ProductSalesRollup.objects.get(date=timezone.localdate(created[0])).quantity, 2)
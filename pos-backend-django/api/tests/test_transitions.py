@@ -0,0 +1,111 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .. import transitions
+from ..models import Category, Product, Order, Station, Ticket
+
+
+class OrderTransitionTests(TestCase):
+    """Status changes follow the state machine and write only status/updated_at."""
+
+    def setUp(self):
+        self.client = APIClient()
+        grill = Station.objects.create(name='Grill', slug='grill')
+        self.burger = Product.objects.create(
+            name='Burger', price=Decimal('9.00'), category=Category.objects.create(name='Mains', slug='mains'),
+            station=grill,
+        )
+
+    def order(self):
+        response = self.client.post('/api/orders/', {
+            'payment_method': 'cash', 'order_type': 'takeaway',
+            'items_data': [{'productId': self.burger.id, 'name': 'Burger', 'price': '9', 'quantity': 1}],
+        }, format='json')
+        return response.json()['id']
+
+    def patch(self, order_id, new_status):
+        return self.client.patch(f'/api/orders/{order_id}/status/', {'status': new_status}, format='json')
+
+    def test_single_transition(self):
+        order_id = self.order()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.patch(order_id, 'preparing')
+        self.assertEqual(set(response.json()['data']['order']), {'id', 'status', 'updated_at'})
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_order"')]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('"total_amount"', updates[0])
+
+        # A repeated tap reads the order and writes nothing
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.patch(order_id, 'preparing').status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+        self.assertEqual(self.patch(order_id, 'cancelled').status_code, 200)
+        self.assertEqual(self.patch(order_id, 'pending').status_code, 409)
+        self.assertEqual(self.patch(order_id, 'bogus').status_code, 400)
+
+        # Another terminal moved the order after this one read it
+        stale = Order.objects.get(pk=self.order())
+        self.patch(stale.pk, 'served')
+        with self.assertRaisesMessage(ValueError, 'changed by another terminal'):
+            transitions.transition(stale, 'preparing')
+        self.assertFalse(transitions.transition(stale, 'served'))
+
+    def test_generic_update_follows_state_machine(self):
+        order_id = self.order()
+        self.assertEqual(self.patch(order_id, 'cancelled').status_code, 200)
+        response = self.client.patch(
+            f'/api/orders/{order_id}/', {'status': 'pending', 'waiter_name': 'Asha'}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+        order = Order.objects.get(pk=order_id)
+        self.assertEqual((order.status, order.waiter_name), ('cancelled', None))
+
+        # Legal moves still work, and only the submitted columns are written
+        order_id = self.order()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                f'/api/orders/{order_id}/', {'status': 'ready', 'waiter_name': 'Asha'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ready')
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_order"')]
+        self.assertTrue(updates)
+        self.assertFalse(any('"total_amount"' in sql for sql in updates))
+        self.assertEqual(Order.objects.get(pk=order_id).waiter_name, 'Asha')
+
+    def test_bulk_transitions(self):
+        first, second, third = self.order(), self.order(), self.order()
+        self.patch(third, 'cancelled')
+        response = self.client.patch('/api/orders/bulk-status/', {'orders': [
+            {'id': first, 'status': 'ready'}, {'id': second, 'status': 'served'}, {'id': third, 'status': 'served'},
+            {'id': 999999, 'status': 'served'}, {'id': first, 'status': 'served'},
+        ]}, format='json')
+        results = response.json()['data']['results']
+        self.assertEqual([(r['id'], r['result']) for r in results], [
+            (first, 'ok'), (second, 'ok'), (third, 'error'), (999999, 'error'),
+        ])
+        self.assertEqual(results[0]['status'], 'served')
+        self.assertEqual(
+            dict(Order.objects.values_list('id', 'status')), {first: 'served', second: 'served', third: 'cancelled'}
+        )
+        self.assertEqual(
+            self.client.patch('/api/orders/bulk-status/', {'orders': [{'id': first}]}, format='json').status_code, 400
+        )
+
+        tickets = list(Ticket.objects.filter(order__status='served').values_list('id', flat=True))
+        self.assertEqual(Ticket.objects.filter(pk__in=tickets, status='ready').count(), 2)
+        fourth, fifth = self.order(), self.order()
+        tickets = list(Ticket.objects.filter(order__in=(fourth, fifth)).values_list('id', flat=True))
+        response = self.client.patch('/api/tickets/bulk-status/', {
+            'tickets': [{'id': pk, 'status': 'ready'} for pk in tickets]
+        }, format='json')
+        results = response.json()['data']['results']
+        self.assertEqual(
+            [(r['result'], r['status'], r['order']['status']) for r in results], [('ok', 'ready', 'ready')] * 2
+        )
+        self.assertEqual(set(Order.objects.filter(pk__in=(fourth, fifth)).values_list('status', flat=True)), {'ready'})
@@ -0,0 +1,123 @@
+"""
+Order status transitions.
+
+``ORDER_TRANSITIONS`` is the order state machine: the board statuses move
+freely among themselves, a served order can be recalled or voided, and a
+cancelled order is final. ``transition`` writes a move as a conditional
+``UPDATE ... SET status, updated_at WHERE status=<old>`` rather than a
+whole-row save, so two terminals racing on the same order cannot both win
+and a repeated tap on the status the order already has writes nothing.
+Rollups, the floor, kitchen tickets and loyalty follow in the same
+transaction (``status_changed``).
+
+``move_ticket`` bumps a kitchen ticket and moves its order along with it;
+``transition_orders``/``move_tickets`` take a whole batch in one
+transaction for the bulk endpoints, coalescing repeats of the same order or
+ticket into its last requested status.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import floor, loyalty, rollups, stations
+from .models import Order, Ticket
+
+ORDER_TRANSITIONS = {
+    'pending': {'preparing', 'ready', 'served', 'cancelled'},
+    'preparing': {'pending', 'ready', 'served', 'cancelled'},
+    'ready': {'pending', 'preparing', 'served', 'cancelled'},
+    # Recall an order served by mistake, or void it
+    'served': {'ready', 'cancelled'},
+    'cancelled': set(),
+}
+MAX_BATCH = 200
+
+
+def status_changed(order, old_status):
+    rollups.status_changed(order, old_status)
+    floor.status_changed(order, old_status)
+    stations.order_status_changed(order, old_status)
+    loyalty.status_changed(order, old_status)
+
+
+def delta(order):
+    """What a status change changed, for the terminal to merge into its copy."""
+    return {'id': order.pk, 'status': order.status, 'updated_at': order.updated_at}
+
+
+def transition(order, new_status):
+    """
+    Move ``order`` to ``new_status``; returns False if it was already there.
+    Raises ValueError for a move the state machine forbids or when another
+    terminal changed the order first.
+    """
+    old_status = order.status
+    if new_status == old_status:
+        return False
+    if new_status not in ORDER_TRANSITIONS.get(old_status, ()):
+        raise ValueError(f'Cannot move an order from {old_status} to {new_status}')
+    now = timezone.now()
+    with transaction.atomic():
+        if not Order.objects.filter(pk=order.pk, status=old_status).update(status=new_status, updated_at=now):
+            current = Order.objects.filter(pk=order.pk).values_list('status', 'updated_at').first()
+            if current is None or current[0] != new_status:
+                raise ValueError('Order was changed by another terminal')
+            # Someone else made the same move a moment ago
+            order.status, order.updated_at = current
+            return False
+        order.status, order.updated_at = new_status, now
+        status_changed(order, old_status)
+    return True
+
+
+def move_ticket(ticket, new_status):
+    """Move a ticket (see ``stations.set_ticket_status``) and let its order follow."""
+    with transaction.atomic():
+        stations.set_ticket_status(ticket, new_status)
+        order_status = stations.order_status_for(ticket.order)
+        if order_status:
+            transition(ticket.order, order_status)
+
+
+def _coalesce(changes):
+    # Last requested status per id, in first-seen order
+    latest = {}
+    for pk, new_status in changes:
+        latest[pk] = new_status
+    return latest
+
+
+def _apply(objects, changes, move, payload):
+    results = []
+    with transaction.atomic():
+        for pk, new_status in changes.items():
+            obj = objects.get(pk)
+            if obj is None:
+                results.append({'id': pk, 'result': 'error', 'message': 'Not found'})
+                continue
+            try:
+                move(obj, new_status)
+            except ValueError as exc:
+                results.append({'id': pk, 'result': 'error', 'message': str(exc)})
+                continue
+            results.append({'id': pk, 'result': 'ok', **payload(obj)})
+    return results
+
+
+def transition_orders(changes):
+    """``transition`` each ``(order id, status)``; one result per distinct id, in order."""
+    changes = _coalesce(changes)
+    orders = Order.objects.in_bulk(list(changes))
+    return _apply(orders, changes, transition, delta)
+
+
+def move_tickets(changes):
+    """``move_ticket`` each ``(ticket id, status)``; one result per distinct id, in order."""
+    changes = _coalesce(changes)
+    tickets = Ticket.objects.select_related('order').in_bulk(list(changes))
+    # Tickets of the same order share one Order instance, so each sees the last move
+    orders = {}
+    for ticket in tickets.values():
+        ticket.order = orders.setdefault(ticket.order_id, ticket.order)
+    return _apply(tickets, changes, move_ticket, lambda ticket: {
+        'status': ticket.status, 'order': delta(ticket.order),
+    })
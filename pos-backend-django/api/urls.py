@@ -2,10 +2,13 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     RegisterView, CategoryViewSet, ProductViewSet,
-    TableViewSet, OrderViewSet, api_root,
+    TableViewSet, OrderViewSet, StationViewSet, TicketViewSet, api_root,
     CustomTokenObtainPairView, ManageUserView,
-    CustomerViewSet, AnalyticsViewSet
+    CustomerViewSet, AnalyticsViewSet, order_stream,
+    async_order_list, async_order_feed, async_catalog,
+    async_dashboard, async_tables
 )
+from .metrics import metrics_view
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
@@ -16,6 +19,8 @@ router.register(r'categories', CategoryViewSet)
 router.register(r'products', ProductViewSet)
 router.register(r'tables', TableViewSet)
 router.register(r'orders', OrderViewSet)
+router.register(r'stations', StationViewSet)
+router.register(r'tickets', TicketViewSet)
 router.register(r'customers', CustomerViewSet)
 router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
@@ -25,5 +30,12 @@ urlpatterns = [
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/updateMe/', ManageUserView.as_view(), name='user_update'),
     path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('orders/stream/', order_stream, name='orders-stream'),
+    path('metrics', metrics_view, name='metrics'),
+    path('async/orders/', async_order_list, name='async-order-list'),
+    path('async/orders/feed/', async_order_feed, name='async-order-feed'),
+    path('async/products/catalog/', async_catalog, name='async-product-catalog'),
+    path('async/analytics/dashboard/', async_dashboard, name='async-analytics-dashboard'),
+    path('async/tables/', async_tables, name='async-table-list'),
     path('', include(router.urls)),
 ]
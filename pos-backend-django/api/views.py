@@ -1,30 +1,87 @@
-from django.http import JsonResponse
-from django.db.models import Sum, Count
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import timedelta
-from rest_framework import viewsets, filters, generics
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.views.decorators.http import require_GET
+from datetime import datetime, timedelta
+from rest_framework import viewsets, generics
+from rest_framework.permissions import SAFE_METHODS, AllowAny, IsAuthenticated
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
 from .serializers import (
     UserSerializer, CategorySerializer, ProductSerializer,
     TableSerializer, OrderSerializer, CustomTokenObtainPairSerializer,
-    UserUpdateSerializer
+    UserUpdateSerializer, CustomerSerializer, OrderSummarySerializer,
+    ProductSummarySerializer, FloorTableSerializer, StationSerializer,
+    TicketSerializer, LoyaltyEntrySerializer, _as_pk
 )
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
-from .models import Category, Product, Table, Order, Customer
+from .models import Category, Product, Table, Order, OrderItem, Customer, SalesRollup, Station, Ticket
+from . import auth, catalog as catalog_cache, reports as z_reports, rollups, stations
+from . import floor as table_floor, loyalty as customer_loyalty
+from . import archive as order_archive, feed as order_feed, sync as order_sync
+from . import transitions as order_transitions
+from .pagination import CatalogPagination, KeysetPagination, OrderHistoryPagination
+from .renderers import FastJSONRenderer
+from .search import ProductSearchFilter
+
+FEED_MAX_WAIT = 25  # seconds an async long-poll may park its coroutine
+# A sync long-poll holds a whole worker, so it only waits briefly and the
+# client polls again; real long-polls belong on /api/async/orders/feed/
+SYNC_FEED_MAX_WAIT = 2
+FEED_POLL_INTERVAL = 0.5
+STREAM_KEEPALIVE = 15
 
 def api_root(request):
     return JsonResponse({"message": "Welcome to the POS API"})
 
-from .serializers import (
-    UserSerializer, CategorySerializer, ProductSerializer,
-    TableSerializer, OrderSerializer, CustomTokenObtainPairSerializer,
-    UserUpdateSerializer, CustomerSerializer
-)
+async def order_stream(request):
+    """
+    Server-Sent Events push of order changes for kitchen screens.
+    Only available when served through pos_backend.asgi; WSGI clients
+    should long-poll ``orders/feed/?wait=`` instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'status': 'error', 'message': 'Streaming requires the ASGI server; use orders/feed/?wait= instead'},
+            status=501
+        )
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        if cursor:
+            order_feed.decode_feed_cursor(cursor)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+    async def events(cursor):
+        queue = order_feed.hub.subscribe()
+        try:
+            has_more = True
+            while has_more:
+                orders, cursor, has_more = await order_feed.achanges_since(cursor)
+                yield await sync_to_async(order_feed.render_event)(orders, cursor)
+            order_feed.hub.seed(cursor)
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+        finally:
+            order_feed.hub.unsubscribe(queue)
+
+    response = StreamingHttpResponse(events(cursor or None), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
@@ -37,8 +94,8 @@ class RegisterView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Generate tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate tokens (with the same claims as a login)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         
         return JsonResponse({
             'message': 'User registered successfully',
@@ -56,95 +113,517 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self):
-        return self.request.user
+        # request.user is built from token claims. Reads come from this
+        # process's user cache; writes load the row fresh, since another
+        # worker may have changed it since it was cached here
+        try:
+            if self.request.method in SAFE_METHODS:
+                return auth.user_cache.get(self.request.user.pk)
+            return User.objects.get(pk=self.request.user.pk)
+        except User.DoesNotExist:
+            raise NotFound('User not found')
+
+class ListViewMixin:
+    # ?fields=a,b trims read payloads to the named fields; ?view=summary
+    # swaps in the slim list serializer when the viewset declares one.
+    summary_serializer_class = None
+
+    def wants_summary(self):
+        return (
+            self.action == 'list' and self.summary_serializer_class is not None
+            and self.request.query_params.get('view') == 'summary'
+        )
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    def get_serializer_class(self):
+        if self.wants_summary():
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.request.query_params.get('fields') if self.request.method in SAFE_METHODS else None
+        if fields:
+            kwargs['fields'] = [name.strip() for name in fields.split(',') if name.strip()]
+        return super().get_serializer(*args, **kwargs)
+
+class CategoryViewSet(ListViewMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    pagination_class = CatalogPagination
+
+    def list(self, request, *args, **kwargs):
+        # Plain menu reads come from the versioned catalog cache
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        return catalog_cache.cached_response(
+            request, 'categories', lambda: CategorySerializer(self.get_queryset(), many=True).data
+        )
 
-class ProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+class ProductViewSet(ListViewMixin, viewsets.ModelViewSet):
+    queryset = Product.objects.select_related('category')
     serializer_class = ProductSerializer
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', 'category__name']
+    summary_serializer_class = ProductSummarySerializer
+    pagination_class = CatalogPagination
+    # Ranked prefix search over the full-text index (api/search.py)
+    filter_backends = [ProductSearchFilter]
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        return catalog_cache.cached_response(
+            request, 'products', lambda: ProductSerializer(self.get_queryset(), many=True).data
+        )
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def catalog(self, request):
+        # Everything a POS terminal needs in one cached, ETag-able document
+        return catalog_cache.cached_response(request, 'catalog', lambda: {
+            'categories': CategorySerializer(Category.objects.all(), many=True).data,
+            'products': ProductSerializer(self.get_queryset().filter(is_available=True), many=True).data,
+        })
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(ListViewMixin, viewsets.ModelViewSet):
     queryset = Table.objects.all()
     serializer_class = TableSerializer
+    pagination_class = CatalogPagination
 
     def get_queryset(self):
         # Optional: Filter by section if needed
         return super().get_queryset()
 
-class OrderViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def floor(self, request):
+        # Every table with its session, latest order, elapsed time and
+        # running total in one query (replaces client-side order joins)
+        serializer = FloorTableSerializer(table_floor.floor_plan(), many=True, context={'now': timezone.now()})
+        return Response({'status': 'success', 'data': {'tables': serializer.data}})
+
+    @action(detail=True, methods=['patch'])
+    def status(self, request, pk=None):
+        table = self.get_object()
+        new_status = request.data.get('status')
+        if new_status not in dict(Table.STATUS_CHOICES):
+            return Response({'status': 'error', 'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            table_floor.check_manual_status(table, new_status)
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_409_CONFLICT)
+        table.status = new_status
+        table.save(update_fields=['status'])
+        return Response(TableSerializer(table).data)
+
+class StationViewSet(ListViewMixin, viewsets.ModelViewSet):
+    queryset = Station.objects.all()
+    serializer_class = StationSerializer
+    pagination_class = CatalogPagination
+
+    @action(detail=True, methods=['get'], pagination_class=None)
+    def queue(self, request, pk=None):
+        # This station's open tickets, oldest first, read straight off the
+        # partial index (no station lookup, no order-board download)
+        tickets = TicketSerializer(stations.queue(pk), many=True).data
+        return Response({'status': 'success', 'data': {'tickets': tickets}})
+
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def stats(self, request):
+        # Open tickets, oldest ticket age, throughput and mean prep time per station
+        try:
+            window = int(request.query_params.get('window', stations.STATS_WINDOW))
+        except ValueError:
+            return Response({'status': 'error', 'message': 'Invalid window'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'status': 'success', 'data': {'stations': stations.stats(max(window, 1))}})
+
+class TicketViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Ticket.objects.select_related('order').prefetch_related('items')
+    serializer_class = TicketSerializer
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):
+        if self.action == 'status':
+            # A bump answers with a delta: the items are not needed
+            return Ticket.objects.select_related('order')
+        queryset = super().get_queryset()
+        station = self.request.query_params.get('station')
+        if station is not None:
+            queryset = queryset.filter(station_id=station)
+        return queryset
+
+    @action(detail=True, methods=['patch'])
+    def status(self, request, pk=None):
+        # Start, bump or recall a ticket; the order follows its tickets
+        ticket = self.get_object()
+        new_status = request.data.get('status')
+        if new_status not in dict(Ticket.STATUS_CHOICES):
+            return Response({'status': 'error', 'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            order_transitions.move_ticket(ticket, new_status)
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({'status': 'success', 'data': {
+            'ticket': _ticket_delta(ticket),
+            'order_status': ticket.order.status,
+        }})
+
+    @action(detail=False, methods=['patch'], url_path='bulk-status')
+    def bulk_status(self, request):
+        # A station bumping several tickets at once:
+        # {"tickets": [{"id": 3, "status": "ready"}, ...]}, one result per ticket
+        changes = _status_changes(request, 'tickets', Ticket.STATUS_CHOICES)
+        if changes is None:
+            return _invalid_status_changes('tickets')
+        return Response({'status': 'success', 'data': {'results': order_transitions.move_tickets(changes)}})
+
+def _ticket_delta(ticket):
+    return {
+        'id': ticket.pk, 'status': ticket.status, 'started_at': ticket.started_at, 'bumped_at': ticket.bumped_at,
+    }
+
+def _status_changes(request, key, choices):
+    # [(id, status)] from {key: [{"id": ..., "status": ...}, ...]}, or None if malformed
+    entries = request.data.get(key) if isinstance(request.data, dict) else None
+    if not isinstance(entries, list) or not entries or len(entries) > order_transitions.MAX_BATCH:
+        return None
+    changes = []
+    for entry in entries:
+        pk = _as_pk(entry.get('id')) if isinstance(entry, dict) else None
+        if pk is None or entry.get('status') not in dict(choices):
+            return None
+        changes.append((pk, entry['status']))
+    return changes
+
+def _invalid_status_changes(key):
+    return Response(
+        {'status': 'error', 'message': f'{key} must list 1 to {order_transitions.MAX_BATCH} ids with a valid status'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+def _with_item_count(queryset):
+    # A correlated subquery is evaluated for the page's rows only; a JOIN +
+    # GROUP BY would aggregate every order before the LIMIT applies
+    counts = OrderItem.objects.filter(order=OuterRef('pk')).order_by().values('order').annotate(n=Count('id')).values('n')
+    return queryset.annotate(item_count=Coalesce(Subquery(counts), 0))
+
+class OrderViewSet(ListViewMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all().order_by('-created_at')
     serializer_class = OrderSerializer
+    summary_serializer_class = OrderSummarySerializer
+    pagination_class = OrderHistoryPagination
     
     def get_queryset(self):
+        if self.action == 'status':
+            return Order.objects.all()
         queryset = Order.objects.all().order_by('-created_at')
         status_param = self.request.query_params.get('status', None)
         if status_param is not None:
             queryset = queryset.filter(status=status_param)
+        if self.wants_summary():
+            queryset = _with_item_count(queryset)
+        else:
+            queryset = queryset.prefetch_related('items')
         return queryset
 
+    def get_archive_queryset(self):
+        # Where list pages continue once the hot rows run out (api/archive.py)
+        return order_archive.queryset(self.request.query_params.get('status'))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Archived orders stay readable, but not writable
+            order = order_archive.get(kwargs['pk']) if str(kwargs['pk']).isdigit() else None
+            if order is None:
+                raise
+            return Response(self.get_serializer(order).data)
+
+    def update(self, request, *args, **kwargs):
+        try:
+            return super().update(request, *args, **kwargs)
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_409_CONFLICT)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # A status in a full update moves through the state machine, exactly
+        # as the status action does; the other fields are saved first
+        new_status = serializer.validated_data.pop('status', None)
+        old_table_id = serializer.instance.table_id
+        order = serializer.save()
+        table_floor.status_changed(order, order.status, old_table_id)
+        if 'customer' in serializer.validated_data:
+            # A served order's points move to its new customer
+            customer_loyalty.status_changed(order, order.status)
+        if new_status is not None:
+            order_transitions.transition(order, new_status)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        rollups.order_deleted(instance)
+        table_floor.order_deleted(instance)
+        customer_loyalty.order_deleted(instance)
+        instance.delete()
+
     @action(detail=True, methods=['patch'])
     def status(self, request, pk=None):
+        # Only status/updated_at are written, and only those come back
         order = self.get_object()
         new_status = request.data.get('status')
-        if new_status in dict(Order.STATUS_CHOICES):
-            order.status = new_status
-            order.save()
-            return Response({'status': 'success', 'data': {'order': OrderSerializer(order).data}})
-        return Response({'status': 'error', 'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        if new_status not in dict(Order.STATUS_CHOICES):
+            return Response({'status': 'error', 'message': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            order_transitions.transition(order, new_status)
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({'status': 'success', 'data': {'order': order_transitions.delta(order)}})
+
+    @action(detail=False, methods=['patch'], url_path='bulk-status')
+    def bulk_status(self, request):
+        # {"orders": [{"id": 1, "status": "served"}, ...]}, one result per order
+        changes = _status_changes(request, 'orders', Order.STATUS_CHOICES)
+        if changes is None:
+            return _invalid_status_changes('orders')
+        return Response({'status': 'success', 'data': {'results': order_transitions.transition_orders(changes)}})
+
+    @action(detail=False, methods=['get'])
+    def feed(self, request):
+        # Incremental replacement for re-fetching the whole order list.
+        # ?since=<cursor> returns only orders changed after it; without a
+        # cursor the active board is returned. ?wait=<seconds> polls for up to
+        # SYNC_FEED_MAX_WAIT; the async twin holds a long-poll much longer.
+        cursor = request.query_params.get('since') or None
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), SYNC_FEED_MAX_WAIT)
+            orders, next_cursor, has_more = order_feed.changes_since(cursor)
+        except ValueError:
+            return Response({'status': 'error', 'message': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+
+        deadline = time.monotonic() + wait
+        while cursor and not orders and time.monotonic() < deadline:
+            time.sleep(FEED_POLL_INTERVAL)
+            orders, next_cursor, has_more = order_feed.changes_since(cursor)
+
+        return Response({'status': 'success', 'data': {
+            'orders': OrderSerializer(orders, many=True).data,
+            'cursor': next_cursor,
+            'hasMore': has_more,
+        }})
 
-class CustomerViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        # Offline queue replay: {"orders": [{client_key, items_data, ...}, ...]}.
+        # Returns one result per order (created / duplicate / invalid), in order.
+        orders = request.data.get('orders') if isinstance(request.data, dict) else None
+        if not isinstance(orders, list) or len(orders) > order_sync.MAX_BATCH:
+            return Response(
+                {'status': 'error', 'message': f'orders must be a list of at most {order_sync.MAX_BATCH}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        results = order_sync.sync_orders(orders, request.headers.get('X-Terminal-Id'))
+        return Response({'status': 'success', 'data': {'results': results}})
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        # Accounting export for a date range, streamed row by row.
+        # ?start=&end= (YYYY-MM-DD, inclusive), ?kind=orders|items, ?output=csv|ndjson
+        # (not ?format=, which DRF reserves for renderer selection)
+        # Back-office only, so workers load it on first use rather than at boot
+        from . import exports
+
+        kind = request.query_params.get('kind', 'orders')
+        output = request.query_params.get('output', 'csv')
+        if kind not in exports.KINDS or output not in exports.OUTPUTS:
+            return Response({'status': 'error', 'message': 'Invalid kind or output'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            created_from, created_to = exports.parse_range(
+                request.query_params.get('start'), request.query_params.get('end')
+            )
+        except ValueError:
+            return Response({'status': 'error', 'message': 'Invalid date range'}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            exports.export_lines(kind, output, created_from, created_to),
+            content_type='text/csv' if output == 'csv' else 'application/x-ndjson',
+        )
+        filename = f'{kind}-{created_from:%Y%m%d}-{created_to - timedelta(days=1):%Y%m%d}.{output}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class CustomerViewSet(ListViewMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    pagination_class = KeysetPagination
+    @action(detail=False, methods=['get'], pagination_class=None)
+    def lookup(self, request):
+        # Checkout type-ahead: ?phone=<prefix>, a handful of slim rows off the phone index
+        phone = request.query_params.get('phone', '').strip()
+        if len(phone) < customer_loyalty.LOOKUP_MIN_LENGTH:
+            return Response(
+                {'status': 'error', 'message': f'phone needs at least {customer_loyalty.LOOKUP_MIN_LENGTH} characters'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        customers = CustomerSerializer(
+            customer_loyalty.find_by_phone(phone), many=True, fields=customer_loyalty.LOOKUP_FIELDS
+        ).data
+        return Response({'status': 'success', 'data': {'customers': customers}})
+
+    @action(detail=True, methods=['get', 'post'], pagination_class=None)
+    def loyalty(self, request, pk=None):
+        # GET: balance and latest ledger entries. POST {points, note}: manual adjustment
+        customer = self.get_object()
+        if request.method == 'POST':
+            try:
+                points = int(request.data.get('points'))
+            except (TypeError, ValueError):
+                return Response({'status': 'error', 'message': 'Invalid points'}, status=status.HTTP_400_BAD_REQUEST)
+            if not points:
+                return Response({'status': 'error', 'message': 'Invalid points'}, status=status.HTTP_400_BAD_REQUEST)
+            customer_loyalty.adjust(customer, points, str(request.data.get('note', ''))[:200])
+            customer.refresh_from_db(fields=['loyalty_points'])
+        return Response({'status': 'success', 'data': {
+            'loyalty_points': customer.loyalty_points,
+            'entries': LoyaltyEntrySerializer(customer_loyalty.statement(customer.pk), many=True).data,
+        }})
+
+def _dashboard_buckets(today):
+    return SalesRollup.objects.filter(
+        Q(period='total', bucket=rollups.TOTAL_BUCKET) |
+        Q(period='day', bucket=rollups.day_bucket(today))
+    )
+
+def _recent_orders():
+    # Recent Sales (Last 5 orders)
+    return Order.objects.prefetch_related('items').order_by('-created_at')[:5]
+
+def _dashboard_data(buckets, series, recent_orders):
+    buckets = {row.period: row for row in buckets}
+    total = buckets.get('total')
+    today_bucket = buckets.get('day')
+    revenue_data, top_products = series
+    return {
+        'totalRevenue': total.revenue if total else 0,
+        'totalOrders': total.order_count if total else 0,
+        'todayRevenue': today_bucket.revenue if today_bucket else 0,
+        'todayOrders': today_bucket.order_count if today_bucket else 0,
+        'recentSales': OrderSerializer(recent_orders, many=True).data,
+        'revenueData': revenue_data,
+        'topProducts': top_products,
+    }
 
 class AnalyticsViewSet(viewsets.ViewSet):
     permission_classes = [AllowAny]
 
     @action(detail=False, methods=['get'])
     def dashboard(self, request):
-        today = timezone.now().date()
-        orders = Order.objects.all()
-        
-        # 1. Total Revenue
-        total_revenue = orders.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        
-        # 2. Total Orders
-        total_orders = orders.count()
-        
-        # 3. Today's Revenue
-        today_revenue = orders.filter(created_at__date=today).aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-        
-        # 4. Today's Orders
-        today_orders = orders.filter(created_at__date=today).count()
-        
-        # 6. Recent Sales (Last 5 orders)
-        recent_orders = orders.order_by('-created_at')[:5]
-        recent_sales_data = OrderSerializer(recent_orders, many=True).data
-        
-        data = {
-            'totalRevenue': total_revenue,
-            'totalOrders': total_orders,
-            'todayRevenue': today_revenue,
-            'todayOrders': today_orders,
-            'recentSales': recent_sales_data,
-            'revenueData': [
-                {'name': 'Mon', 'value': 4000},
-                {'name': 'Tue', 'value': 3000},
-                {'name': 'Wed', 'value': 2000},
-                {'name': 'Thu', 'value': 2780},
-                {'name': 'Fri', 'value': 1890},
-                {'name': 'Sat', 'value': 2390},
-                {'name': 'Sun', 'value': 3490},
-            ],
-            'topProducts': [
-                {'name': 'Burger', 'value': 400},
-                {'name': 'Pizza', 'value': 300},
-                {'name': 'Pasta', 'value': 300},
-                {'name': 'Salad', 'value': 200},
-            ]
-        }
+        # Totals come from the materialized rollups (see api/rollups.py),
+        # so this reads a few rows regardless of order history size.
+        today = timezone.localdate()
+        data = _dashboard_data(
+            _dashboard_buckets(today), rollups.dashboard_series(today), _recent_orders()
+        )
         return Response({'status': 'success', 'data': data})
+
+    @action(detail=False, methods=['get'], url_path='z-report')
+    def z_report(self, request):
+        # ?date=YYYY-MM-DD (default today), ?shift=<REPORT_SHIFTS name> (default the whole day).
+        # Closed, settled days and shifts are served from their frozen ZReport row
+        try:
+            day = datetime.strptime(request.query_params['date'], '%Y-%m-%d').date() \
+                if request.query_params.get('date') else timezone.localdate()
+            report = z_reports.z_report(day, request.query_params.get('shift', ''))
+        except ValueError as exc:
+            return Response({'status': 'error', 'message': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'status': 'success', 'data': report})
+
+
+# Async-native versions of the hot read endpoints, mounted under /api/async/.
+# They return the same payloads as their DRF counterparts but query through
+# the async ORM, so under pos_backend.asgi a slow dashboard or a long-poll
+# waits on the event loop instead of holding a whole worker.
+
+def _json(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), content_type='application/json', status=status)
+
+def _fields(request):
+    fields = request.GET.get('fields')
+    return {'fields': [name.strip() for name in fields.split(',') if name.strip()]} if fields else {}
+
+@require_GET
+async def async_order_list(request):
+    """Keyset-paginated order list (newest first): ?status=, ?view=summary, ?page_size=, ?cursor=."""
+    queryset = Order.objects.all()
+    if 'status' in request.GET:
+        queryset = queryset.filter(status=request.GET['status'])
+    summary = request.GET.get('view') == 'summary'
+    queryset = _with_item_count(queryset) if summary else queryset.prefetch_related('items')
+    try:
+        page_size = min(max(int(request.GET.get('page_size', KeysetPagination.page_size)), 1), KeysetPagination.max_page_size)
+        position = order_feed.decode_cursor(request.GET['cursor']) if request.GET.get('cursor') else None
+    except ValueError:
+        return _json({'status': 'error', 'message': 'Invalid cursor or page size'}, status=400)
+
+    orders = [order async for order in order_archive.older(queryset, position, limit=page_size + 1)]
+    # Continue into the archive, as OrderHistoryPagination does
+    archived = order_archive.queryset(request.GET.get('status'))
+    if archived is not None and order_archive.reaches_archive(orders, page_size):
+        after = orders[-1] if len(orders) > page_size else None
+        older = order_archive.older(archived, position, after, page_size + 1)
+        orders = order_archive.merge(orders, [order_archive.to_order(row) async for row in older], page_size + 1)
+    next_url = None
+    if len(orders) > page_size:
+        orders = orders[:page_size]
+        query = request.GET.copy()
+        query['cursor'] = order_feed.encode_cursor(orders[-1], 'created_at')
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    serializer_class = OrderSummarySerializer if summary else OrderSerializer
+    return _json({
+        'next': next_url,
+        'previous': None,
+        'results': serializer_class(orders, many=True, **_fields(request)).data,
+    })
+
+@require_GET
+async def async_order_feed(request):
+    cursor = request.GET.get('since') or None
+    try:
+        wait = min(float(request.GET.get('wait', 0)), FEED_MAX_WAIT)
+        orders, next_cursor, has_more = await order_feed.achanges_since(cursor)
+    except ValueError:
+        return _json({'status': 'error', 'message': 'Invalid cursor'}, status=400)
+
+    # Long-polling here parks a coroutine, not a worker
+    deadline = time.monotonic() + wait
+    while cursor and not orders and time.monotonic() < deadline:
+        await asyncio.sleep(FEED_POLL_INTERVAL)
+        orders, next_cursor, has_more = await order_feed.achanges_since(cursor)
+
+    return _json({'status': 'success', 'data': {
+        'orders': OrderSerializer(orders, many=True).data,
+        'cursor': next_cursor,
+        'hasMore': has_more,
+    }})
+
+@require_GET
+async def async_catalog(request):
+    async def build():
+        categories = [category async for category in Category.objects.all()]
+        products = [
+            product async for product in
+            Product.objects.select_related('category').filter(is_available=True)
+        ]
+        return {
+            'categories': CategorySerializer(categories, many=True).data,
+            'products': ProductSerializer(products, many=True).data,
+        }
+    return await catalog_cache.acached_response(request, 'catalog', build)
+
+@require_GET
+async def async_dashboard(request):
+    today = timezone.localdate()
+    buckets = [row async for row in _dashboard_buckets(today)]
+    series = await rollups.adashboard_series(today)
+    recent_orders = [order async for order in _recent_orders()]
+    return _json({'status': 'success', 'data': _dashboard_data(buckets, series, recent_orders)})
+
+@require_GET
+async def async_tables(request):
+    tables = [table async for table in Table.objects.order_by('id')]
+    return _json(TableSerializer(tables, many=True, **_fields(request)).data)
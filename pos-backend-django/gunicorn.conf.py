@@ -0,0 +1,39 @@
+"""
+Gunicorn settings, picked up from the working directory (render.yaml starts
+gunicorn from pos-backend-django/).
+
+With ``preload_app`` the master imports Django, the apps and the URLconf once
+and every worker is forked from it already warm: a worker restart costs a
+fork instead of a full boot, and the imported code is shared copy-on-write
+instead of loaded again per worker (``manage.py profile_startup`` has the
+numbers). Database connections must not cross the fork, since two processes
+talking over one socket corrupt each other's results, so the master closes
+any it opened before forking and workers open their own on first use.
+
+GUNICORN_PRELOAD=False goes back to loading the app in each worker; workers
+still come from WEB_CONCURRENCY, which gunicorn reads itself.
+"""
+import os
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Django resolves the URLconf (and so imports every view) on the first
+    # request; do it here so workers inherit it rather than each paying for it
+    from django.db import connections
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+    connections.close_all()
+
+
+def pre_fork(server, worker):
+    if not preload_app:
+        return
+    from django.db import connections
+
+    # Nothing the master opened may be inherited by a worker
+    connections.close_all()
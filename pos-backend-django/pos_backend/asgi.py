@@ -3,6 +3,26 @@ ASGI config for pos_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serving through this module keeps slow reads off the worker pool: the
+``/api/async/...`` endpoints (order list and feed, catalog, dashboard, tables)
+and the order push stream (``/api/orders/stream/``) wait on the event loop,
+so one worker holds hundreds of open requests. That holds only while every
+middleware in MIDDLEWARE is async-capable (api/static.py wraps WhiteNoise for
+this): Django runs a sync-only middleware, and with it everything below it
+in the stack, on a thread per request. Recommended deployment::
+
+    pip install uvicorn-worker
+    gunicorn pos_backend.asgi:application \
+        -k uvicorn_worker.UvicornWorker --workers $(nproc) \
+        --keep-alive 5 --graceful-timeout 30
+
+Workers are one per core (not 2n+1 as for sync workers); concurrency comes
+from the event loop. Writes and the DRF endpoints still work, each running
+on a thread per request. Persistent DB connections are off by default here
+(DB_CONN_MAX_AGE=0) because async ORM calls run on per-request threads that
+would each keep their own connection open; use a server-side pooler
+(pgbouncer) or the backend's connection pool instead.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -12,5 +32,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pos_backend.settings')
+# Web requests only; management commands run without a statement timeout
+os.environ.setdefault('DB_STATEMENT_TIMEOUT', '30000')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
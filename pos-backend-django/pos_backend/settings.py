@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import os
 import dj_database_url
@@ -45,8 +46,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # gzip/brotli for API bodies over COMPRESS_MIN_SIZE; streaming responses pass through
+    'api.compression.CompressionMiddleware',
+    # WhiteNoise with an async path, so ASGI requests stay on the event loop
+    'api.static.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,6 +59,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # STATEMENT_TIMEOUTS per route
+    'api.dbtuning.StatementTimeoutMiddleware',
 ]
 
 ROOT_URLCONF = 'pos_backend.urls'
@@ -82,10 +89,92 @@ WSGI_APPLICATION = 'pos_backend.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default=f'sqlite:///{BASE_DIR}/db.sqlite3',
-        conn_max_age=600
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        # A persistent connection that died while idle is replaced before use
+        conn_health_checks=True,
     )
 }
 
+# Statement timeout (ms) for every query on PostgreSQL; 0 disables it.
+# wsgi.py and asgi.py default it to 30 s for the web processes only, so
+# management commands (migrate, archive_orders, close_day...) run without
+# one. STATEMENT_TIMEOUTS tightens or relaxes it per route (api/dbtuning.py)
+DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
+STATEMENT_TIMEOUTS = {
+    'analytics-dashboard': 5000,
+    'async-analytics-dashboard': 5000,
+    'analytics-z-report': 10000,
+}
+
+# Options are merged into what DATABASE_URL carried (e.g. ?sslmode=require)
+DB_OPTIONS = DATABASES['default'].setdefault('OPTIONS', {})
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DB_OPTIONS.update({
+        # WAL lets readers carry on while one connection writes, and
+        # IMMEDIATE transactions take the write lock up front, so writers
+        # queue for up to SQLITE_BUSY_TIMEOUT seconds instead of failing
+        # with "database is locked" halfway through
+        'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+        'transaction_mode': 'IMMEDIATE',
+        'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+    })
+    # Concurrency tests need real file locking; the default in-memory test
+    # database fails fast with "table is locked" instead of waiting
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+elif DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if DB_STATEMENT_TIMEOUT:
+        DB_OPTIONS['options'] = f'-c statement_timeout={DB_STATEMENT_TIMEOUT}'
+    if os.environ.get('DB_POOL') == 'True':
+        # psycopg 3 connection pool (pip install "psycopg[binary,pool]");
+        # replaces persistent connections, which Django requires off with it
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DB_OPTIONS['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    if os.environ.get('DB_PREPARE_THRESHOLD'):
+        # psycopg 3 prepares a query server-side once a connection has run it
+        # this many times. Django leaves it off because PgBouncer in
+        # transaction mode cannot keep prepared statements; it needs
+        # server-side parameter binding as well
+        DB_OPTIONS['prepare_threshold'] = int(os.environ['DB_PREPARE_THRESHOLD'])
+        DB_OPTIONS['server_side_binding'] = True
+
+
+# Caches
+# The menu catalog cache (api/catalog.py) is per-process local memory by
+# default, with its version kept in the database so every worker notices an
+# edit at once. Point CATALOG_CACHE_URL at redis://... or file:///path to
+# share one copy across gunicorn workers and answer 304s without a query.
+
+CATALOG_CACHE_URL = os.environ.get('CATALOG_CACHE_URL', '')
+if CATALOG_CACHE_URL.startswith(('redis://', 'rediss://')):
+    CATALOG_CACHE = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CATALOG_CACHE_URL,
+        'TIMEOUT': None,
+    }
+elif CATALOG_CACHE_URL.startswith('file://'):
+    CATALOG_CACHE = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CATALOG_CACHE_URL[len('file://'):],
+        'TIMEOUT': None,
+    }
+else:
+    CATALOG_CACHE = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': None,
+    }
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': CATALOG_CACHE,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -129,14 +218,52 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Request metrics (api/metrics.py), scraped from /api/metrics.
+# One request in ten gets detailed timings; every request is still counted.
+# Raise it to 1.0 while chasing a slow route.
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        # Stateless: the user comes from the token's claims (api/auth.py)
+        'api.auth.TokenUserAuthentication',
+    ),
+    # Same JSON as DRF's renderer, encoded by orjson (api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
+# Accept: application/msgpack, where msgpack is installed
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] += ('api.renderers.MessagePackRenderer',)
+
+# Smallest response body worth compressing (api/compression.py)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
 
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
 }
+
+# Per-process cache of User rows for views that need more than token claims
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 1024))
+USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 300))
+
+# Loyalty points credited per unit of a served order's total (api/loyalty.py)
+LOYALTY_POINTS_PER_UNIT = os.environ.get('LOYALTY_POINTS_PER_UNIT', '1')
+
+# Served/cancelled orders older than this move to the archive tables
+# (api/archive.py, nightly `manage.py archive_orders`)
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+
+# Shift start times (local, HH:MM) for shift Z-reports; each shift runs
+# until the next one starts and the first starts at 00:00. Checked at boot
+# (api/reports.py)
+REPORT_SHIFTS = os.environ.get('REPORT_SHIFTS', 'morning=00:00,evening=16:00')
+
+# Sales tax charged on the discounted subtotal, e.g. '0.10' (api/pricing.py)
+TAX_RATE = os.environ.get('TAX_RATE', '0')
@@ -0,0 +1,45 @@
+"""
+Slim settings for API-only workers.
+
+Everything in settings.py, minus what only the admin and the browsable API
+use: the admin, sessions, messages and static files apps, their middleware,
+and the HTML renderer. Clients authenticate with JWTs (api/auth.py), so none
+of it is needed to serve /api/. Workers boot faster and smaller with it
+(``manage.py profile_startup``); run the admin from a worker on the full
+settings if you need it.
+
+    DJANGO_SETTINGS_MODULE=pos_backend.settings_api gunicorn pos_backend.wsgi:application
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+SLIM_EXCLUDED_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+SLIM_EXCLUDED_MIDDLEWARE = (
+    'api.static.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    # CSRF only guards cookie sessions; DRF requests carry a bearer token
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in SLIM_EXCLUDED_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in SLIM_EXCLUDED_MIDDLEWARE]
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'OPTIONS': {'context_processors': ['django.template.context_processors.request']},
+}]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': tuple(
+        renderer for renderer in REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        if renderer != 'rest_framework.renderers.BrowsableAPIRenderer'
+    ),
+}
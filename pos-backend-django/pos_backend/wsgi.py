@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pos_backend.settings')
+# Web requests only; management commands run without a statement timeout
+os.environ.setdefault('DB_STATEMENT_TIMEOUT', '30000')
 
 application = get_wsgi_application()
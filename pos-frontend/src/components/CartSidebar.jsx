@@ -1,6 +1,6 @@
 import React, { useState } from 'react';
 import { useSelector, useDispatch } from 'react-redux';
-import { Trash2, Minus, Plus, CreditCard, Banknote, QrCode, Tag, X, ShoppingCart } from 'lucide-react';
+import { Trash2, Minus, Plus, CreditCard, Banknote, QrCode, Tag, X, ShoppingCart, User } from 'lucide-react';
 import {
     selectCartItems,
     selectCartCount,
@@ -20,6 +20,12 @@ import {
     selectCurrency
 } from '../store/slices/uiSlice';
 import { createOrder } from '../store/slices/ordersSlice';
+import {
+    lookupCustomers,
+    setCheckoutCustomer,
+    selectLookupResults,
+    selectCheckoutCustomer
+} from '../store/slices/customerSlice';
 import { formatCurrency } from '../utils/formatCurrency';
 import { getApiUrl } from '../api/config';
 
@@ -34,6 +40,7 @@ const QUICK_DISCOUNTS = [5, 10, 15];
 const CartSidebar = ({ onCheckout }) => {
     const dispatch = useDispatch();
     const [showDiscountInput, setShowDiscountInput] = useState(false);
+    const [customerPhone, setCustomerPhone] = useState('');
 
     // Redux selectors
     const cartItems = useSelector(selectCartItems);
@@ -45,6 +52,8 @@ const CartSidebar = ({ onCheckout }) => {
     const selectedTable = useSelector(selectSelectedTable);
     const selectedWaiter = useSelector(selectSelectedWaiter);
     const currency = useSelector(selectCurrency);
+    const lookupResults = useSelector(selectLookupResults);
+    const checkoutCustomer = useSelector(selectCheckoutCustomer);
 
     const discountAmount = subtotal * (discountPercent / 100);
     const subtotalAfterDiscount = subtotal - discountAmount;
@@ -57,6 +66,19 @@ const CartSidebar = ({ onCheckout }) => {
         setShowDiscountInput(false);
     };
 
+    const handleCustomerPhone = (phone) => {
+        setCustomerPhone(phone);
+        // The lookup endpoint needs a 3+ character prefix
+        if (phone.trim().length >= 3) {
+            dispatch(lookupCustomers(phone.trim()));
+        }
+    };
+
+    const handleSelectCustomer = (customer) => {
+        dispatch(setCheckoutCustomer(customer));
+        setCustomerPhone('');
+    };
+
     const handleClearAll = () => {
         dispatch(clearCart());
     };
@@ -76,8 +98,10 @@ const CartSidebar = ({ onCheckout }) => {
                 })),
                 payment_method: selectedPaymentMethod,
                 order_type: orderType,
+                table: selectedTable?.id || null,
                 table_number: selectedTable?.table_number || null, // Updated to use correct field
                 waiter_name: selectedWaiter || null, // Updated: selectedWaiter is a string
+                customer: checkoutCustomer?.id || null, // Earns loyalty points once served
                 discount: parseFloat(discountAmount.toFixed(2))
             };
 
@@ -85,8 +109,11 @@ const CartSidebar = ({ onCheckout }) => {
             const data = await dispatch(createOrder(orderPayload)).unwrap();
 
             // Success
-            alert(`Order #${data.order_number} created successfully!`);
+            alert(data.queued
+                ? 'No connection: order saved on this terminal and will sync automatically.'
+                : `Order #${data.order_number} created successfully!`);
             dispatch(clearCart());
+            dispatch(setCheckoutCustomer(null));
 
             if (onCheckout) {
                 onCheckout({
@@ -198,6 +225,50 @@ const CartSidebar = ({ onCheckout }) => {
 
             {/* Footer */}
             <div className="p-6 bg-gray-50 border-t border-gray-100 space-y-4">
+                {/* Customer Section */}
+                <div>
+                    <label className="text-sm font-medium text-gray-700 mb-2 block">Customer</label>
+                    {checkoutCustomer ? (
+                        <div className="flex items-center justify-between px-3 py-2 bg-white border border-gray-200 rounded-lg">
+                            <div className="flex items-center gap-2">
+                                <User size={16} className="text-blue-600" />
+                                <span className="text-sm font-medium text-gray-800">{checkoutCustomer.name}</span>
+                                <span className="text-xs text-gray-500">{checkoutCustomer.loyalty_points} pts</span>
+                            </div>
+                            <button
+                                onClick={() => dispatch(setCheckoutCustomer(null))}
+                                className="text-gray-400 hover:text-red-500 transition-colors"
+                            >
+                                <X size={16} />
+                            </button>
+                        </div>
+                    ) : (
+                        <div className="relative">
+                            <input
+                                type="tel"
+                                value={customerPhone}
+                                onChange={(e) => handleCustomerPhone(e.target.value)}
+                                placeholder="Phone number"
+                                className="w-full px-3 py-2 bg-white border border-gray-200 rounded-lg text-sm focus:outline-none focus:border-blue-400"
+                            />
+                            {customerPhone.trim().length >= 3 && lookupResults.length > 0 && (
+                                <div className="absolute bottom-full mb-1 w-full bg-white border border-gray-200 rounded-lg shadow-lg z-10">
+                                    {lookupResults.map(customer => (
+                                        <button
+                                            key={customer.id}
+                                            onClick={() => handleSelectCustomer(customer)}
+                                            className="w-full flex justify-between px-3 py-2 text-sm text-left hover:bg-blue-50"
+                                        >
+                                            <span className="font-medium text-gray-800">{customer.name}</span>
+                                            <span className="text-gray-500">{customer.phone}</span>
+                                        </button>
+                                    ))}
+                                </div>
+                            )}
+                        </div>
+                    )}
+                </div>
+
                 {/* Discount Section */}
                 <div>
                     <div className="flex items-center justify-between mb-2">
@@ -1,7 +1,19 @@
-import React from 'react';
+import React, { useEffect } from 'react';
+import { useDispatch } from 'react-redux';
 import Sidebar from '../components/Sidebar';
+import { syncOfflineOrders } from '../store/slices/ordersSlice';
 
 const MainLayout = ({ children, activeView, onViewChange }) => {
+    const dispatch = useDispatch();
+
+    // Deliver orders queued while offline, now and whenever the network returns
+    useEffect(() => {
+        const sync = () => dispatch(syncOfflineOrders());
+        sync();
+        window.addEventListener('online', sync);
+        return () => window.removeEventListener('online', sync);
+    }, [dispatch]);
+
     return (
         <div className="flex min-h-screen bg-gray-100">
             <Sidebar activeView={activeView} onViewChange={onViewChange} />
@@ -4,45 +4,77 @@ import { ChefHat, Clock, CheckCircle2, Bell } from 'lucide-react';
 import OrderStatusBadge from '../components/OrderStatusBadge';
 import {
     fetchOrders,
+    fetchOrderChanges,
+    applyOrderChanges,
     updateOrderStatus,
     selectAllOrders,
     selectOrdersLoading
 } from '../store/slices/ordersSlice';
 import {
-    fetchTables,
-    updateTableStatus,
-    selectAllTables
-} from '../store/slices/tablesSlice';
+    fetchStations,
+    fetchStationQueue,
+    updateTicketStatus,
+    setStation,
+    selectStations,
+    selectStationId,
+    selectTickets
+} from '../store/slices/kitchenSlice';
+import { getApiUrl } from '../api/config';
 
 const KitchenDisplayPage = () => {
     const dispatch = useDispatch();
     const orders = useSelector(selectAllOrders);
-    const tables = useSelector(selectAllTables);
     const loading = useSelector(selectOrdersLoading);
+    const stations = useSelector(selectStations);
+    const stationId = useSelector(selectStationId);
+    const tickets = useSelector(selectTickets);
 
     useEffect(() => {
-        dispatch(fetchOrders());
-        dispatch(fetchTables());
-        // Refresh orders every 10 seconds for kitchen (more frequent than orders page)
-        const interval = setInterval(() => {
-            dispatch(fetchOrders());
-        }, 15000);
-        return () => clearInterval(interval);
+        dispatch(fetchStations());
     }, [dispatch]);
 
-    const handleCompleteOrder = (orderId) => {
-        dispatch(updateOrderStatus({ id: orderId, status: 'ready' }));
+    useEffect(() => {
+        // A station screen polls its own small queue instead of the whole board
+        if (stationId) {
+            dispatch(fetchStationQueue(stationId));
+            const interval = setInterval(() => {
+                dispatch(fetchStationQueue(stationId));
+            }, 5000);
+            return () => clearInterval(interval);
+        }
 
-        // Find the order to get the table number
-        const order = orders.find(o => o.id === orderId);
-        if (order && order.table_number) {
-            // Find the table by table_number
-            const table = tables.find(t => t.table_number === order.table_number);
+        dispatch(fetchOrders());
+        dispatch(fetchOrderChanges());
 
-            if (table) {
-                dispatch(updateTableStatus({ id: table.id, status: 'available' }));
+        // Status changes are pushed over SSE when the backend runs under ASGI;
+        // otherwise fall back to polling the incremental feed.
+        let interval = null;
+        const stream = new EventSource(getApiUrl('orders/stream/'));
+        stream.addEventListener('orders', (event) => {
+            dispatch(applyOrderChanges({ orders: JSON.parse(event.data), cursor: event.lastEventId }));
+        });
+        stream.onerror = () => {
+            stream.close();
+            if (!interval) {
+                interval = setInterval(() => {
+                    dispatch(fetchOrderChanges());
+                }, 5000);
             }
-        }
+        };
+        return () => {
+            stream.close();
+            clearInterval(interval);
+        };
+    }, [dispatch, stationId]);
+
+    const handleTicketStatus = (ticketId, status) => {
+        // The order itself moves on once all of its tickets are bumped
+        dispatch(updateTicketStatus({ id: ticketId, status }));
+    };
+
+    const handleCompleteOrder = (orderId) => {
+        // Table occupancy follows order status on the server
+        dispatch(updateOrderStatus({ id: orderId, status: 'ready' }));
     };
 
     const handleStartOrder = (orderId) => {
@@ -61,6 +93,7 @@ const KitchenDisplayPage = () => {
         return `${diffHours}h ${diffMins % 60}m`;
     };
 
+    const station = stations.find(s => s.id === stationId);
     const pendingOrders = orders.filter(o => o.status === 'pending');
     const preparingOrders = orders.filter(o => o.status === 'preparing');
     const readyOrders = orders.filter(o => o.status === 'ready');
@@ -76,93 +109,183 @@ const KitchenDisplayPage = () => {
                         </div>
                         <div>
                             <h1 className="text-2xl font-bold text-white">Kitchen Display System</h1>
-                            <p className="text-gray-400 text-sm mt-1">Real-time order tracking</p>
+                            <p className="text-gray-400 text-sm mt-1">
+                                {station ? `${station.name} station` : 'Real-time order tracking'}
+                            </p>
                         </div>
                     </div>
-                    <div className="flex gap-4">
-                        <div className="bg-orange-900/50 rounded-xl px-6 py-3 border border-orange-700">
-                            <div className="text-2xl font-bold text-orange-400">{pendingOrders.length}</div>
-                            <div className="text-xs text-orange-300 mt-1">Pending</div>
+                    {stations.length > 0 && (
+                        <div className="flex gap-2">
+                            <button
+                                onClick={() => dispatch(setStation(null))}
+                                className={`px-4 py-2 rounded-lg font-bold ${!stationId ? 'bg-orange-600 text-white' : 'bg-gray-700 text-gray-300'}`}
+                            >
+                                All Orders
+                            </button>
+                            {stations.map(s => (
+                                <button
+                                    key={s.id}
+                                    onClick={() => dispatch(setStation(s.id))}
+                                    className={`px-4 py-2 rounded-lg font-bold ${stationId === s.id ? 'bg-orange-600 text-white' : 'bg-gray-700 text-gray-300'}`}
+                                >
+                                    {s.name}
+                                </button>
+                            ))}
                         </div>
-                        <div className="bg-blue-900/50 rounded-xl px-6 py-3 border border-blue-700">
-                            <div className="text-2xl font-bold text-blue-400">{preparingOrders.length}</div>
-                            <div className="text-xs text-blue-300 mt-1">Preparing</div>
+                    )}
+                    {stationId ? (
+                        <div className="flex gap-4">
+                            <div className="bg-orange-900/50 rounded-xl px-6 py-3 border border-orange-700">
+                                <div className="text-2xl font-bold text-orange-400">{tickets.length}</div>
+                                <div className="text-xs text-orange-300 mt-1">Open Tickets</div>
+                            </div>
                         </div>
-                        <div className="bg-green-900/50 rounded-xl px-6 py-3 border border-green-700">
-                            <div className="text-2xl font-bold text-green-400">{readyOrders.length}</div>
-                            <div className="text-xs text-green-300 mt-1">Ready</div>
+                    ) : (
+                        <div className="flex gap-4">
+                            <div className="bg-orange-900/50 rounded-xl px-6 py-3 border border-orange-700">
+                                <div className="text-2xl font-bold text-orange-400">{pendingOrders.length}</div>
+                                <div className="text-xs text-orange-300 mt-1">Pending</div>
+                            </div>
+                            <div className="bg-blue-900/50 rounded-xl px-6 py-3 border border-blue-700">
+                                <div className="text-2xl font-bold text-blue-400">{preparingOrders.length}</div>
+                                <div className="text-xs text-blue-300 mt-1">Preparing</div>
+                            </div>
+                            <div className="bg-green-900/50 rounded-xl px-6 py-3 border border-green-700">
+                                <div className="text-2xl font-bold text-green-400">{readyOrders.length}</div>
+                                <div className="text-xs text-green-300 mt-1">Ready</div>
+                            </div>
                         </div>
-                    </div>
+                    )}
                 </div>
             </div>
 
-            {/* Orders Grid */}
-            <div className="flex-1 overflow-y-auto p-6">
-                <div className="grid grid-cols-3 gap-6">
-                    {/* Pending Column */}
-                    <div>
-                        <div className="bg-orange-900/30 rounded-t-xl px-4 py-3 border-b-2 border-orange-600">
-                            <h3 className="font-bold text-orange-400 flex items-center gap-2">
-                                <Bell size={18} />
-                                Pending ({pendingOrders.length})
-                            </h3>
-                        </div>
-                        <div className="space-y-4 mt-4">
-                            {pendingOrders.map(order => (
-                                <KitchenOrderCard
-                                    key={order.id}
-                                    order={order}
-                                    onStart={handleStartOrder}
-                                    onComplete={handleCompleteOrder}
-                                    getTimeAgo={getTimeAgo}
-                                />
-                            ))}
-                        </div>
+            {stationId ? (
+                <div className="flex-1 overflow-y-auto p-6">
+                    <div className="grid grid-cols-3 gap-6">
+                        {tickets.map(ticket => (
+                            <KitchenTicketCard
+                                key={ticket.id}
+                                ticket={ticket}
+                                onStatus={handleTicketStatus}
+                                getTimeAgo={getTimeAgo}
+                            />
+                        ))}
                     </div>
+                </div>
+            ) : (
+                <div className="flex-1 overflow-y-auto p-6">
+                    <div className="grid grid-cols-3 gap-6">
+                        {/* Pending Column */}
+                        <div>
+                            <div className="bg-orange-900/30 rounded-t-xl px-4 py-3 border-b-2 border-orange-600">
+                                <h3 className="font-bold text-orange-400 flex items-center gap-2">
+                                    <Bell size={18} />
+                                    Pending ({pendingOrders.length})
+                                </h3>
+                            </div>
+                            <div className="space-y-4 mt-4">
+                                {pendingOrders.map(order => (
+                                    <KitchenOrderCard
+                                        key={order.id}
+                                        order={order}
+                                        onStart={handleStartOrder}
+                                        onComplete={handleCompleteOrder}
+                                        getTimeAgo={getTimeAgo}
+                                    />
+                                ))}
+                            </div>
+                        </div>
 
-                    {/* Preparing Column */}
-                    <div>
-                        <div className="bg-blue-900/30 rounded-t-xl px-4 py-3 border-b-2 border-blue-600">
-                            <h3 className="font-bold text-blue-400 flex items-center gap-2">
-                                <ChefHat size={18} />
-                                Preparing ({preparingOrders.length})
-                            </h3>
+                        {/* Preparing Column */}
+                        <div>
+                            <div className="bg-blue-900/30 rounded-t-xl px-4 py-3 border-b-2 border-blue-600">
+                                <h3 className="font-bold text-blue-400 flex items-center gap-2">
+                                    <ChefHat size={18} />
+                                    Preparing ({preparingOrders.length})
+                                </h3>
+                            </div>
+                            <div className="space-y-4 mt-4">
+                                {preparingOrders.map(order => (
+                                    <KitchenOrderCard
+                                        key={order.id}
+                                        order={order}
+                                        onStart={handleStartOrder}
+                                        onComplete={handleCompleteOrder}
+                                        getTimeAgo={getTimeAgo}
+                                    />
+                                ))}
+                            </div>
                         </div>
-                        <div className="space-y-4 mt-4">
-                            {preparingOrders.map(order => (
-                                <KitchenOrderCard
-                                    key={order.id}
-                                    order={order}
-                                    onStart={handleStartOrder}
-                                    onComplete={handleCompleteOrder}
-                                    getTimeAgo={getTimeAgo}
-                                />
-                            ))}
+
+                        {/* Ready Column */}
+                        <div>
+                            <div className="bg-green-900/30 rounded-t-xl px-4 py-3 border-b-2 border-green-600">
+                                <h3 className="font-bold text-green-400 flex items-center gap-2">
+                                    <CheckCircle2 size={18} />
+                                    Ready ({readyOrders.length})
+                                </h3>
+                            </div>
+                            <div className="space-y-4 mt-4">
+                                {readyOrders.map(order => (
+                                    <KitchenOrderCard
+                                        key={order.id}
+                                        order={order}
+                                        onStart={handleStartOrder}
+                                        onComplete={handleCompleteOrder}
+                                        getTimeAgo={getTimeAgo}
+                                    />
+                                ))}
+                            </div>
                         </div>
                     </div>
+                </div>
+            )}
+        </div>
+    );
+};
 
-                    {/* Ready Column */}
-                    <div>
-                        <div className="bg-green-900/30 rounded-t-xl px-4 py-3 border-b-2 border-green-600">
-                            <h3 className="font-bold text-green-400 flex items-center gap-2">
-                                <CheckCircle2 size={18} />
-                                Ready ({readyOrders.length})
-                            </h3>
-                        </div>
-                        <div className="space-y-4 mt-4">
-                            {readyOrders.map(order => (
-                                <KitchenOrderCard
-                                    key={order.id}
-                                    order={order}
-                                    onStart={handleStartOrder}
-                                    onComplete={handleCompleteOrder}
-                                    getTimeAgo={getTimeAgo}
-                                />
-                            ))}
-                        </div>
+const KitchenTicketCard = ({ ticket, onStatus, getTimeAgo }) => {
+    return (
+        <div className={`rounded-xl border-2 bg-gray-800 p-4 shadow-lg ${ticket.status === 'preparing' ? 'border-blue-600' : 'border-gray-700'}`}>
+            <div className="flex items-start justify-between mb-3">
+                <div>
+                    <span className="text-2xl font-bold text-white">#{ticket.order_number}</span>
+                    <div className="text-sm text-gray-400">
+                        {ticket.table_number ? `Table ${ticket.table_number}` : ticket.order_type}
                     </div>
                 </div>
+                <div className="flex items-center gap-1 text-orange-400">
+                    <Clock size={16} />
+                    <span className="font-bold">{getTimeAgo(ticket.created_at)}</span>
+                </div>
+            </div>
+
+            <div className="space-y-3 mb-4">
+                {ticket.items.map(item => (
+                    <div key={item.id} className="bg-gray-900/50 rounded-lg p-3">
+                        <div className="font-bold text-white">
+                            <span className="text-orange-400">{item.quantity}x</span> {item.product_name}
+                        </div>
+                        {item.notes && <div className="text-xs text-gray-400 mt-1">{item.notes}</div>}
+                    </div>
+                ))}
             </div>
+
+            {ticket.status === 'pending' ? (
+                <button
+                    onClick={() => onStatus(ticket.id, 'preparing')}
+                    className="w-full py-2 bg-blue-600 hover:bg-blue-700 text-white rounded-lg font-bold transition-colors"
+                >
+                    Start Preparing
+                </button>
+            ) : (
+                    <button
+                        onClick={() => onStatus(ticket.id, 'ready')}
+                        className="w-full py-2 bg-green-600 hover:bg-green-700 text-white rounded-lg font-bold transition-colors"
+                    >
+                        Bump
+                    </button>
+            )}
         </div>
     );
 };
@@ -4,24 +4,31 @@ import OrderStatusBadge from '../components/OrderStatusBadge';
 import { Clock, DollarSign, User, MapPin, Phone, Mail } from 'lucide-react';
 import {
     fetchOrders,
+    fetchMoreOrders,
+    fetchOrderChanges,
     updateOrderStatus,
     selectAllOrders,
-    selectOrdersLoading
+    selectOrdersLoading,
+    selectHasMoreOrders,
+    selectOrdersLoadingMore
 } from '../store/slices/ordersSlice';
 
 const OrdersPage = () => {
     const dispatch = useDispatch();
     const orders = useSelector(selectAllOrders);
     const loading = useSelector(selectOrdersLoading);
+    const hasMore = useSelector(selectHasMoreOrders);
+    const loadingMore = useSelector(selectOrdersLoadingMore);
     const [filterStatus, setFilterStatus] = useState('all');
     const [filterType, setFilterType] = useState('all');
 
     useEffect(() => {
         dispatch(fetchOrders());
-        // Refresh orders every 30 seconds
+        dispatch(fetchOrderChanges());
+        // Pull only what changed since the last cursor
         const interval = setInterval(() => {
-            dispatch(fetchOrders());
-        }, 60000);
+            dispatch(fetchOrderChanges());
+        }, 15000);
         return () => clearInterval(interval);
     }, [dispatch]);
 
@@ -186,6 +193,17 @@ const OrdersPage = () => {
                         ))}
                     </div>
                 )}
+                {!loading && hasMore && (
+                    <div className="flex justify-center mt-6">
+                        <button
+                            onClick={() => dispatch(fetchMoreOrders())}
+                            disabled={loadingMore}
+                            className="px-6 py-2 bg-white border border-gray-300 rounded-lg text-sm font-medium text-gray-700 hover:bg-gray-100 disabled:opacity-50"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more orders'}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -28,7 +28,7 @@ import {
     setSelectedWaiter
 } from '../store/slices/uiSlice';
 import { clearCart, selectCartItems, selectCartSubtotal, selectDiscount } from '../store/slices/cartSlice';
-import { fetchTables, updateTable, selectAllTables } from '../store/slices/tablesSlice';
+import { fetchTables, selectAllTables } from '../store/slices/tablesSlice';
 
 // Mock Data
 const CATEGORIES = [
@@ -76,13 +76,7 @@ const POSPage = () => {
         const table = tables.find(t => t.id === tableId);
 
         if (table) {
-            // Only update status if it was available (new order start)
-            if (table.status === 'available') {
-                dispatch(updateTable({
-                    id: tableId,
-                    status: 'occupied'
-                }));
-            }
+            // The table is marked occupied server-side when the order is placed
             dispatch(setSelectedTable(table));
         }
     };
@@ -2,7 +2,7 @@ import React, { useEffect, useState } from 'react';
 import { useDispatch, useSelector } from 'react-redux';
 import { Plus, Users, Search, Filter, MoreVertical, Edit, Trash2, CheckCircle, Clock, Coffee } from 'lucide-react';
 import {
-    fetchTables,
+    fetchFloor,
     addTable,
     updateTable,
     updateTableStatus,
@@ -14,6 +14,7 @@ import {
 } from '../store/slices/tablesSlice';
 import { selectUser } from '../store/slices/authSlice';
 import TableModal from '../components/TableModal';
+import { formatCurrency } from '../utils/formatCurrency';
 
 const TablesPage = () => {
     const dispatch = useDispatch();
@@ -26,7 +27,7 @@ const TablesPage = () => {
     const [editingTable, setEditingTable] = useState(null);
 
     useEffect(() => {
-        dispatch(fetchTables());
+        dispatch(fetchFloor());
     }, [dispatch]);
 
     const handleAddTable = (tableData) => {
@@ -159,6 +160,14 @@ const TablesPage = () => {
                                         <Coffee size={16} className="mr-2" />
                                         <span>{table.section}</span>
                                     </div>
+                                    {table.occupied_since && (
+                                        <div className="flex items-center text-gray-500 text-sm">
+                                            <Clock size={16} className="mr-2" />
+                                            <span>
+                                                {Math.floor(table.elapsed_seconds / 60)} min · {table.active_orders} open · {formatCurrency(table.session_total)}
+                                            </span>
+                                        </div>
+                                    )}
                                 </div>
 
                                 {/* Order Status / Action */}
@@ -6,6 +6,7 @@ import authReducer from './slices/authSlice';
 import tablesReducer from './slices/tablesSlice';
 import customersReducer from './slices/customerSlice';
 import ordersReducer from './slices/ordersSlice';
+import kitchenReducer from './slices/kitchenSlice';
 
 export const store = configureStore({
     reducer: {
@@ -16,6 +17,7 @@ export const store = configureStore({
         tables: tablesReducer,
         customers: customersReducer,
         orders: ordersReducer,
+        kitchen: kitchenReducer,
     },
 });
 
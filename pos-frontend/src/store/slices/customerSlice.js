@@ -5,10 +5,34 @@ export const fetchCustomers = createAsyncThunk(
     'customers/fetchCustomers',
     async (_, { rejectWithValue }) => {
         try {
-            const response = await fetch(getApiUrl('customers/'));
+            // Customers are cursor-paginated: follow `next` so search on the
+            // customers page sees every customer, not just the newest page
+            const customers = [];
+            let url = getApiUrl('customers/?page_size=500');
+            while (url) {
+                const response = await fetch(url);
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.message || 'Failed to fetch customers');
+                if (Array.isArray(data)) return data;
+                customers.push(...(data.results || []));
+                url = data.next;
+            }
+            return customers;
+        } catch (error) {
+            return rejectWithValue(error.message);
+        }
+    }
+);
+
+export const lookupCustomers = createAsyncThunk(
+    'customers/lookupCustomers',
+    async (phone, { rejectWithValue }) => {
+        try {
+            // Phone-prefix type-ahead for attaching a customer at checkout
+            const response = await fetch(getApiUrl(`customers/lookup/?phone=${encodeURIComponent(phone)}`));
             const data = await response.json();
-            if (!response.ok) throw new Error(data.message || 'Failed to fetch customers');
-            return data;
+            if (!response.ok) throw new Error(data.message || 'Failed to look up customers');
+            return data.data.customers;
         } catch (error) {
             return rejectWithValue(error.message);
         }
@@ -68,6 +92,8 @@ export const deleteCustomer = createAsyncThunk(
 
 const initialState = {
     customers: [],
+    lookupResults: [],
+    checkoutCustomer: null,
     loading: false,
     error: null,
     success: false
@@ -82,6 +108,10 @@ const customerSlice = createSlice({
         },
         resetSuccess: (state) => {
             state.success = false;
+        },
+        setCheckoutCustomer: (state, action) => {
+            state.checkoutCustomer = action.payload;
+            state.lookupResults = [];
         }
     },
     extraReducers: (builder) => {
@@ -99,6 +129,13 @@ const customerSlice = createSlice({
                 state.loading = false;
                 state.error = action.payload;
             })
+            // Lookup
+            .addCase(lookupCustomers.fulfilled, (state, action) => {
+                state.lookupResults = action.payload;
+            })
+            .addCase(lookupCustomers.rejected, (state) => {
+                state.lookupResults = [];
+            })
             // Create Customer
             .addCase(createCustomer.pending, (state) => {
                 state.loading = true;
@@ -148,5 +185,8 @@ const customerSlice = createSlice({
     }
 });
 
-export const { clearError, resetSuccess } = customerSlice.actions;
+export const { clearError, resetSuccess, setCheckoutCustomer } = customerSlice.actions;
+
+export const selectLookupResults = (state) => state.customers.lookupResults;
+export const selectCheckoutCustomer = (state) => state.customers.checkoutCustomer;
 export default customerSlice.reducer;
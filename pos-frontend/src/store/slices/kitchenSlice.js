@@ -0,0 +1,111 @@
+import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
+
+import { getApiUrl } from '../../api/config';
+
+// Async Thunks
+export const fetchStations = createAsyncThunk(
+    'kitchen/fetchStations',
+    async (_, { rejectWithValue }) => {
+        try {
+            const response = await fetch(getApiUrl('stations/'));
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.message || 'Failed to fetch stations');
+            return data.filter(station => station.is_active);
+        } catch (error) {
+            return rejectWithValue(error.message);
+        }
+    }
+);
+
+// Only this station's open tickets, not the whole order board
+export const fetchStationQueue = createAsyncThunk(
+    'kitchen/fetchStationQueue',
+    async (stationId, { rejectWithValue }) => {
+        try {
+            const response = await fetch(getApiUrl(`stations/${stationId}/queue/`));
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.message || 'Failed to fetch tickets');
+            return { stationId, tickets: data.data.tickets };
+        } catch (error) {
+            return rejectWithValue(error.message);
+        }
+    }
+);
+
+export const updateTicketStatus = createAsyncThunk(
+    'kitchen/updateTicketStatus',
+    async ({ id, status }, { rejectWithValue }) => {
+        try {
+            const response = await fetch(getApiUrl(`tickets/${id}/status/`), {
+                method: 'PATCH',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ status })
+            });
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.message || 'Failed to update ticket');
+            return data.data.ticket;
+        } catch (error) {
+            return rejectWithValue(error.message);
+        }
+    }
+);
+
+const initialState = {
+    stations: [],
+    stationId: null, // null shows the whole order board
+    tickets: [],
+    isLoading: false,
+    error: null
+};
+
+const kitchenSlice = createSlice({
+    name: 'kitchen',
+    initialState,
+    reducers: {
+        setStation: (state, action) => {
+            state.stationId = action.payload;
+            state.tickets = [];
+        }
+    },
+    extraReducers: (builder) => {
+        builder
+            .addCase(fetchStations.fulfilled, (state, action) => {
+                state.stations = action.payload;
+            })
+            .addCase(fetchStationQueue.pending, (state) => {
+                state.isLoading = true;
+                state.error = null;
+            })
+            .addCase(fetchStationQueue.fulfilled, (state, action) => {
+                state.isLoading = false;
+                // Ignore a slow response for a station the screen has left
+                if (action.payload.stationId === state.stationId) {
+                    state.tickets = action.payload.tickets;
+                }
+            })
+            .addCase(fetchStationQueue.rejected, (state, action) => {
+                state.isLoading = false;
+                state.error = action.payload;
+            })
+            .addCase(updateTicketStatus.fulfilled, (state, action) => {
+                const ticket = action.payload;
+                if (ticket.status === 'ready') {
+                    state.tickets = state.tickets.filter(t => t.id !== ticket.id);
+                } else {
+                    const index = state.tickets.findIndex(t => t.id === ticket.id);
+                    if (index !== -1) state.tickets[index] = { ...state.tickets[index], ...ticket };
+                }
+            })
+            .addCase(updateTicketStatus.rejected, (state, action) => {
+                state.error = action.payload;
+            });
+    }
+});
+
+export const { setStation } = kitchenSlice.actions;
+
+export const selectStations = (state) => state.kitchen.stations;
+export const selectStationId = (state) => state.kitchen.stationId;
+export const selectTickets = (state) => state.kitchen.tickets;
+
+export default kitchenSlice.reducer;
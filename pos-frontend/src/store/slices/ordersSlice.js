@@ -13,8 +13,50 @@ export const fetchOrders = createAsyncThunk(
                 return rejectWithValue(data.message || 'Failed to fetch orders');
             }
 
-            // Django returns array directly or paginated with results key
-            return Array.isArray(data) ? data : (data.results || data.data?.orders || []);
+            // Newest page first; `next` is the cursor link to older orders
+            if (Array.isArray(data)) return { orders: data, next: null };
+            return { orders: data.results || data.data?.orders || [], next: data.next || null };
+        } catch (error) {
+            return rejectWithValue(error.message || 'Network error');
+        }
+    }
+);
+
+// "Load more": the next page of older orders
+export const fetchMoreOrders = createAsyncThunk(
+    'orders/fetchMoreOrders',
+    async (_, { getState, rejectWithValue }) => {
+        try {
+            const response = await fetch(getState().orders.next);
+            const data = await response.json();
+
+            if (!response.ok) {
+                return rejectWithValue(data.message || 'Failed to fetch orders');
+            }
+
+            return { orders: data.results || [], next: data.next || null };
+        } catch (error) {
+            return rejectWithValue(error.message || 'Network error');
+        }
+    },
+    { condition: (_, { getState }) => Boolean(getState().orders.next) && !getState().orders.loadingMore }
+);
+
+// Incremental feed: only orders created or changed since the last cursor
+export const fetchOrderChanges = createAsyncThunk(
+    'orders/fetchOrderChanges',
+    async (_, { getState, rejectWithValue }) => {
+        try {
+            const { cursor } = getState().orders;
+            const query = cursor ? `?since=${encodeURIComponent(cursor)}` : '';
+            const response = await fetch(getApiUrl(`orders/feed/${query}`));
+            const data = await response.json();
+
+            if (!response.ok) {
+                return rejectWithValue(data.message || 'Failed to fetch order changes');
+            }
+
+            return data.data;
         } catch (error) {
             return rejectWithValue(error.message || 'Network error');
         }
@@ -46,18 +88,35 @@ export const updateOrderStatus = createAsyncThunk(
     }
 );
 
+// Orders that could not reach the server wait here until the next sync
+const OFFLINE_QUEUE_KEY = 'offlineOrders';
+
+const readOfflineQueue = () => JSON.parse(localStorage.getItem(OFFLINE_QUEUE_KEY) || '[]');
+const writeOfflineQueue = (queue) => localStorage.setItem(OFFLINE_QUEUE_KEY, JSON.stringify(queue));
+
 export const createOrder = createAsyncThunk(
     'orders/createOrder',
     async (orderData, { rejectWithValue }) => {
+        // Idempotency key, so a replay through orders/sync/ is never inserted twice
+        const payload = { client_key: crypto.randomUUID(), ...orderData };
+        let response;
         try {
-            const response = await fetch(getApiUrl('orders/'), {
+            response = await fetch(getApiUrl('orders/'), {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
                 },
-                body: JSON.stringify(orderData),
+                body: JSON.stringify(payload),
             });
+        } catch (error) {
+            // No connection: queue it and let syncOfflineOrders deliver it later,
+            // dated when it was taken rather than when it syncs
+            const queued = { ...payload, placed_at: new Date().toISOString() };
+            writeOfflineQueue([...readOfflineQueue(), queued]);
+            return { ...queued, id: payload.client_key, order_number: 'OFFLINE', status: 'pending', queued: true };
+        }
 
+        try {
             const data = await response.json();
 
             if (!response.ok) {
@@ -72,14 +131,61 @@ export const createOrder = createAsyncThunk(
     }
 );
 
+export const syncOfflineOrders = createAsyncThunk(
+    'orders/syncOfflineOrders',
+    async (_, { rejectWithValue }) => {
+        const queue = readOfflineQueue();
+        if (queue.length === 0) return [];
+        try {
+            const response = await fetch(getApiUrl('orders/sync/'), {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ orders: queue.slice(0, 500) }),
+            });
+            const data = await response.json();
+
+            if (!response.ok) {
+                return rejectWithValue(data.message || 'Failed to sync offline orders');
+            }
+
+            // Created and duplicate both mean the server has it; invalid orders
+            // would fail forever, so they leave the queue too
+            const done = new Set(data.data.results.map(result => result.client_key));
+            writeOfflineQueue(readOfflineQueue().filter(order => !done.has(order.client_key)));
+            return data.data.results;
+        } catch (error) {
+            return rejectWithValue(error.message || 'Network error');
+        }
+    }
+);
+
 const ordersSlice = createSlice({
     name: 'orders',
     initialState: {
         orders: [],
+        cursor: null,
+        next: null,
         loading: false,
+        loadingMore: false,
         error: null,
     },
-    reducers: {},
+    reducers: {
+        // Upsert a batch of changed orders from the feed or the push stream
+        applyOrderChanges: (state, action) => {
+            const { orders, cursor } = action.payload;
+            orders.forEach(order => {
+                const index = state.orders.findIndex(o => o.id === order.id);
+                if (index !== -1) {
+                    state.orders[index] = order;
+                } else {
+                    state.orders.unshift(order);
+                }
+            });
+            if (cursor) state.cursor = cursor;
+        },
+    },
     extraReducers: (builder) => {
         builder
             // Fetch Orders
@@ -89,21 +195,44 @@ const ordersSlice = createSlice({
             })
             .addCase(fetchOrders.fulfilled, (state, action) => {
                 state.loading = false;
-                state.orders = action.payload;
+                state.orders = action.payload.orders;
+                state.next = action.payload.next;
             })
             .addCase(fetchOrders.rejected, (state, action) => {
                 state.loading = false;
                 state.error = action.payload;
             })
+            .addCase(fetchMoreOrders.pending, (state) => {
+                state.loadingMore = true;
+            })
+            .addCase(fetchMoreOrders.fulfilled, (state, action) => {
+                state.loadingMore = false;
+                // The feed may already have delivered some of these
+                const seen = new Set(state.orders.map(o => o.id));
+                state.orders.push(...action.payload.orders.filter(o => !seen.has(o.id)));
+                state.next = action.payload.next;
+            })
+            .addCase(fetchMoreOrders.rejected, (state, action) => {
+                state.loadingMore = false;
+                state.error = action.payload;
+            })
+            // Order Feed
+            .addCase(fetchOrderChanges.fulfilled, (state, action) => {
+                ordersSlice.caseReducers.applyOrderChanges(state, action);
+            })
+            .addCase(fetchOrderChanges.rejected, (state, action) => {
+                state.error = action.payload;
+            })
             // Update Order Status
             .addCase(updateOrderStatus.pending, (state) => {
                 state.loading = true;
             })
             .addCase(updateOrderStatus.fulfilled, (state, action) => {
                 state.loading = false;
+                // The server answers with just the changed fields
                 const index = state.orders.findIndex(o => o.id === action.payload.id);
                 if (index !== -1) {
-                    state.orders[index] = action.payload;
+                    state.orders[index] = { ...state.orders[index], ...action.payload };
                 }
             })
             .addCase(updateOrderStatus.rejected, (state, action) => {
@@ -122,14 +251,31 @@ const ordersSlice = createSlice({
             .addCase(createOrder.rejected, (state, action) => {
                 state.loading = false;
                 state.error = action.payload;
+            })
+            // Offline Sync
+            .addCase(syncOfflineOrders.fulfilled, (state, action) => {
+                // Swap queued placeholders for their server ids and numbers
+                action.payload.forEach(result => {
+                    const order = state.orders.find(o => o.queued && o.client_key === result.client_key);
+                    if (!order) return;
+                    if (result.id) {
+                        Object.assign(order, { id: result.id, order_number: result.order_number, queued: false });
+                    } else {
+                        state.orders = state.orders.filter(o => o !== order);
+                    }
+                });
             });
     },
 });
 
+export const { applyOrderChanges } = ordersSlice.actions;
+
 // Selectors
 export const selectAllOrders = (state) => state.orders.orders;
 export const selectOrdersLoading = (state) => state.orders.loading;
 export const selectOrdersError = (state) => state.orders.error;
+export const selectHasMoreOrders = (state) => Boolean(state.orders.next);
+export const selectOrdersLoadingMore = (state) => state.orders.loadingMore;
 
 export const selectFilteredOrders = (statusFilter, typeFilter) => (state) => {
     return state.orders.orders.filter(order => {
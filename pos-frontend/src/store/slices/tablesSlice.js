@@ -17,6 +17,21 @@ export const fetchTables = createAsyncThunk(
     }
 );
 
+// Floor plan: every table with its active session in one request
+export const fetchFloor = createAsyncThunk(
+    'tables/fetchFloor',
+    async (_, { rejectWithValue }) => {
+        try {
+            const response = await fetch(getApiUrl('tables/floor/'));
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.message || 'Failed to fetch floor plan');
+            return data.data.tables;
+        } catch (error) {
+            return rejectWithValue(error.message);
+        }
+    }
+);
+
 export const addTable = createAsyncThunk(
     'tables/addTable',
     async (tableData, { rejectWithValue }) => {
@@ -122,6 +137,19 @@ const tablesSlice = createSlice({
                 state.isLoading = false;
                 state.error = action.payload;
             })
+            // Floor Plan
+            .addCase(fetchFloor.pending, (state) => {
+                state.isLoading = true;
+                state.error = null;
+            })
+            .addCase(fetchFloor.fulfilled, (state, action) => {
+                state.isLoading = false;
+                state.tables = action.payload;
+            })
+            .addCase(fetchFloor.rejected, (state, action) => {
+                state.isLoading = false;
+                state.error = action.payload;
+            })
             // Add Table
             .addCase(addTable.fulfilled, (state, action) => {
                 state.tables.push(action.payload);